@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from lmfit import Parameters
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+B_BOUNDS = (1e-6, 1.0)
+TP_BOUNDS = (5.0, 35.0)
+
+
+def equation(
+    L: float | npt.NDArray[np.float64],
+    b: float | npt.NDArray[np.float64],
+    t: npt.NDArray[np.float64],
+    tj: float | npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    # Limit of the Richards curve as a -> 0; incidence peaks at t = tj
+    x = np.asarray(b) * (np.asarray(t, dtype=np.float64) - tj)
+    return L * (1 - np.exp(-np.exp(x)))  # type: ignore[no-any-return]
+
+
+def objective(
+    params: Parameters,
+    aux: int,
+    df: pd.DataFrame,
+) -> npt.NDArray[np.float64]:
+    window = df.shape[0]
+    pars = params.valuesdict()
+    t_range = np.arange(window, dtype=np.float64)
+    gompfun = equation(pars["L1"], pars["b1"], t_range, pars["tp1"])
+    mse = (df.casos_cum.values - gompfun) ** 2 / window
+    return mse  # type: ignore[no-any-return]
+
+
+def _jacobian(
+    p: npt.NDArray[np.float64], t: npt.NDArray[np.float64]
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    L, b, tp = (p[:, i : i + 1] for i in range(3))  # noqa: E203
+    ex = np.exp(np.clip(b * (t - tp), -50, 50))
+    g = np.exp(-ex)
+    f = L * (1 - g)
+    jac = np.stack([1 - g, L * g * ex * (t - tp), -L * g * ex * b], axis=-1)
+    return f, jac
+
+
+def fit_many(
+    series: npt.NDArray[np.float64],
+    n_grid: tuple[int, int] = (40, 61),
+    iterations: int = 50,
+) -> npt.NDArray[np.float64]:
+    # Least-squares fit of (L1, b1, tp1) for every row of `series`
+    # (cumulative cases, shape (n, T)) at once. For fixed (b1, tp1) the best
+    # L1 is closed form, so a grid of curve shapes is matched against all
+    # series with one matrix product, then refined by batched
+    # Levenberg-Marquardt steps
+    y = np.atleast_2d(np.asarray(series, dtype=np.float64))
+    n, window = y.shape
+    t = np.arange(window, dtype=np.float64)
+    L_max = 1.2 * np.maximum(y[:, -1], 1.0)
+
+    bs = np.geomspace(0.01, B_BOUNDS[1], n_grid[0])
+    tps = np.linspace(*TP_BOUNDS, n_grid[1])
+    bb, tt = (g.ravel() for g in np.meshgrid(bs, tps, indexing="ij"))
+    shapes = equation(1.0, bb[:, None], t, tt[:, None])
+    norms = (shapes**2).sum(axis=1)
+    dots = y @ shapes.T
+    best = np.argmax(dots**2 / norms, axis=1)
+    L = np.clip(dots[np.arange(n), best] / norms[best], 1.0, L_max)
+    p = np.column_stack([L, bb[best], tt[best]])
+
+    lower = np.column_stack(
+        [np.ones(n), np.full(n, B_BOUNDS[0]), np.full(n, TP_BOUNDS[0])]
+    )
+    upper = np.column_stack(
+        [L_max, np.full(n, B_BOUNDS[1]), np.full(n, TP_BOUNDS[1])]
+    )
+    lam = np.full(n, 1e-3)
+    f, jac = _jacobian(p, t)
+    cost = ((y - f) ** 2).sum(axis=1)
+    for _ in range(iterations):
+        jtj = np.einsum("ntk,ntl->nkl", jac, jac)
+        grad = np.einsum("ntk,nt->nk", jac, y - f)
+        diag = np.einsum("nkk->nk", jtj) + 1e-12
+        damped = jtj + (lam[:, None] * diag)[:, :, None] * np.eye(3)
+        step = np.linalg.solve(damped, grad[:, :, None])[:, :, 0]
+        trial = np.clip(p + step, lower, upper)
+        f_new, jac_new = _jacobian(trial, t)
+        cost_new = ((y - f_new) ** 2).sum(axis=1)
+        better = cost_new < cost
+        p = np.where(better[:, None], trial, p)
+        f = np.where(better[:, None], f_new, f)
+        jac = np.where(better[:, None, None], jac_new, jac)
+        cost = np.where(better, cost_new, cost)
+        lam = np.where(better, lam / 3, lam * 4)
+    return p
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Sequence
+
+import numpy as np
+import numpy.typing as npt
+from scipy import optimize
+
+# Same search settings lmfit uses for method="differential_evolution"
+DE_OPTIONS: dict[str, Any] = dict(
+    strategy="best1bin",
+    popsize=15,
+    tol=0.01,
+    mutation=(0.5, 1),
+    recombination=0.7,
+    polish=True,
+    init="latinhypercube",
+)
+
+
+def differential_evolution(
+    cost: Callable[..., npt.NDArray[np.float64] | float],
+    bounds: Sequence[tuple[float, float]],
+    args: tuple = (),
+    seed: int | None = None,
+    workers: int = 1,
+    **kwargs: Any,
+) -> optimize.OptimizeResult:
+    # With workers == 1 the whole population goes through `cost` in a
+    # single vectorized call; otherwise members are mapped over a process
+    # pool. Deferred updating makes both paths draw the same random stream,
+    # so a given seed yields the same parameters either way
+    options = {**DE_OPTIONS, **kwargs}
+    vectorized = workers == 1
+    ret = optimize.differential_evolution(
+        cost,
+        bounds,
+        args=args,
+        seed=seed,
+        workers=workers,
+        vectorized=vectorized,
+        updating="deferred",
+        **options,
+    )
+    if vectorized:
+        # scipy counts one evaluation per vectorized population call;
+        # report member evaluations as the pooled path does
+        generations = ret.nit + 1
+        size = options["popsize"] * len(bounds)
+        ret.nfev = generations * size + (ret.nfev - generations)
+    return ret
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import timedelta
+from typing import Sequence
 
 from epiweeks import Week
 from lmfit import Parameters
@@ -10,17 +11,24 @@ import pandas as pd
 
 from ..schemas import EpDuration, FittedCurve, RichardsPars, SIRPars
 
+A_MIN = 0.001
+A_MAX = 1.0
+# Weeks whose fitted incidence reaches this fraction of the peak are in
+# the epidemic, as counted by comp_duration
+PEAK_FRACTION = 0.05
+
 
-@np.vectorize
 def equation(  # noqa: E501
-    L: float,
-    a: float,
-    b: float,
+    L: float | npt.NDArray[np.float64],
+    a: float | npt.NDArray[np.float64],
+    b: float | npt.NDArray[np.float64],
     t: npt.NDArray[np.float64],
-    tj: float,
+    tj: float | npt.NDArray[np.float64],
 ) -> npt.NDArray[np.float64]:
+    # Plain broadcasting: parameters shaped (S, 1) against t shaped (T,)
+    # evaluate S curves at once
     return L - L * (  # type: ignore[no-any-return]
-        1 + a * np.exp(b * (t - tj))
+        1 + a * np.exp(b * (np.asarray(t, dtype=np.float64) - tj))
     ) ** (-1 / a)
 
 
@@ -44,6 +52,48 @@ def objective(
     return mse  # type: ignore[no-any-return]
 
 
+def residuals(
+    x: npt.NDArray[np.float64],
+    serie: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    # Per-week mse of `objective` for (gamma, L1, tp1, b1) given as a vector
+    # or as columns of a (4, S) population, with a1 derived and clipped as
+    # the `b1/(gamma + b1)` constraint is. Shape (T,) or (S, T)
+    pop = np.asarray(x, dtype=np.float64).reshape(4, -1).T
+    gamma, L, tp, b = np.split(pop, 4, axis=1)
+    a = np.clip(b / (gamma + b), A_MIN, A_MAX)
+    window = serie.shape[-1]
+    richfun = equation(L, a, b, np.arange(window, dtype=np.float64), tp)
+    mse = (serie - richfun) ** 2 / window
+    return mse if np.ndim(x) > 1 else mse[0]
+
+
+def population_cost(
+    x: npt.NDArray[np.float64],
+    serie: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64] | float:
+    # What lmfit minimizes for `objective`: the sum of squares of the
+    # per-week mse
+    cost = (residuals(x, serie) ** 2).sum(axis=-1)
+    return cost if np.ndim(x) > 1 else float(cost)
+
+
+def two_wave_residuals(
+    x: npt.NDArray[np.float64],
+    serie: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    # Residuals of the sum of two curves, x = (gamma, L, tp, b) of one wave
+    # followed by those of the other. Plain differences rather than the
+    # per-week mse: least squares over mse (a quartic loss) stalls far
+    # from the joint optimum of two overlapping waves
+    waves = np.asarray(x, dtype=np.float64).reshape(2, 4)
+    gamma, L, tp, b = waves.T
+    a = np.clip(b / (gamma + b), A_MIN, A_MAX)
+    t = np.arange(serie.shape[-1], dtype=np.float64)
+    richfun = equation(L[:, None], a[:, None], b[:, None], t, tp[:, None])
+    return serie - richfun.sum(axis=0)  # type: ignore[no-any-return]
+
+
 def get_SIR_pars(rp: RichardsPars | dict[str, float]) -> SIRPars:
     if isinstance(rp, dict):
         rp = RichardsPars.model_validate(rp)
@@ -59,7 +109,19 @@ def get_SIR_pars(rp: RichardsPars | dict[str, float]) -> SIRPars:
     )
 
 
-def comp_duration(curve: FittedCurve, tp1: float) -> EpDuration:
+def sum_res(
+    casos_cum: Sequence[float] | npt.NDArray[np.float64],
+    fitted: Sequence[float] | npt.NDArray[np.float64],
+) -> float:
+    # Sum of absolute residuals relative to the largest cumulative count,
+    # the fit quality reported as SirParams.sum_res
+    residuals = np.array(fitted) - np.array(casos_cum)
+    return float(sum(abs(residuals)) / max(casos_cum))
+
+
+def comp_duration(
+    curve: FittedCurve, tp1: float, peak_fraction: float = PEAK_FRACTION
+) -> EpDuration:
     richards_arr = np.array(curve.richards)
     df_aux = pd.DataFrame()
     df_aux["SE"] = [w.cdcformat() for w in curve.ew]
@@ -73,7 +135,9 @@ def comp_duration(curve: FittedCurve, tp1: float) -> EpDuration:
         ([0], np.diff(richards_arr)), axis=0
     )
     max_c = df_aux["diff_richards"].max()
-    df_aux = df_aux.loc[df_aux.diff_richards >= (0.05) * max_c].sort_index()
+    df_aux = df_aux.loc[
+        df_aux.diff_richards >= peak_fraction * max_c
+    ].sort_index()
 
     ini_str = str(df_aux["SE"].values[0])
     end_str = str(df_aux["SE"].values[-1])
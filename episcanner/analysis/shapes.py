@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+from loguru import logger
+import numpy as np
+import numpy.typing as npt
+
+from ..config import CACHEPATH
+from .richards import A_MAX, A_MIN, equation
+
+WINDOW = 52
+VERSION = 1
+GAMMAS = (0.3, 0.315, 0.33)
+N_B = 60
+N_TP = 61
+
+
+class ShapeIndex:
+    # Normalized Richards curves (L = 1) over a (gamma, tp1, b1) grid;
+    # a1 follows from the fit's b1/(gamma + b1) constraint, so the grid
+    # spans the feasible part of the (a, b, tp1) family
+    def __init__(
+        self, pars: npt.NDArray[np.float64], shapes: npt.NDArray[np.float64]
+    ) -> None:
+        self.pars = pars  # (G, 3): gamma, tp1, b1
+        self.shapes = shapes  # (G, window)
+
+    @classmethod
+    def build(cls, window: int = WINDOW) -> ShapeIndex:
+        grid = np.meshgrid(
+            np.array(GAMMAS),
+            np.linspace(5, 35, N_TP),
+            np.geomspace(1e-3, 1, N_B),
+            indexing="ij",
+        )
+        gamma, tp1, b1 = (g.ravel()[:, None] for g in grid)
+        a1 = np.clip(b1 / (gamma + b1), A_MIN, A_MAX)
+        t = np.arange(window, dtype=np.float64)
+        shapes = equation(1.0, a1, b1, t, tp1)
+        return cls(np.hstack([gamma, tp1, b1]), shapes)
+
+    @classmethod
+    def load(
+        cls, window: int = WINDOW, cache: Path | None = None
+    ) -> ShapeIndex:
+        cache = CACHEPATH / "shapes" if cache is None else Path(cache)
+        file = cache / f"richards_w{window}_v{VERSION}.npz"
+        if file.exists():
+            with np.load(file) as npz:
+                return cls(npz["pars"], npz["shapes"])
+        index = cls.build(window)
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(file, pars=index.pars, shapes=index.shapes)
+        except OSError as e:  # pragma: no cover
+            logger.warning(f"Could not cache shape index at {file}: {e}")
+        return index
+
+    def match(
+        self, series: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        # Nearest shape for each cumulative series (rows of `series`), with
+        # its least-squares scale L1 in closed form. Returns (n, 4) rows of
+        # (gamma, L1, tp1, b1), the parameter order of population_cost
+        y = np.atleast_2d(np.asarray(series, dtype=np.float64))
+        shapes = self.shapes[:, : y.shape[1]]
+        norms = (shapes**2).sum(axis=1)
+        dots = y @ shapes.T
+        best = np.argmax(dots**2 / norms, axis=1)
+        L1 = dots[np.arange(len(y)), best] / norms[best]
+        L1 = np.clip(L1, 1.0, 1.2 * np.maximum(y[:, -1], 1.0))
+        gamma, tp1, b1 = self.pars[best].T
+        return np.column_stack([gamma, L1, tp1, b1])
+
+
+@lru_cache(maxsize=8)
+def shape_index(window: int = WINDOW) -> ShapeIndex:
+    return ShapeIndex.load(max(window, WINDOW))
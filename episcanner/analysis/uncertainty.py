@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+import numpy.typing as npt
+from scipy.stats import norm
+
+CI_LEVEL = 0.95
+# Levenberg-Marquardt steps per bootstrap refit; replicates start at the
+# fit itself, so few are needed
+BOOTSTRAP_ITERATIONS = 20
+
+# Maps parameter rows, shape (n, k), to one output row each, shape (n, m)
+Rows = Callable[[npt.NDArray[np.float64]], npt.NDArray[np.float64]]
+
+
+def jacobian(
+    f: Rows,
+    x: npt.NDArray[np.float64],
+    upper: npt.NDArray[np.float64],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    # f at the rows of `x` and its forward differences, shape (n, m, k).
+    # Steps at an upper bound go backwards, so f is never evaluated
+    # outside the bounds
+    x = np.atleast_2d(x)
+    f0 = f(x)
+    h = 1e-6 * np.maximum(np.abs(x), 1e-3)
+    h = np.where(x + h > upper, -h, h)
+    columns = []
+    for j in range(x.shape[1]):
+        xj = x.copy()
+        xj[:, j] += h[:, j]
+        columns.append((f(xj) - f0) / h[:, j : j + 1])  # noqa: E203
+    return f0, np.stack(columns, axis=-1)
+
+
+def linear_intervals(
+    curves: Rows,
+    quantities: Rows,
+    x: npt.NDArray[np.float64],
+    serie: npt.NDArray[np.float64],
+    upper: npt.NDArray[np.float64],
+    level: float = CI_LEVEL,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    # Wald intervals of `quantities` at the fit `x` of the cumulative
+    # `serie`: the least squares covariance s^2 (J^T J)^-1 of the
+    # parameters, propagated by the delta method. It assumes independent
+    # residuals, which cumulative series are not, so the intervals are
+    # narrower than the bootstrap's. Rows of a 2-D `x`, `serie` and
+    # `upper` are separate fits, all computed at once, with (n, m) bounds
+    rows = np.ndim(x) == 2
+    x, serie = np.atleast_2d(x), np.atleast_2d(serie)
+    f, jac = jacobian(curves, x, upper)
+    residuals = serie - f
+    dof = max(1, serie.shape[1] - x.shape[1])
+    s2 = np.einsum("nt,nt->n", residuals, residuals) / dof
+    jtj = np.einsum("ntk,ntl->nkl", jac, jac)
+    cov = s2[:, None, None] * np.linalg.pinv(jtj)
+    q, grad = jacobian(quantities, x, upper)
+    var = np.einsum("nmk,nkl,nml->nm", grad, cov, grad)
+    se = np.sqrt(np.maximum(var, 0.0))
+    z = norm.ppf(0.5 + level / 2)
+    lo, hi = q - z * se, q + z * se
+    return (lo, hi) if rows else (lo[0], hi[0])
+
+
+def bootstrap_intervals(
+    curves: Rows,
+    quantities: Rows,
+    x: npt.NDArray[np.float64],
+    cases: npt.NDArray[np.float64],
+    lower: npt.NDArray[np.float64],
+    upper: npt.NDArray[np.float64],
+    replicates: int,
+    seed: int | None = None,
+    level: float = CI_LEVEL,
+    iterations: int = BOOTSTRAP_ITERATIONS,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    # Percentile intervals of `quantities` from a residual bootstrap of
+    # the fit `x` to weekly `cases`: the centered weekly residuals are
+    # resampled onto the fitted incidence, and all replicates are refitted
+    # at once by batched Levenberg-Marquardt steps started from `x`, like
+    # gompertz.fit_many, instead of a global search each
+    rng = np.random.default_rng(seed)
+    incidence = np.diff(curves(x[None])[0], prepend=0.0)
+    residuals = cases - incidence
+    draws = rng.choice(residuals - residuals.mean(), (replicates, len(cases)))
+    y = np.cumsum(incidence + draws, axis=1)
+
+    k = len(x)
+    p = np.tile(x, (replicates, 1))
+    lam = np.full(replicates, 1e-3)
+    f, jac = jacobian(curves, p, upper)
+    cost = ((y - f) ** 2).sum(axis=1)
+    for _ in range(iterations):
+        jtj = np.einsum("ntk,ntl->nkl", jac, jac)
+        grad = np.einsum("ntk,nt->nk", jac, y - f)
+        diag = np.einsum("nkk->nk", jtj) + 1e-12
+        damped = jtj + (lam[:, None] * diag)[:, :, None] * np.eye(k)
+        step = np.linalg.solve(damped, grad[:, :, None])[:, :, 0]
+        trial = np.clip(p + step, lower, upper)
+        f_new, jac_new = jacobian(curves, trial, upper)
+        cost_new = ((y - f_new) ** 2).sum(axis=1)
+        better = cost_new < cost
+        p = np.where(better[:, None], trial, p)
+        f = np.where(better[:, None], f_new, f)
+        jac = np.where(better[:, None, None], jac_new, jac)
+        cost = np.where(better, cost_new, cost)
+        lam = np.where(better, lam / 3, lam * 4)
+
+    q = quantities(p)
+    tail = 50 * (1 - level)
+    lo, hi = np.percentile(q, [tail, 100 - tail], axis=0)
+    return lo, hi
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+__all__ = ["BenchmarkCase", "main", "pareto", "reference_corpus", "run"]
+
+import argparse
+import time
+from typing import Sequence
+
+from loguru import logger
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from pydantic import BaseModel, ConfigDict
+
+from .analysis.richards import A_MAX, A_MIN, equation, sum_res
+from .models import Richards
+from .types import _FIT_ENGINES, FitEngine
+
+WINDOW = 52
+ENGINES = tuple(sorted(_FIT_ENGINES))
+# Relative error is reported on the parameters that drive the exports:
+# total cases, peak week and growth rate
+ERROR_PARAMS = ("L", "tp1", "b")
+
+
+class BenchmarkCase(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    cases: npt.NDArray[np.float64]  # weekly cases, the input of fit
+    truth: dict[str, float]  # Richards parameters that generated them
+
+
+def reference_corpus(
+    n: int = 20, window: int = WINDOW, seed: int = 0
+) -> list[BenchmarkCase]:
+    # `n` exact Richards curves with parameters drawn inside the fit
+    # bounds, plus the same curves with negative binomial reporting noise,
+    # the shape of real alert series
+    rng = np.random.default_rng(seed)
+    gamma = rng.uniform(0.3, 0.33, n)
+    b = rng.uniform(0.1, 0.8, n)
+    tp1 = rng.uniform(10, 30, n)
+    L = 10 ** rng.uniform(2.5, 4.5, n)
+    a = np.clip(b / (gamma + b), A_MIN, A_MAX)
+    t = np.arange(window, dtype=np.float64)
+    cum = equation(L[:, None], a[:, None], b[:, None], t, tp1[:, None])
+    weekly = np.diff(cum, axis=1, prepend=0.0)
+
+    corpus = []
+    for i in range(n):
+        truth = {
+            "L": float(L[i]),
+            "a": float(a[i]),
+            "b": float(b[i]),
+            "tp1": float(tp1[i]),
+            "gamma": float(gamma[i]),
+        }
+        corpus.append(
+            BenchmarkCase(name=f"synthetic-{i}", cases=weekly[i], truth=truth)
+        )
+        # Dispersion 10: variance mu + mu^2/10
+        mu = np.maximum(weekly[i], 1e-9)
+        noisy = rng.negative_binomial(10, 10 / (10 + mu)).astype(np.float64)
+        corpus.append(
+            BenchmarkCase(name=f"noisy-{i}", cases=noisy, truth=truth)
+        )
+    return corpus
+
+
+def run(
+    engines: Sequence[FitEngine] = ENGINES,
+    corpus: Sequence[BenchmarkCase] | None = None,
+    seed: int | None = 0,
+) -> pd.DataFrame:
+    # One row per engine and case: wall time, objective evaluations,
+    # sum_res and relative error of each ERROR_PARAMS parameter
+    corpus = reference_corpus() if corpus is None else corpus
+    rows = []
+    for engine in engines:
+        logger.info(f"Benchmarking {engine} on {len(corpus)} series")
+        for case in corpus:
+            t0 = time.perf_counter()
+            model = Richards._fit_cases(case.cases, engine=engine, seed=seed)
+            seconds = time.perf_counter() - t0
+            fitted = model.evaluate(np.arange(len(case.cases), dtype=float))
+            row = {
+                "engine": engine,
+                "case": case.name,
+                "seconds": seconds,
+                "nfev": model.nfev,
+                "sum_res": sum_res(np.cumsum(case.cases), fitted),
+                "tier": model.tier,
+            }
+            for p in ERROR_PARAMS:
+                true = case.truth[p]
+                row[f"{p}_error"] = abs(getattr(model, p) - true) / abs(true)
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def pareto(results: pd.DataFrame) -> pd.DataFrame:
+    # Per engine totals and medians; an engine is on the front when no
+    # other one is both faster and has a lower median sum_res
+    errors = [f"{p}_error" for p in ERROR_PARAMS]
+    table = results.groupby("engine").agg(
+        seconds=("seconds", "sum"),
+        median_seconds=("seconds", "median"),
+        nfev=("nfev", "median"),
+        sum_res=("sum_res", "median"),
+        worst_sum_res=("sum_res", "max"),
+        **{e: (e, "median") for e in errors},
+    )
+    speed, quality = table["seconds"], table["sum_res"]
+    table["pareto"] = [
+        not ((speed < s) & (quality <= q) | (speed <= s) & (quality < q)).any()
+        for s, q in zip(speed, quality)
+    ]
+    return table.sort_values("seconds")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare Richards fit engines on a reference corpus"
+    )
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES))
+    parser.add_argument("-n", type=int, default=20, help="curves per kind")
+    parser.add_argument("--window", type=int, default=WINDOW)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="CSV file for the per-case rows")
+    args = parser.parse_args(argv)
+
+    results = run(
+        args.engines, reference_corpus(args.n, args.window, args.seed)
+    )
+    if args.output:
+        results.to_csv(args.output, index=False)
+    print(pareto(results).to_string(float_format="{:.4g}".format))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,86 @@
+__all__ = ["Checkpoint", "job_key"]
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Sequence
+
+from loguru import logger
+
+from .compact import AlertaTable
+from .models import MODELS, AnalysisModel
+from .schemas import AlertaRow, SirParams
+
+
+def job_key(data: Sequence[AlertaRow], year: int, **options: Any) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{year}|{sorted(options.items())!r}".encode())
+    if isinstance(data, AlertaTable):
+        digest.update(data.digest().encode())
+        return digest.hexdigest()[:16]
+    for r in sorted(data, key=lambda r: (r.disease, r.geocode, r.ew)):
+        row = (
+            f"{r.disease},{r.geocode},{r.ew.cdcformat()},"
+            f"{r.casos_est!r},{r.p_rt1!r};"
+        )
+        digest.update(row.encode())
+    return digest.hexdigest()[:16]
+
+
+class Checkpoint:
+    def __init__(self, path: str | Path, every: int = 10) -> None:
+        self.path = Path(path)
+        self.every = every
+        # Keyed by (disease, geocode), the partition keys of the scan
+        self.results: dict[tuple[str, int], SirParams] = {}
+        self.fits: dict[tuple[str, int], dict] = {}
+        self._pending: list[str] = []
+        if self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        with self.path.open() as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line of a job killed mid-write
+                    logger.warning(f"Ignoring truncated record in {self.path}")
+                    continue
+                params = SirParams.model_validate(record["params"])
+                key = (params.disease, params.geocode)
+                self.results[key] = params
+                self.fits[key] = record["fit"]
+        logger.info(
+            f"Resuming from {self.path}: {len(self.results)} geocodes done"
+        )
+
+    def add(self, params: SirParams, model: AnalysisModel) -> None:
+        fit = {"model": type(model).__name__, **model.params()}
+        key = (params.disease, params.geocode)
+        self.results[key] = params
+        self.fits[key] = fit
+        self._pending.append(
+            json.dumps({"params": params.model_dump(), "fit": fit})
+        )
+        if len(self._pending) >= self.every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.write("\n".join(self._pending) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending.clear()
+
+    def model(self, geocode: int, disease: str = "dengue") -> AnalysisModel:
+        fit = dict(self.fits[(disease, geocode)])
+        return MODELS[fit.pop("model")](**fit)
+
+    def remove(self) -> None:
+        self._pending.clear()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+__all__ = ["RichardsCollection"]
+
+from pathlib import Path
+from typing import Hashable, Mapping, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from .analysis.richards import equation
+from .models import Richards
+
+FloatArray = npt.NDArray[np.float64]
+PARAMS = ("L", "a", "b", "tp1", "gamma")
+
+
+class RichardsCollection:
+    # Fitted Richards models of many cities as aligned arrays, one entry
+    # per (disease, geocode). Curves, SIR parameters and residuals are
+    # computed for every city at once, and the arrays round-trip through
+    # an uncompressed npz file
+    def __init__(
+        self,
+        geocode: Sequence[int] | npt.NDArray[np.int64],
+        L: Sequence[float] | FloatArray,
+        a: Sequence[float] | FloatArray,
+        b: Sequence[float] | FloatArray,
+        tp1: Sequence[float] | FloatArray,
+        gamma: Sequence[float] | FloatArray,
+        disease: Sequence[str] | npt.NDArray[np.str_] | None = None,
+    ) -> None:
+        self.geocode = np.asarray(geocode, dtype=np.int64)
+        self.L = np.asarray(L, dtype=np.float64)
+        self.a = np.asarray(a, dtype=np.float64)
+        self.b = np.asarray(b, dtype=np.float64)
+        self.tp1 = np.asarray(tp1, dtype=np.float64)
+        self.gamma = np.asarray(gamma, dtype=np.float64)
+        self.disease = np.asarray(
+            ["dengue"] * len(self.geocode) if disease is None else disease,
+            dtype=np.str_,
+        )
+        self._index = {
+            (d, g): i
+            for i, (d, g) in enumerate(
+                zip(self.disease.tolist(), self.geocode.tolist())
+            )
+        }
+
+    @classmethod
+    def from_models(
+        cls, models: Mapping[Hashable, Richards]
+    ) -> RichardsCollection:
+        # Keys as returned by scan (geocode) or iter_scan over
+        # partition_diseases ((disease, geocode))
+        keys = [k if isinstance(k, tuple) else ("dengue", k) for k in models]
+        pars = np.array(
+            [[getattr(m, p) for p in PARAMS] for m in models.values()],
+            dtype=np.float64,
+        ).reshape(-1, len(PARAMS))
+        return cls(
+            [g for _, g in keys],
+            L=pars[:, 0],
+            a=pars[:, 1],
+            b=pars[:, 2],
+            tp1=pars[:, 3],
+            gamma=pars[:, 4],
+            disease=[d for d, _ in keys],
+        )
+
+    def __len__(self) -> int:
+        return len(self.geocode)
+
+    def position(self, geocode: int, disease: str = "dengue") -> int:
+        return self._index[disease, geocode]
+
+    def model(self, geocode: int, disease: str = "dengue") -> Richards:
+        i = self.position(geocode, disease)
+        return Richards(**{p: float(getattr(self, p)[i]) for p in PARAMS})
+
+    def evaluate(self, t: FloatArray) -> FloatArray:
+        # Curves of every city at `t`, shape (n, len(t))
+        return equation(
+            self.L[:, None],
+            self.a[:, None],
+            self.b[:, None],
+            np.asarray(t, dtype=np.float64),
+            self.tp1[:, None],
+        )
+
+    def get_SIR_pars(self) -> dict[str, FloatArray]:
+        # SIRPars fields as arrays, by the formulas of get_SIR_pars
+        beta = self.b / self.a
+        gamma = beta - self.b
+        return {
+            "beta": beta,
+            "gamma": gamma,
+            "R0": beta / gamma,
+            "tc": self.tp1,
+        }
+
+    def sum_res(self, casos_cum: FloatArray) -> FloatArray:
+        # sum_res of every city against its cumulative cases, stacked as
+        # (n, T) in collection order
+        casos_cum = np.asarray(casos_cum, dtype=np.float64)
+        fitted = self.evaluate(np.arange(casos_cum.shape[1], dtype=np.float64))
+        res = np.abs(fitted - casos_cum).sum(axis=1)
+        return res / casos_cum.max(axis=1)  # type: ignore[no-any-return]
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            np.savez(
+                f,
+                geocode=self.geocode,
+                disease=self.disease,
+                **{p: getattr(self, p) for p in PARAMS},
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> RichardsCollection:
+        with np.load(path) as npz:
+            return cls(
+                npz["geocode"],
+                L=npz["L"],
+                a=npz["a"],
+                b=npz["b"],
+                tp1=npz["tp1"],
+                gamma=npz["gamma"],
+                disease=npz["disease"],
+            )
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+__all__ = ["AlertaTable", "CurveStore", "column"]
+
+from collections.abc import Sequence
+from functools import lru_cache
+import hashlib
+from pathlib import Path
+from typing import Any, Iterable, overload
+
+from epiweeks import Week
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import pyarrow as pa
+
+from .schemas import (
+    AlertaData,
+    AlertaRow,
+    AlertRow,
+    FittedCurve,
+    SirParams,
+    parse_alerta,
+)
+from .types import _DISEASES, _parse_disease
+
+# Disease codes of the int8 column, in a fixed order
+DISEASES = tuple(sorted(_DISEASES))
+_CODES = {d: i for i, d in enumerate(DISEASES)}
+COLUMNS = ("ew", "casos_est", "geocode", "p_rt1", "disease")
+
+IntArray = npt.NDArray[np.int32]
+FloatArray = npt.NDArray[np.float32]
+
+
+def _week_code(ew: Week) -> int:
+    # Epiweeks as CDC ordinals (yyyyww), which sort like Week objects
+    return ew.year * 100 + ew.week
+
+
+def _code_week(code: int) -> Week:
+    return Week(code // 100, code % 100)
+
+
+class AlertaTable(Sequence[AlertaRow]):
+    # Parsed input as aligned arrays: float32 values, int32 geocodes and
+    # epiweek ordinals, int8 disease codes. Indexing builds AlertaRows on
+    # demand, so code written for row lists reads it unchanged; screening
+    # and fitting read the columns directly and promote to float64 only in
+    # the optimizer
+    def __init__(
+        self,
+        ew: IntArray,
+        casos_est: FloatArray,
+        geocode: IntArray,
+        p_rt1: FloatArray,
+        disease: npt.NDArray[np.int8],
+        grouped: bool = False,
+    ) -> None:
+        self.ew = ew
+        self.casos_est = casos_est
+        self.geocode = geocode
+        self.p_rt1 = p_rt1
+        self.disease = disease
+        # Rows ordered by (disease, geocode, ew), as `sort` leaves them:
+        # grouping then needs no sort and week windows no mask
+        self.grouped = grouped
+        # (path, first row) when the columns are a contiguous slice of a
+        # memory-mapped snapshot, which pickles as that reference
+        self.source: tuple[str, int] | None = None
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[AlertaRow]) -> AlertaTable:
+        return cls(
+            np.array([_week_code(r.ew) for r in rows], dtype=np.int32),
+            np.array([r.casos_est for r in rows], dtype=np.float32),
+            np.array([r.geocode for r in rows], dtype=np.int32),
+            np.array([r.p_rt1 for r in rows], dtype=np.float32),
+            np.array([_CODES[r.disease] for r in rows], dtype=np.int8),
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> AlertaTable:
+        # Same columns and aliases as parse_alerta, converted per column
+        # instead of through one AlertaRow per line
+        if "ew" in df:
+            ew = np.array([_week_code(w) for w in df["ew"]], dtype=np.int32)
+        elif "SE" in df:
+            ew = df["SE"].to_numpy(dtype=np.int32)
+        elif "data_iniSE" in df:
+            dates = pd.to_datetime(df["data_iniSE"])
+            codes = {d: _week_code(Week.fromdate(d)) for d in dates.unique()}
+            ew = dates.map(codes).to_numpy(dtype=np.int32)
+        else:
+            raise ValueError("Cannot derive Week: no ew, SE or data_iniSE")
+        if "geocode" in df:
+            geocode = df["geocode"].to_numpy(dtype=np.int32)
+        elif "municipio_geocodigo" in df:
+            geocode = df["municipio_geocodigo"].to_numpy(dtype=np.int32)
+        else:
+            geocode = np.zeros(len(df), dtype=np.int32)
+        if "disease" in df:
+            codes = {d: _CODES[_parse_disease(d)] for d in df.disease.unique()}
+            disease = df["disease"].map(codes).to_numpy(dtype=np.int8)
+        else:
+            disease = np.full(len(df), _CODES["dengue"], dtype=np.int8)
+        return cls(
+            ew,
+            df["casos_est"].to_numpy(dtype=np.float32),
+            geocode,
+            df["p_rt1"].to_numpy(dtype=np.float32),
+            disease,
+        )
+
+    @classmethod
+    def from_data(cls, data: AlertaData | AlertaTable) -> AlertaTable:
+        if isinstance(data, AlertaTable):
+            return data
+        if isinstance(data, pd.DataFrame):
+            return cls.from_frame(data)
+        return cls.from_rows(parse_alerta(data))
+
+    @classmethod
+    def concat(cls, tables: Iterable[AlertaTable]) -> AlertaTable:
+        tables = list(tables) or [cls.from_rows([])]
+        return cls(
+            *(
+                np.concatenate([getattr(t, name) for t in tables])
+                for name in COLUMNS
+            )
+        )
+
+    @classmethod
+    def from_ipc(cls, path: str | Path) -> AlertaTable:
+        # Memory-maps an Arrow IPC file written by `to_ipc`. The columns
+        # are read-only views of the mapped pages, which every process
+        # mapping the file shares, and the mapping is kept per process
+        table = _map(str(Path(path).absolute()))
+        return table[:]
+
+    def to_ipc(self, path: str | Path) -> None:
+        # One uncompressed record batch, so `from_ipc` maps every column
+        # without a copy
+        batch = pa.record_batch(
+            [pa.array(getattr(self, name)) for name in COLUMNS],
+            names=list(COLUMNS),
+            metadata={"grouped": str(int(self.grouped))},
+        )
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, batch.schema) as writer:
+                writer.write_batch(batch)
+
+    def __len__(self) -> int:
+        return len(self.ew)
+
+    @overload
+    def __getitem__(self, index: int) -> AlertaRow:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice | npt.NDArray[Any]) -> AlertaTable:
+        ...
+
+    def __getitem__(
+        self, index: int | slice | npt.NDArray[Any]
+    ) -> AlertaRow | AlertaTable:
+        if isinstance(index, slice):
+            start, _, step = index.indices(len(self))
+            table = AlertaTable(
+                **{name: getattr(self, name)[index] for name in COLUMNS},
+                grouped=self.grouped and step == 1,
+            )
+            if self.source is not None and step == 1:
+                table.source = (self.source[0], self.source[1] + start)
+            return table
+        if isinstance(index, np.ndarray):
+            # Masks keep the row order, integer indices reorder
+            return AlertaTable(
+                **{name: getattr(self, name)[index] for name in COLUMNS},
+                grouped=self.grouped and index.dtype == np.bool_,
+            )
+        return AlertaRow(
+            ew=_code_week(int(self.ew[index])),
+            casos_est=float(self.casos_est[index]),
+            geocode=int(self.geocode[index]),
+            p_rt1=float(self.p_rt1[index]),
+            disease=DISEASES[self.disease[index]],
+        )
+
+    def __reduce_ex__(self, protocol: Any) -> Any:
+        # Snapshot slices travel to pool workers as (path, rows), and the
+        # worker maps the same file instead of unpickling a copy
+        if self.source is None:
+            return super().__reduce_ex__(protocol)
+        path, start = self.source
+        return _mapped_rows, (path, start, start + len(self))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in COLUMNS)
+
+    def diseases(self) -> set[str]:
+        return {DISEASES[c] for c in np.unique(self.disease)}
+
+    def groups(
+        self, by_disease: bool = True
+    ) -> dict[Any, Sequence[AlertaRow]]:
+        # Partitions sorted by epiweek, keyed like AnalysisModel.partition
+        # (geocode) or partition_diseases ((disease, geocode)). Rows are
+        # sorted once, unless already grouped, and each partition is a
+        # view of that copy
+        if by_disease or len(self.diseases()) <= 1:
+            table = self.sort()
+        else:
+            table = self[np.lexsort((self.ew, self.geocode))]
+        pairs = np.column_stack([table.disease, table.geocode])
+        if not by_disease:
+            pairs[:, 0] = 0
+        starts = np.flatnonzero(
+            np.r_[True, (pairs[1:] != pairs[:-1]).any(axis=1)]
+        )
+        bounds = np.r_[starts, len(table)]
+        groups: dict[Any, Sequence[AlertaRow]] = {}
+        for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            geocode = int(table.geocode[lo])
+            key: Any = geocode
+            if by_disease:
+                key = (DISEASES[table.disease[lo]], geocode)
+            groups[key] = table[lo:hi]
+        return groups
+
+    def sort(self) -> AlertaTable:
+        # Rows ordered by (disease, geocode, ew)
+        if self.grouped:
+            return self
+        table: AlertaTable = self[
+            np.lexsort((self.ew, self.geocode, self.disease))
+        ]
+        table.grouped = True
+        return table
+
+    def window(self, start: int, end: int) -> AlertaTable:
+        # Rows with epiweek ordinals in [start, end]. Within one grouped
+        # partition, which the first and last rows tell apart, the weeks
+        # are sorted and the window is a slice
+        if self.grouped and self._partition():
+            lo = int(np.searchsorted(self.ew, start, side="left"))
+            hi = int(np.searchsorted(self.ew, end, side="right"))
+            return self[lo:hi]
+        return self[(self.ew >= start) & (self.ew <= end)]
+
+    def _partition(self) -> bool:
+        return len(self) == 0 or (
+            self.disease[0] == self.disease[-1]
+            and self.geocode[0] == self.geocode[-1]
+        )
+
+    def digest(self) -> str:
+        # Content hash independent of row order, for checkpoint job keys
+        order = np.lexsort((self.ew, self.geocode, self.disease))
+        digest = hashlib.sha256()
+        for name in ("disease", "geocode", "ew", "casos_est", "p_rt1"):
+            digest.update(getattr(self, name)[order].tobytes())
+        return digest.hexdigest()
+
+
+@lru_cache(maxsize=8)
+def _map(path: str) -> AlertaTable:
+    # Snapshot files are named by content and replaced atomically, so a
+    # path keeps its mapping for the life of the process
+    reader = pa.ipc.open_file(pa.memory_map(path))
+    batch = reader.get_batch(0)
+    table = AlertaTable(
+        **{
+            name: batch.column(name).to_numpy(zero_copy_only=True)
+            for name in COLUMNS
+        },
+        grouped=(reader.schema.metadata or {}).get(b"grouped") == b"1",
+    )
+    table.source = (path, 0)
+    return table
+
+
+def _mapped_rows(path: str, start: int, stop: int) -> AlertaTable:
+    return _map(path)[start:stop]
+
+
+def column(
+    rows: Sequence[AlertRow | AlertaRow], name: str
+) -> npt.NDArray[Any]:
+    # A numeric field of `rows` as an array: the stored column of an
+    # AlertaTable, or one built from a row list. "ew" gives the epiweek
+    # ordinals either way
+    if isinstance(rows, AlertaTable):
+        return getattr(rows, name)  # type: ignore[no-any-return]
+    if name == "ew":
+        return np.array([_week_code(r.ew) for r in rows], dtype=np.int32)
+    return np.array([getattr(r, name) for r in rows], dtype=np.float64)
+
+
+class CurveStore:
+    # Fitted curves for export, kept as float32 values and int32 epiweek
+    # ordinals instead of lists of Weeks and Python floats. `append` takes
+    # the (params, curve) pairs a plain list would hold
+    def __init__(self) -> None:
+        self.params: list[tuple[int, int, str]] = []
+        self.sizes: list[int] = []
+        self._ew: list[IntArray] = []
+        self._casos_cum: list[FloatArray] = []
+        self._richards: list[FloatArray] = []
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def append(self, item: tuple[SirParams, FittedCurve]) -> None:
+        params, curve = item
+        self.params.append((params.geocode, params.year, params.disease))
+        self.sizes.append(len(curve.ew))
+        self._ew.append(
+            np.array([_week_code(w) for w in curve.ew], dtype=np.int32)
+        )
+        self._casos_cum.append(np.array(curve.casos_cum, dtype=np.float32))
+        self._richards.append(np.array(curve.richards, dtype=np.float32))
+
+    def frame(self) -> pd.DataFrame:
+        # The columns and dtypes of results.curves_frame
+        sizes = np.array(self.sizes, dtype=np.int64)
+        starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+        geocode, year, disease = (
+            zip(*self.params) if self.params else ((),) * 3
+        )
+        ew = np.concatenate(self._ew) if self._ew else np.array([], np.int32)
+        df = pd.DataFrame(
+            {
+                "geocode": np.repeat(np.array(geocode, np.int64), sizes),
+                "year": np.repeat(np.array(year, np.int64), sizes),
+                "disease": np.repeat(np.array(disease, object), sizes),
+                "t": np.arange(sizes.sum(), dtype=np.int64) - starts,
+                "ew": [f"{c // 100}{c % 100:02d}" for c in ew.tolist()],
+                "casos_cum": _concat64(self._casos_cum),
+                "richards": _concat64(self._richards),
+            }
+        )
+        return df.astype({"disease": "string", "ew": "string"})
+
+
+def _concat64(arrays: list[FloatArray]) -> npt.NDArray[np.float64]:
+    if not arrays:
+        return np.array([], dtype=np.float64)
+    return np.concatenate(arrays).astype(np.float64)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+__all__ = ["GeometryStore"]
+
+from functools import lru_cache
+import hashlib
+from pathlib import Path
+
+import geopandas as gpd
+from loguru import logger
+import pandas as pd
+from pydantic import TypeAdapter
+
+from .config import CACHEPATH
+from .types import UF, UF_IBGE
+
+# Degrees in GEOMETRY_CRS, about 100 m at Brazilian latitudes: enough for
+# state and country maps, and a fraction of the original vertices
+SIMPLIFY_TOLERANCE = 0.001
+GEOMETRY_CRS = "EPSG:4326"
+# Geocode columns of the usual municipality layers: IBGE shapefiles
+# (CD_MUN, CD_GEOCMU), geobr (code_muni) and the AlertaDengue tables
+GEOCODE_COLUMNS = ("geocode", "code_muni", "CD_MUN", "CD_GEOCMU", "geocodigo")
+
+
+class GeometryStore:
+    # Municipality geometries indexed by geocode, reprojected to
+    # GEOMETRY_CRS and simplified once. `from_file` caches the simplified
+    # layer in the process and as GeoParquet under CACHEPATH/geometries,
+    # keyed by the source file's path, mtime and the tolerance, so exports
+    # for every UF and later runs skip the read and the simplification.
+    # Caching a new mtime of a source removes its older ones
+    def __init__(self, geometries: gpd.GeoSeries) -> None:
+        self.geometries = geometries
+
+    @classmethod
+    def from_frame(
+        cls,
+        gdf: gpd.GeoDataFrame,
+        tolerance: float = SIMPLIFY_TOLERANCE,
+        geocode_column: str | None = None,
+    ) -> GeometryStore:
+        if geocode_column is None:
+            found = [c for c in GEOCODE_COLUMNS if c in gdf.columns]
+            if not found:
+                raise ValueError(
+                    "No geocode column. Options: "
+                    f"{', '.join(GEOCODE_COLUMNS)}, or pass geocode_column"
+                )
+            geocode_column = found[0]
+        if gdf.crs is None:
+            gdf = gdf.set_crs(GEOMETRY_CRS)
+        geometries = (
+            gdf.geometry.to_crs(GEOMETRY_CRS)
+            .simplify(tolerance, preserve_topology=True)
+            .rename("geometry")
+        )
+        geometries.index = pd.Index(
+            gdf[geocode_column].astype("int64"), name="geocode"
+        )
+        return cls(geometries[~geometries.index.duplicated()].sort_index())
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str | Path,
+        tolerance: float = SIMPLIFY_TOLERANCE,
+        geocode_column: str | None = None,
+        cache_dir: str | Path | None = None,
+    ) -> GeometryStore:
+        # GeoParquet sources are read with pyarrow, anything else (e.g.
+        # shapefiles, GeoPackages, GeoJSON) through geopandas.read_file
+        path = Path(path).absolute()
+        return _load(
+            str(path),
+            path.stat().st_mtime_ns,
+            tolerance,
+            geocode_column,
+            str(CACHEPATH / "geometries" if cache_dir is None else cache_dir),
+        )
+
+    def __len__(self) -> int:
+        return len(self.geometries)
+
+    def __contains__(self, geocode: object) -> bool:
+        return geocode in self.geometries.index
+
+    def uf(self, uf: UF) -> gpd.GeoSeries:
+        code = UF_IBGE[TypeAdapter(UF).validate_python(uf)]
+        return self.geometries[self.geometries.index // 100_000 == code]
+
+    def join(self, df: pd.DataFrame) -> gpd.GeoDataFrame:
+        # `df` with a geometry column matched on its geocode column, row
+        # order kept. Cities without a geometry get a missing one
+        geometry = df["geocode"].map(self.geometries)
+        missing = int(geometry.isna().sum())
+        if missing:
+            logger.warning(f"{missing} geocodes have no geometry")
+        return gpd.GeoDataFrame(
+            df.assign(geometry=geometry.to_numpy()),
+            geometry="geometry",
+            crs=GEOMETRY_CRS,
+        )
+
+
+@lru_cache(maxsize=8)
+def _load(
+    path: str,
+    mtime_ns: int,
+    tolerance: float,
+    geocode_column: str | None,
+    cache_dir: str,
+) -> GeometryStore:
+    source = hashlib.sha256(
+        f"{path}:{tolerance}:{geocode_column}".encode()
+    ).hexdigest()[:16]
+    prefix = f"{Path(path).stem}_{source}_"
+    cached = Path(cache_dir) / f"{prefix}{mtime_ns}.parquet"
+    if cached.exists():
+        return GeometryStore(gpd.read_parquet(cached).geometry)
+
+    if path.endswith(".parquet"):
+        gdf = gpd.read_parquet(path)
+    else:
+        gdf = gpd.read_file(path)
+    store = GeometryStore.from_frame(gdf, tolerance, geocode_column)
+    logger.info(f"Simplified {len(store)} geometries from {path}")
+
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    for stale in cached.parent.glob(f"{prefix}*.parquet"):
+        stale.unlink(missing_ok=True)
+    store.geometries.to_frame().to_parquet(cached)
+    return store
@@ -0,0 +1,138 @@
+__all__ = [
+    "MemoryMonitor",
+    "ResourcePlan",
+    "StageMemory",
+    "estimate_memory",
+    "plan_resources",
+]
+
+from contextlib import contextmanager
+import os
+import threading
+import time
+from typing import Iterator
+
+from loguru import logger
+import psutil
+from pydantic import BaseModel
+
+# Rough per-item footprints used by plan_resources
+WORKER_RSS = 200 * 2**20  # interpreter with pandas, lmfit and scipy loaded
+ROW_BYTES = 2 * 2**10  # parsed AlertaRow plus partition and fit frame
+COMPACT_ROW_BYTES = 256  # AlertaTable row plus partition and fit frame
+RESULT_BYTES = 2**10  # SirParams row in the export buffer
+IN_FLIGHT = 2  # batches queued per worker by Richards.iter_scan
+
+
+class StageMemory(BaseModel):
+    stage: str
+    start_rss: int
+    peak_rss: int
+    seconds: float
+
+
+class ResourcePlan(BaseModel):
+    processes: int
+    batch_size: int
+    flush_rows: int
+
+
+def rss() -> int:
+    # Resident memory of this process plus any pool workers it spawned
+    proc = psutil.Process()
+    total = proc.memory_info().rss
+    for child in proc.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.NoSuchProcess:  # pragma: no cover
+            pass
+    return int(total)
+
+
+class MemoryMonitor:
+    def __init__(self, interval: float = 0.05) -> None:
+        self.interval = interval
+        self.stages: list[StageMemory] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = rss()
+        peak = [start]
+        done = threading.Event()
+
+        def sample() -> None:
+            while not done.wait(self.interval):
+                peak[0] = max(peak[0], rss())
+
+        thread = threading.Thread(target=sample, daemon=True)
+        t0 = time.perf_counter()
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+            stage = StageMemory(
+                stage=name,
+                start_rss=start,
+                peak_rss=max(peak[0], rss()),
+                seconds=time.perf_counter() - t0,
+            )
+            self.stages.append(stage)
+            logger.debug(
+                f"{name}: peak RSS {stage.peak_rss / 2**20:.1f} MiB"
+                f" in {stage.seconds:.2f}s"
+            )
+
+    def report(self) -> dict[str, int]:
+        peaks: dict[str, int] = {}
+        for s in self.stages:
+            peaks[s.stage] = max(peaks.get(s.stage, 0), s.peak_rss)
+        return peaks
+
+
+def plan_resources(
+    memory_limit: int,
+    n_geocodes: int,
+    rows_per_geocode: float,
+    used: int | None = None,
+    row_bytes: int = ROW_BYTES,
+) -> ResourcePlan:
+    used = rss() if used is None else used
+    budget = memory_limit - used
+    if budget <= WORKER_RSS:
+        logger.warning(
+            f"Memory limit {memory_limit / 2**20:.0f} MiB leaves no room"
+            f" above the current {used / 2**20:.0f} MiB; running serially"
+        )
+        return ResourcePlan(processes=1, batch_size=1, flush_rows=1_000)
+
+    # Half of the headroom goes to worker processes, a quarter to the
+    # partitions in flight and a quarter to export buffers
+    processes = int(
+        max(1, min(os.cpu_count() or 1, budget // 2 // WORKER_RSS))
+    )
+    city_bytes = max(1.0, rows_per_geocode) * row_bytes
+    batch_size = int(budget // 4 // (IN_FLIGHT * processes * city_bytes))
+    batch_size = max(1, min(batch_size, max(1, n_geocodes)))
+    flush_rows = max(1, int(budget // 4 // RESULT_BYTES))
+    return ResourcePlan(
+        processes=processes, batch_size=batch_size, flush_rows=flush_rows
+    )
+
+
+def estimate_memory(
+    n_rows: int,
+    n_results: int,
+    processes: int = 1,
+    batch_rows: int = 0,
+    row_bytes: int = ROW_BYTES,
+) -> int:
+    # Peak footprint of a scan by the figures plan_resources sizes with:
+    # this interpreter and the rows it holds, plus, with a pool, one
+    # interpreter per worker and IN_FLIGHT batches of `batch_rows` rows
+    # each shipped to it, and the export buffer
+    total = WORKER_RSS + n_rows * row_bytes + n_results * RESULT_BYTES
+    if processes > 1:
+        total += processes * (WORKER_RSS + IN_FLIGHT * batch_rows * row_bytes)
+    return total
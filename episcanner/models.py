@@ -1,16 +1,66 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Sequence
+from collections import defaultdict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from contextlib import AbstractContextManager, nullcontext
+import itertools
+import math
+import time
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Collection,
+    Hashable,
+    Iterator,
+    Mapping,
+    Sequence,
+    TypeAlias,
+    TypeVar,
+)
 
 from epiweeks import Week
 import lmfit as lm
 from lmfit import Parameters
+from loguru import logger
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
+from pydantic import TypeAdapter
+from scipy.optimize import least_squares
 
-from .analysis.richards import comp_duration, equation, get_SIR_pars, objective
+from .analysis import gompertz
+from .analysis.optimize import differential_evolution
+from .analysis.richards import (
+    A_MAX,
+    A_MIN,
+    PEAK_FRACTION,
+    comp_duration,
+    equation,
+    get_SIR_pars,
+    objective,
+    population_cost,
+    residuals,
+    sum_res,
+    two_wave_residuals,
+)
+from .analysis.shapes import shape_index
+from .analysis.uncertainty import (
+    CI_LEVEL,
+    bootstrap_intervals,
+    linear_intervals,
+)
+from .compact import AlertaTable, column
+from .memory import IN_FLIGHT
+from .progress import ProgressCallback, ProgressTracker
+from .schedule import FitTimings, estimate_cost, plan_batches
 from .schemas import (
     AlertaRow,
     AlertRow,
@@ -19,13 +69,94 @@ from .schemas import (
     RichardsPars,
     SIRPars,
 )
+from .types import FitEngine
 
 THR_PROB = 0.9
 N_WEEKS = 3
 CUM_CASES = 50
+# engine="tiered" escalates to the global search when the local fit does
+# not converge, or with a `max_sum_res` when its sum_res exceeds it; there
+# is no default cut. Measured on 254 negative binomial Richards series
+# drawn over the whole fit bounds (windows of 15 to 52 weeks, dispersion 1
+# to 100), the benchmark corpus and tests/AC_dengue_2011.csv, a converged
+# "shapes" fit was within 1% of the "vectorized" one's sum_res on every
+# series, whatever its sum_res (0.07 to 6.9): a high sum_res means the
+# series is not one Richards wave, which a global search does not change,
+# so an absolute cut only paid for DE runs that gained nothing
+MAX_SUM_RES: float | None = None
+# sum_res above which TwoWaveRichards searches a second wave
+WAVE2_SUM_RES = 1.0
+# Search around a UF prior (iter_scan(hierarchical=True)): peak weeks
+# within PRIOR_TP_SPREAD of the aggregate's, growth rates within a factor
+# PRIOR_B_FACTOR, and a DE population of PRIOR_POPSIZE per parameter
+# seeded with the aggregate's shape
+PRIOR_TP_SPREAD = 8.0
+PRIOR_B_FACTOR = 4.0
+PRIOR_POPSIZE = 5
+# Quantities with confidence intervals, exported as {name}_lower/_upper
+CI_QUANTITIES = ("R0", "peak_week", "total_cases")
+
+K = TypeVar("K", bound=Hashable)
+# Partitions of a multi-disease scan are keyed by (disease, geocode)
+DiseaseKey: TypeAlias = tuple[str, int]
+
+
+def screen_window(
+    city_data: Sequence[AlertaRow], year: int
+) -> Sequence[AlertaRow]:
+    # Weeks 45 of year-1 to 35 of year, where transmission is screened
+    if isinstance(city_data, AlertaTable):
+        return city_data.window((year - 1) * 100 + 45, year * 100 + 35)
+    return [
+        r
+        for r in city_data
+        if (
+            (r.ew.year == year - 1 and r.ew.week >= 45)
+            or (r.ew.year == year and r.ew.week <= 35)
+        )
+    ]
+
+
+def fit_window(
+    city_data: Sequence[AlertaRow], year: int
+) -> Sequence[AlertaRow]:
+    # Weeks 45 of year-1 to 44 of year, the series the models fit
+    if isinstance(city_data, AlertaTable):
+        return city_data.window((year - 1) * 100 + 45, year * 100 + 44)
+    return [
+        r
+        for r in city_data
+        if (r.ew.year == year - 1 and r.ew.week >= 45)
+        or (r.ew.year == year and r.ew.week < 45)
+    ]
+
+
+def _group(
+    data: Sequence[AlertaRow], key: Callable[[AlertaRow], K]
+) -> dict[K, Sequence[AlertaRow]]:
+    groups: dict[K, list[AlertaRow]] = defaultdict(list)
+    for row in data:
+        groups[key(row)].append(row)
+    return {k: sorted(rows, key=lambda r: r.ew) for k, rows in groups.items()}
 
 
 class AnalysisModel(ABC):
+    L: float
+    a: float
+    tp1: float
+    gamma: float
+    # Models whose fit_many fits a whole stack of series without a
+    # per-city Python loop; iter_scan hands them batches at once
+    batched: ClassVar[bool] = False
+    # Fit engine that produced the parameters, exported as fit_tier
+    tier: str | None = None
+    # Models whose fit takes a `prior` from an aggregate fit, as
+    # iter_scan(hierarchical=True) passes
+    priors: ClassVar[bool] = False
+    # Bounds of CI_QUANTITIES, set by iter_scan after each fit of an
+    # IntervalModel
+    intervals: dict[str, tuple[float, float]] | None = None
+
     @staticmethod
     @abstractmethod
     def objective(
@@ -38,26 +169,43 @@ class AnalysisModel(ABC):
     @staticmethod
     @abstractmethod
     def fit(
-        data: Sequence[AlertRow],
+        data: Sequence[AlertRow | AlertaRow],
         verbose: bool = False,
     ) -> AnalysisModel:
         ...
 
+    @classmethod
+    @abstractmethod
+    def fit_many(
+        cls,
+        series: npt.NDArray[np.float64],
+        **fit_kws,
+    ) -> list[AnalysisModel]:
+        # `series` stacks weekly cases of equal-length windows, shape (n, T)
+        ...
 
-class Richards(AnalysisModel):
-    def __init__(
-        self, L: float, a: float, b: float, tp1: float, gamma: float
-    ) -> None:
-        self.L = L
-        self.a = a
-        self.b = b
-        self.tp1 = tp1
-        self.gamma = gamma
-
+    @abstractmethod
     def evaluate(self, t: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
-        return equation(  # type: ignore[no-any-return]
-            self.L, self.a, self.b, t, self.tp1
-        )
+        ...
+
+    @classmethod
+    @abstractmethod
+    def evaluate_many(
+        cls,
+        models: Sequence[AnalysisModel],
+        t: npt.NDArray[np.float64],
+    ) -> npt.NDArray[np.float64]:
+        # Curves of all `models` at `t`, shape (n, len(t))
+        ...
+
+    @abstractmethod
+    def get_SIR_pars(self) -> SIRPars:
+        ...
+
+    @abstractmethod
+    def params(self) -> dict[str, float]:
+        # Constructor arguments, so `type(model)(**model.params())` rebuilds it
+        ...
 
     def to_curve(self, data: Sequence[AlertRow | AlertaRow]) -> FittedCurve:
         df = pd.DataFrame(
@@ -67,14 +215,329 @@ class Richards(AnalysisModel):
             ]
         )
         df["casos_cum"] = df.casos_est.cumsum()
-        t_range = np.arange(df.shape[0])
-        richfun = self.evaluate(t_range)  # type: ignore
+        t_range = np.arange(df.shape[0], dtype=np.float64)
+        richfun = self.evaluate(t_range)
         return FittedCurve(
             ew=[Week.fromdate(d) for d in df.data_iniSE],
             casos_cum=df.casos_cum.tolist(),
             richards=richfun.tolist(),
         )
 
+    @property
+    def total_cases(self) -> float:
+        # Final cumulative cases, exported as SirParams.total_cases
+        return self.L
+
+    def comp_duration(
+        self, curve: FittedCurve, peak_fraction: float = PEAK_FRACTION
+    ) -> EpDuration:
+        return comp_duration(curve, self.tp1, peak_fraction)
+
+    @staticmethod
+    def partition(
+        data: Sequence[AlertaRow],
+    ) -> dict[int, Sequence[AlertaRow]]:
+        if isinstance(data, AlertaTable):
+            diseases = data.diseases()
+        else:
+            diseases = {row.disease for row in data}
+        if len(diseases) > 1:
+            raise ValueError(
+                f"Data holds several diseases {sorted(diseases)};"
+                " use partition_diseases"
+            )
+        if isinstance(data, AlertaTable):
+            return data.groups(by_disease=False)
+        return _group(data, lambda r: r.geocode)
+
+    @staticmethod
+    def partition_diseases(
+        data: Sequence[AlertaRow],
+    ) -> dict[DiseaseKey, Sequence[AlertaRow]]:
+        if isinstance(data, AlertaTable):
+            return data.groups()
+        return _group(data, lambda r: (r.disease, r.geocode))
+
+    @staticmethod
+    def screen(
+        city_data: Sequence[AlertaRow],
+        year: int,
+        thr_prob: float = THR_PROB,
+        n_weeks: int = N_WEEKS,
+        cum_cases: float = CUM_CASES,
+    ) -> Sequence[AlertaRow] | None:
+        # A city is fitted when, within the screening window, more than
+        # `n_weeks` weeks have p_rt1 above `thr_prob` and more than
+        # `cum_cases` cases were estimated
+        window = screen_window(city_data, year)
+        high_rt1 = int((column(window, "p_rt1") > thr_prob).sum())
+        total_cases = float(column(window, "casos_est").sum(dtype=np.float64))
+
+        if high_rt1 <= n_weeks or total_cases <= cum_cases:
+            return None
+        return fit_window(city_data, year)
+
+    @classmethod
+    def scan(
+        cls,
+        data: Sequence[AlertaRow],
+        year: int,
+        processes: int = 1,
+        batch_size: int | None = None,
+        **fit_kws,
+    ) -> tuple[dict[int, AnalysisModel], dict[int, FittedCurve]]:
+        models: dict[int, AnalysisModel] = {}
+        curves: dict[int, FittedCurve] = {}
+        for geocode, model, curve in cls.iter_scan(
+            cls.partition(data), year, processes, batch_size, **fit_kws
+        ):
+            models[geocode] = model
+            curves[geocode] = curve
+        return models, curves
+
+    @classmethod
+    def iter_scan(
+        cls,
+        partitions: Mapping[K, Sequence[AlertaRow]],
+        year: int,
+        processes: int = 1,
+        batch_size: int | None = None,
+        skip: Collection[K] = (),
+        pool: Executor | None = None,
+        progress: ProgressCallback | None = None,
+        timings: FitTimings | None = None,
+        screen_kws: Mapping[str, Any] | None = None,
+        hierarchical: bool = False,
+        bootstrap: int = 0,
+        **fit_kws,
+    ) -> Iterator[tuple[K, AnalysisModel, FittedCurve]]:
+        # Partition keys are opaque here: geocodes from `partition`, or
+        # (disease, geocode) pairs from `partition_diseases`, which puts
+        # every disease's cities in the same batches and pool.
+        # `screen_kws` overrides the screening thresholds. Each model's
+        # intervals come from its Jacobian, or with `bootstrap` from that
+        # many refits, run by the worker that fitted it
+        if bootstrap < 0:
+            raise ValueError("bootstrap must be a number of replicates")
+        tasks = []
+        for key, city_data in partitions.items():
+            if key in skip:
+                continue
+            fit_data = cls.screen(city_data, year, **(screen_kws or {}))
+            if fit_data is not None:
+                tasks.append((key, fit_data))
+
+        # With `hierarchical`, each city's fit starts from its UF's
+        # aggregate fit instead of an uninformed search
+        priors: dict[K, RichardsPars] | None = None
+        if hierarchical:
+            if not cls.priors:
+                raise ValueError(f"{cls.__name__} does not take priors")
+            priors = _uf_priors(cls, tasks, fit_kws)
+
+        def batch_priors(
+            batch: Sequence[tuple[K, Sequence[AlertaRow]]]
+        ) -> dict[K, RichardsPars] | None:
+            if priors is None:
+                return None
+            return {key: priors[key] for key, _ in batch}
+
+        # Batched models fit a whole batch in one call, so they get one
+        # batch per worker; others get several for load balancing
+        per_worker = 1 if cls.batched else 4
+        # Without a `progress` callback nothing is timed or emitted
+        tracker = None
+        if progress is not None:
+            tracker = ProgressTracker(len(tasks), progress)
+        # Recorded with the times, to calibrate the cost model of plans
+        costs = {}
+        if timings is not None:
+            costs = {key: estimate_cost(data) for key, data in tasks}
+
+        def emit(
+            results: list[tuple[K, AnalysisModel, FittedCurve, float]],
+            oldest: Callable[[], tuple[K, float] | None] = lambda: None,
+        ) -> Iterator[tuple[K, AnalysisModel, FittedCurve]]:
+            for key, model, curve, seconds in results:
+                if timings is not None:
+                    timings.record(key, seconds, costs[key])
+                if tracker is not None:
+                    tracker.update(key, oldest())
+                yield key, model, curve
+
+        if processes == 1 and pool is None:
+            # Serial scans of per-city models fit one city per batch, so
+            # each progress event is timed when its own fit lands; batched
+            # models share one fit_many call
+            if not cls.batched:
+                batch_size = 1
+            elif batch_size is None:
+                batch_size = max(1, math.ceil(len(tasks) / per_worker))
+            for i in range(0, len(tasks), batch_size):
+                batch = tasks[i : i + batch_size]  # noqa: E203
+                yield from emit(
+                    _fit_batch(
+                        cls, batch, fit_kws, batch_priors(batch), bootstrap
+                    )
+                )
+            return
+
+        # Costliest cities go first, in batches that shrink towards the
+        # end, so no worker is left with a large city while others idle
+        batches = plan_batches(
+            tasks, processes, per_worker, batch_size, timings
+        )
+
+        # A caller-owned `pool` (kept warm across scans) is used as is and
+        # left running; `processes` then only sizes batches and the queue
+        executor: AbstractContextManager[Executor] = (
+            ProcessPoolExecutor(processes)
+            if pool is None
+            else nullcontext(pool)
+        )
+        # Only IN_FLIGHT batches per worker are queued at a time, so the
+        # partitions shipped to the pool stay bounded by batch_size
+        pending = iter(batches)
+        # First key and submit time of each batch in flight
+        started: dict[Future, tuple[K, float]] = {}
+        with executor as ex:
+
+            def submit(batch: list[tuple[K, Sequence[AlertaRow]]]) -> Future:
+                future = ex.submit(
+                    _fit_batch,
+                    cls,
+                    batch,
+                    fit_kws,
+                    batch_priors(batch),
+                    bootstrap,
+                )
+                started[future] = (batch[0][0], time.perf_counter())
+                return future
+
+            running = {
+                submit(batch)
+                for batch in itertools.islice(pending, IN_FLIGHT * processes)
+            }
+
+            def oldest() -> tuple[K, float] | None:
+                return min(started.values(), key=lambda s: s[1], default=None)
+
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del started[future]
+                for future in done:
+                    yield from emit(future.result(), oldest)
+                for batch in itertools.islice(pending, len(done)):
+                    running.add(submit(batch))
+
+
+class IntervalModel(ABC):
+    # Models with confidence intervals of CI_QUANTITIES, which iter_scan
+    # sets as AnalysisModel.intervals. `confidence` varies the `_free`
+    # attributes of a fit through `_curves` and `_quantities`
+    L: float
+    tp1: float
+
+    @abstractmethod
+    def _free(
+        self, cases: npt.NDArray[np.float64]
+    ) -> dict[str, tuple[float, float]]:
+        # Attributes the intervals vary, with their fit bounds for weekly
+        # `cases`
+        ...
+
+    @abstractmethod
+    def _curves(
+        self, x: npt.NDArray[np.float64], t: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        # Cumulative curves at `t` for rows of `_free` values, shape (n, T)
+        ...
+
+    @abstractmethod
+    def _quantities(
+        self, x: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        # CI_QUANTITIES for rows of `_free` values, shape (n, 3)
+        ...
+
+    def confidence(
+        self,
+        cases: npt.NDArray[np.float64],
+        bootstrap: int = 0,
+        seed: int | None = None,
+        level: float = CI_LEVEL,
+    ) -> dict[str, tuple[float, float]]:
+        # Intervals of CI_QUANTITIES for this fit to weekly `cases`: from
+        # the Jacobian of the cumulative curve, or with `bootstrap` as
+        # percentiles of that many refits to resampled residuals
+        bounds = self._free(cases)
+        lower, upper = np.array(list(bounds.values()), dtype=np.float64).T
+        x = np.clip([getattr(self, name) for name in bounds], lower, upper)
+        t = np.arange(len(cases), dtype=np.float64)
+
+        def curves(p: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+            return self._curves(p, t)
+
+        if bootstrap:
+            lo, hi = bootstrap_intervals(
+                curves,
+                self._quantities,
+                x,
+                cases,
+                lower,
+                upper,
+                bootstrap,
+                seed,
+                level,
+            )
+        else:
+            lo, hi = linear_intervals(
+                curves, self._quantities, x, np.cumsum(cases), upper, level
+            )
+        return {
+            name: (float(low), float(high))
+            for name, low, high in zip(CI_QUANTITIES, lo, hi)
+        }
+
+    @classmethod
+    def confidence_many(
+        cls,
+        models: Sequence[IntervalModel],
+        series: npt.NDArray[np.float64],
+        bootstrap: int = 0,
+        seed: int | None = None,
+        level: float = CI_LEVEL,
+    ) -> list[dict[str, tuple[float, float]]]:
+        # `confidence` of each fit of fit_many to the stacked `series`;
+        # batched models compute the Jacobian intervals of the whole stack
+        # at once instead
+        return [
+            model.confidence(cases, bootstrap, seed, level)
+            for model, cases in zip(models, series)
+        ]
+
+
+class Richards(AnalysisModel, IntervalModel):
+    priors = True
+
+    def __init__(
+        self, L: float, a: float, b: float, tp1: float, gamma: float
+    ) -> None:
+        self.L = L
+        self.a = a
+        self.b = b
+        self.tp1 = tp1
+        self.gamma = gamma
+        self.nfev: int | None = None
+        # Whether the optimizer reported convergence, None when not fitted
+        self.converged: bool | None = None
+
+    def evaluate(self, t: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        return equation(  # type: ignore[no-any-return]
+            self.L, self.a, self.b, t, self.tp1
+        )
+
     @staticmethod
     def objective(
         params: Parameters,
@@ -83,47 +546,232 @@ class Richards(AnalysisModel):
     ) -> npt.NDArray[np.float64]:
         return objective(params, aux, df)  # type: ignore[no-any-return]
 
+    @staticmethod
+    def bounds(sum_cases: float) -> dict[str, tuple[float, float]]:
+        return {
+            "gamma": (0.3, 0.33),
+            "L1": (1.0, 1.2 * sum_cases),
+            "tp1": (5, 35),
+            "b1": (1e-6, 1),
+        }
+
+    @staticmethod
+    def prior_bounds(
+        bounds: dict[str, tuple[float, float]], prior: RichardsPars
+    ) -> dict[str, tuple[float, float]]:
+        # `bounds` narrowed around an aggregate fit; L1 stays the city's
+        tp_lo, tp_hi = bounds["tp1"]
+        b_lo, b_hi = bounds["b1"]
+        return {
+            **bounds,
+            "tp1": (
+                max(tp_lo, min(prior.tp1, tp_hi) - PRIOR_TP_SPREAD),
+                min(tp_hi, max(prior.tp1, tp_lo) + PRIOR_TP_SPREAD),
+            ),
+            "b1": (
+                max(b_lo, prior.b1 / PRIOR_B_FACTOR),
+                min(b_hi, prior.b1 * PRIOR_B_FACTOR),
+            ),
+        }
+
     @staticmethod
     def fit(
         data: Sequence[AlertRow | AlertaRow],
         verbose: bool = False,
+        engine: FitEngine = "lmfit",
+        seed: int | None = None,
+        workers: int = 1,
+        max_sum_res: float | None = MAX_SUM_RES,
+        prior: RichardsPars | None = None,
     ) -> Richards:
-        df = pd.DataFrame(
-            [
-                {"data_iniSE": row.ew.startdate(), "casos_est": row.casos_est}
-                for row in data
-            ]
+        return Richards._fit_cases(
+            column(data, "casos_est").astype(np.float64),
+            verbose,
+            engine,
+            seed,
+            workers,
+            max_sum_res,
+            prior,
         )
+
+    @classmethod
+    def fit_many(
+        cls,
+        series: npt.NDArray[np.float64],
+        **fit_kws,
+    ) -> list[AnalysisModel]:
+        # Each DE search is already vectorized over its population
+        return [Richards._fit_cases(cases, **fit_kws) for cases in series]
+
+    @staticmethod
+    def _fit_cases(
+        cases: npt.NDArray[np.float64],
+        verbose: bool = False,
+        engine: FitEngine = "lmfit",
+        seed: int | None = None,
+        workers: int = 1,
+        max_sum_res: float | None = MAX_SUM_RES,
+        prior: RichardsPars | None = None,
+    ) -> Richards:
+        engine = TypeAdapter(FitEngine).validate_python(engine)
+        if workers != 1 and engine not in ("vectorized", "tiered"):
+            raise ValueError(
+                "workers requires engine='vectorized' or 'tiered'"
+            )
+
+        if engine == "tiered":
+            # Shape match plus local refinement first; the global search
+            # runs only for cities whose local fit failed, or misses an
+            # explicit quality threshold (see MAX_SUM_RES)
+            model = Richards._fit_cases(cases, verbose, "shapes", prior=prior)
+            casos_cum = np.cumsum(cases)
+            fitted = model.evaluate(np.arange(len(cases), dtype=np.float64))
+            if model.converged and (
+                max_sum_res is None
+                or sum_res(casos_cum, fitted) <= max_sum_res
+            ):
+                return model
+            cheap_nfev = model.nfev or 0
+            model = Richards._fit_cases(
+                cases, verbose, "vectorized", seed, workers, prior=prior
+            )
+            model.nfev = (model.nfev or 0) + cheap_nfev
+            return model
+
+        df = pd.DataFrame({"casos_est": cases})
         df["casos_cum"] = df.casos_est.cumsum()
-        sum_cases = df.casos_est.sum()
-        params = Parameters()
-        params.add("gamma", min=0.3, max=0.33)
-        params.add("L1", min=1.0, max=1.2 * sum_cases)
-        params.add("tp1", min=5, max=35)
-        params.add("b1", min=1e-6, max=1)
-        params.add("a1", expr="b1/(gamma + b1)", min=0.001, max=1)
+        bounds = Richards.bounds(df.casos_est.sum())
+        # Around a prior, DE searches narrower bounds with a smaller
+        # population; the vectorized engine also seeds it with the
+        # aggregate's shape at this city's scale. lmfit orders and maps
+        # its variables itself, so it keeps its own initialization
+        de_kws: dict[str, Any] = {}
+        if prior is not None:
+            bounds = Richards.prior_bounds(bounds, prior)
+            de_kws = {"popsize": PRIOR_POPSIZE}
 
-        out = lm.minimize(
-            Richards.objective,
-            params,
-            args=(0, df),
-            method="differential_evolution",
-        )
+        if engine in ("vectorized", "shapes"):
+            serie = df.casos_cum.to_numpy(dtype=np.float64)
+            if engine == "vectorized":
+                if prior is not None:
+                    lo, hi = np.array(list(bounds.values())).T
+                    init = np.random.default_rng(seed).uniform(
+                        lo, hi, (PRIOR_POPSIZE * len(lo), len(lo))
+                    )
+                    init[0] = np.clip(
+                        [prior.gamma, cases.sum(), prior.tp1, prior.b1], lo, hi
+                    )
+                    de_kws["init"] = init
+                ret = differential_evolution(
+                    population_cost,
+                    list(bounds.values()),
+                    args=(serie,),
+                    seed=seed,
+                    workers=workers,
+                    **de_kws,
+                )
+            else:
+                # Nearest precomputed shape replaces the global search;
+                # only a local refinement inside the bounds remains
+                lo, hi = np.array(list(bounds.values()), dtype=np.float64).T
+                x0 = shape_index(len(serie)).match(serie)[0]
+                ret = least_squares(
+                    residuals,
+                    np.clip(x0, lo, hi),
+                    bounds=(lo, hi),
+                    args=(serie,),
+                )
+            gamma, L1, tp1, b1 = ret.x
+            pars = {
+                "gamma": gamma,
+                "L1": L1,
+                "tp1": tp1,
+                "b1": b1,
+                "a1": np.clip(b1 / (gamma + b1), A_MIN, A_MAX),
+            }
+            success, nfev = ret.success, ret.nfev
+        else:
+            params = Parameters()
+            for name, (lo, hi) in bounds.items():
+                params.add(name, min=lo, max=hi)
+            params.add("a1", expr="b1/(gamma + b1)", min=A_MIN, max=A_MAX)
+
+            out = lm.minimize(
+                Richards.objective,
+                params,
+                args=(0, df),
+                method="differential_evolution",
+                seed=seed,
+                **de_kws,
+            )
+            pars = out.params.valuesdict()  # type: ignore
+            success, nfev = out.success, out.nfev  # type: ignore
 
         if verbose:
-            if out.success:  # type: ignore
-                print(f"found match after {out.nfev} tries")  # type: ignore
+            if success:
+                print(f"found match after {nfev} evaluations")
             else:  # pragma: no cover
                 print("No match found")
 
-        pars = out.params.valuesdict()  # type: ignore
-        return Richards(
-            L=pars["L1"],
-            a=pars["a1"],
-            b=pars["b1"],
-            tp1=pars["tp1"],
-            gamma=pars["gamma"],
+        model = Richards(
+            L=float(pars["L1"]),
+            a=float(pars["a1"]),
+            b=float(pars["b1"]),
+            tp1=float(pars["tp1"]),
+            gamma=float(pars["gamma"]),
         )
+        model.nfev = int(nfev)
+        model.converged = bool(success)
+        model.tier = engine
+        return model
+
+    def params(self) -> dict[str, float]:
+        return {
+            "L": self.L,
+            "a": self.a,
+            "b": self.b,
+            "tp1": self.tp1,
+            "gamma": self.gamma,
+        }
+
+    @classmethod
+    def evaluate_many(
+        cls,
+        models: Sequence[AnalysisModel],
+        t: npt.NDArray[np.float64],
+    ) -> npt.NDArray[np.float64]:
+        pars = np.array(
+            [[m.L, m.a, m.b, m.tp1] for m in models],  # type: ignore
+            dtype=np.float64,
+        ).reshape(-1, 4)
+        L, a, b, tp1 = np.split(pars, 4, axis=1)
+        return equation(L, a, b, t, tp1)
+
+    def _free(
+        self, cases: npt.NDArray[np.float64]
+    ) -> dict[str, tuple[float, float]]:
+        # gamma is left out: the cumulative curve barely constrains it
+        bounds = Richards.bounds(cases.sum())
+        return {"L": bounds["L1"], "tp1": bounds["tp1"], "b": bounds["b1"]}
+
+    def _shape(self, b: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        # a = b / (gamma + b) with this fit's SIR gamma, so the fitted b
+        # gives back the fitted a
+        gamma = self.b / self.a - self.b
+        return np.clip(b / (gamma + b), A_MIN, A_MAX)
+
+    def _curves(
+        self, x: npt.NDArray[np.float64], t: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        L, tp1, b = np.split(x, 3, axis=1)
+        return equation(L, self._shape(b), b, t, tp1)
+
+    def _quantities(
+        self, x: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        # R0 = 1 / (1 - a), as get_SIR_pars
+        L, tp1, b = x.T
+        return np.column_stack([1 / (1 - self._shape(b)), tp1, L])
 
     def get_SIR_pars(self) -> SIRPars:
         return get_SIR_pars(
@@ -136,57 +784,467 @@ class Richards(AnalysisModel):
             )
         )
 
-    def comp_duration(self, curve: FittedCurve) -> EpDuration:
-        return comp_duration(curve, self.tp1)
+
+class TwoWaveRichards(Richards):
+    # A Richards curve plus a second wave. The single-wave fit comes first;
+    # only when its sum_res exceeds `wave2_sum_res` is a second wave
+    # searched, over what the first leaves unexplained, and both are then
+    # refined together from there. The earlier wave is stored as the first
+    # (L, a, b, tp1, gamma), which SIR parameters and durations use
+    def __init__(
+        self,
+        L: float,
+        a: float,
+        b: float,
+        tp1: float,
+        gamma: float,
+        L2: float = 0.0,
+        a2: float = 1.0,
+        b2: float = 1.0,
+        tp2: float = 0.0,
+    ) -> None:
+        super().__init__(L, a, b, tp1, gamma)
+        self.L2 = L2
+        self.a2 = a2
+        self.b2 = b2
+        self.tp2 = tp2
+
+    @property
+    def total_cases(self) -> float:
+        return self.L + self.L2
+
+    def evaluate(self, t: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        first = super().evaluate(t)
+        if self.L2 == 0:
+            return first
+        return first + equation(  # type: ignore[no-any-return]
+            self.L2, self.a2, self.b2, t, self.tp2
+        )
 
     @staticmethod
-    def scan(
-        data: Sequence[AlertaRow],
-        year: int,
-    ) -> tuple[dict[int, Richards], dict[int, FittedCurve]]:
-        models: dict[int, Richards] = {}
-        curves: dict[int, FittedCurve] = {}
-        for geocode in {r.geocode for r in data}:
-            result = Richards._scan_geocode(data, geocode, year)
-            if result is not None:
-                model, curve = result
-                models[geocode] = model
-                curves[geocode] = curve
-        return models, curves
+    def fit(  # type: ignore[override]
+        data: Sequence[AlertRow | AlertaRow],
+        verbose: bool = False,
+        engine: FitEngine = "lmfit",
+        seed: int | None = None,
+        workers: int = 1,
+        max_sum_res: float | None = MAX_SUM_RES,
+        wave2_sum_res: float = WAVE2_SUM_RES,
+        prior: RichardsPars | None = None,
+    ) -> TwoWaveRichards:
+        return TwoWaveRichards._fit_waves(
+            column(data, "casos_est").astype(np.float64),
+            verbose,
+            engine,
+            seed,
+            workers,
+            max_sum_res,
+            wave2_sum_res,
+            prior,
+        )
+
+    @classmethod
+    def fit_many(
+        cls,
+        series: npt.NDArray[np.float64],
+        **fit_kws,
+    ) -> list[AnalysisModel]:
+        return [
+            TwoWaveRichards._fit_waves(cases, **fit_kws) for cases in series
+        ]
 
     @staticmethod
-    def _scan_geocode(
-        data: Sequence[AlertaRow],
-        geocode: int,
-        year: int,
-    ) -> tuple[Richards, FittedCurve] | None:
-        city_data = sorted(
-            (r for r in data if r.geocode == geocode),
-            key=lambda r: r.ew,
-        )
-
-        window = [
-            r
-            for r in city_data
-            if (
-                (r.ew.year == year - 1 and r.ew.week >= 45)
-                or (r.ew.year == year and r.ew.week <= 35)
-            )
+    def _fit_waves(
+        cases: npt.NDArray[np.float64],
+        verbose: bool = False,
+        engine: FitEngine = "lmfit",
+        seed: int | None = None,
+        workers: int = 1,
+        max_sum_res: float | None = MAX_SUM_RES,
+        wave2_sum_res: float = WAVE2_SUM_RES,
+        prior: RichardsPars | None = None,
+    ) -> TwoWaveRichards:
+        # A prior shapes the first wave only
+        first = Richards._fit_cases(
+            cases, verbose, engine, seed, workers, max_sum_res, prior
+        )
+        model = TwoWaveRichards(**first.params())
+        model.nfev, model.tier = first.nfev, first.tier
+        t = np.arange(len(cases), dtype=np.float64)
+        serie = np.cumsum(cases)
+        first_res = sum_res(serie, model.evaluate(t))
+        bounds = Richards.bounds(cases.sum())
+        # Either wave may peak anywhere in the window
+        tp = (bounds["tp1"][0], len(cases) - 1.0)
+        if first_res <= wave2_sum_res or tp[0] >= tp[1]:
+            return model
+
+        rest = serie - model.evaluate(t)
+        wave2 = [
+            bounds["gamma"],
+            (1.0, max(2.0, 1.2 * np.abs(rest).max())),
+            tp,
+            bounds["b1"],
         ]
+        ret = differential_evolution(
+            population_cost, wave2, args=(rest,), seed=seed, workers=workers
+        )
+        # The joint refinement may grow the second wave past the residual
+        lo, hi = np.array(
+            list(bounds.values()) + [wave2[0], bounds["L1"], tp, wave2[3]],
+            dtype=np.float64,
+        ).T
+        x0 = np.array([first.gamma, first.L, first.tp1, first.b, *ret.x])
+        joint = least_squares(
+            two_wave_residuals,
+            np.clip(x0, lo, hi),
+            bounds=(lo, hi),
+            args=(serie,),
+        )
+        (g1, L1, tp1, b1), (g2, L2, tp2, b2) = sorted(
+            joint.x.reshape(2, 4).tolist(), key=lambda w: w[2]
+        )
+        waves = TwoWaveRichards(
+            L=L1,
+            a=float(np.clip(b1 / (g1 + b1), A_MIN, A_MAX)),
+            b=b1,
+            tp1=tp1,
+            gamma=g1,
+            L2=L2,
+            a2=float(np.clip(b2 / (g2 + b2), A_MIN, A_MAX)),
+            b2=b2,
+            tp2=tp2,
+        )
+        waves.nfev = (first.nfev or 0) + int(ret.nfev) + int(joint.nfev)
+        model.nfev = waves.nfev
+        if sum_res(serie, waves.evaluate(t)) >= first_res:
+            return model
+        waves.tier = f"{first.tier}+wave2"
+        if verbose:
+            print(f"second wave improved sum_res from {first_res:.3f}")
+        return waves
 
-        high_rt1 = sum(1 for r in window if r.p_rt1 > THR_PROB)
-        total_cases = sum(r.casos_est for r in window)
+    def _free(
+        self, cases: npt.NDArray[np.float64]
+    ) -> dict[str, tuple[float, float]]:
+        first = super()._free(cases)
+        if self.L2 == 0:
+            return first
+        # Bounds of the joint refinement in _fit_waves
+        tp = (first["tp1"][0], max(first["tp1"][0], len(cases) - 1.0))
+        return {
+            **first,
+            "tp1": tp,
+            "L2": first["L"],
+            "tp2": tp,
+            "b2": first["b"],
+        }
 
-        if high_rt1 <= N_WEEKS or total_cases <= CUM_CASES:
-            return None
+    def _curves(
+        self, x: npt.NDArray[np.float64], t: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        first = super()._curves(x[:, :3], t)
+        if self.L2 == 0:
+            return first
+        L2, tp2, b2 = np.split(x[:, 3:], 3, axis=1)
+        gamma2 = self.b2 / self.a2 - self.b2
+        a2 = np.clip(b2 / (gamma2 + b2), A_MIN, A_MAX)
+        return first + equation(L2, a2, b2, t, tp2)
+
+    def _quantities(
+        self, x: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        # R0 and the peak week are the first wave's, total cases both's
+        q = super()._quantities(x[:, :3])
+        if self.L2 != 0:
+            q[:, 2] += x[:, 3]
+        return q
+
+    def params(self) -> dict[str, float]:
+        return {
+            **super().params(),
+            "L2": self.L2,
+            "a2": self.a2,
+            "b2": self.b2,
+            "tp2": self.tp2,
+        }
+
+    @classmethod
+    def evaluate_many(
+        cls,
+        models: Sequence[AnalysisModel],
+        t: npt.NDArray[np.float64],
+    ) -> npt.NDArray[np.float64]:
+        return np.array([m.evaluate(t) for m in models]).reshape(
+            len(models), len(t)
+        )
 
-        fit_data = [
-            r
-            for r in city_data
-            if (r.ew.year == year - 1 and r.ew.week >= 45)
-            or (r.ew.year == year and r.ew.week < 45)
+
+class Gompertz(AnalysisModel, IntervalModel):
+    batched = True
+    # The curve does not identify a recovery rate; use the lower bound the
+    # Richards fits settle on
+    GAMMA = 0.3
+
+    def __init__(
+        self, L: float, b: float, tp1: float, gamma: float = GAMMA
+    ) -> None:
+        self.L = L
+        self.b = b
+        self.tp1 = tp1
+        self.gamma = gamma
+        # Richards shape parameter: Gompertz is its a -> 0 limit
+        self.a = 0.0
+
+    def evaluate(self, t: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        return gompertz.equation(self.L, self.b, t, self.tp1)
+
+    @staticmethod
+    def objective(
+        params: Parameters,
+        aux: int,
+        df: pd.DataFrame,
+    ) -> npt.NDArray[np.float64]:
+        return gompertz.objective(params, aux, df)
+
+    @staticmethod
+    def fit(
+        data: Sequence[AlertRow | AlertaRow],
+        verbose: bool = False,
+        **fit_kws,
+    ) -> Gompertz:
+        cases = column(data, "casos_est").astype(np.float64)[None, :]
+        model = Gompertz.fit_many(cases, **fit_kws)[0]
+        assert isinstance(model, Gompertz)
+        if verbose:
+            print(
+                f"fitted L={model.L:.1f}, b={model.b:.3f}, tp1={model.tp1:.1f}"
+            )
+        return model
+
+    @classmethod
+    def fit_many(
+        cls,
+        series: npt.NDArray[np.float64],
+        **fit_kws,
+    ) -> list[AnalysisModel]:
+        # Scans pass every model the same options: the fit is deterministic
+        # and ignores `seed` and `verbose`; other models' options, such as
+        # `engine`, are refused
+        fit_kws = {
+            k: v for k, v in fit_kws.items() if k not in ("seed", "verbose")
+        }
+        unknown = sorted(set(fit_kws) - {"n_grid", "iterations"})
+        if unknown:
+            raise ValueError(
+                f"Gompertz does not take {', '.join(unknown)}."
+                " Options: n_grid, iterations, seed, verbose"
+            )
+        pars = gompertz.fit_many(np.cumsum(series, axis=1), **fit_kws)
+        return [Gompertz(L=L, b=b, tp1=tp1) for L, b, tp1 in pars.tolist()]
+
+    @classmethod
+    def evaluate_many(
+        cls,
+        models: Sequence[AnalysisModel],
+        t: npt.NDArray[np.float64],
+    ) -> npt.NDArray[np.float64]:
+        pars = np.array(
+            [[m.L, m.b, m.tp1] for m in models],  # type: ignore
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        L, b, tp1 = np.split(pars, 3, axis=1)
+        return gompertz.equation(L, b, t, tp1)
+
+    def _free(
+        self, cases: npt.NDArray[np.float64]
+    ) -> dict[str, tuple[float, float]]:
+        # Bounds of gompertz.fit_many
+        return {
+            "L": (1.0, 1.2 * max(cases.sum(), 1.0)),
+            "tp1": gompertz.TP_BOUNDS,
+            "b": gompertz.B_BOUNDS,
+        }
+
+    def _curves(
+        self, x: npt.NDArray[np.float64], t: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        L, tp1, b = np.split(x, 3, axis=1)
+        return gompertz.equation(L, b, t, tp1)
+
+    def _quantities(
+        self, x: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        return Gompertz._stack_quantities(x, self.gamma)
+
+    @staticmethod
+    def _stack_quantities(
+        x: npt.NDArray[np.float64], gamma: float | npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        # `gamma` is one value, or one per row of `x`
+        L, tp1, b = x.T
+        return np.column_stack([(b + gamma) / gamma, tp1, L])
+
+    @classmethod
+    def confidence_many(
+        cls,
+        models: Sequence[IntervalModel],
+        series: npt.NDArray[np.float64],
+        bootstrap: int = 0,
+        seed: int | None = None,
+        level: float = CI_LEVEL,
+    ) -> list[dict[str, tuple[float, float]]]:
+        # The Jacobian intervals of the whole stack in one pass, like
+        # fit_many; bootstrap replicates are refitted per city
+        if bootstrap:
+            return super().confidence_many(
+                models, series, bootstrap, seed, level
+            )
+        fits = [m for m in models if isinstance(m, Gompertz)]
+        bounds = np.array(
+            [list(m._free(cases).values()) for m, cases in zip(fits, series)],
+            dtype=np.float64,
+        )
+        lower, upper = bounds[..., 0], bounds[..., 1]
+        x = np.clip([[m.L, m.tp1, m.b] for m in fits], lower, upper)
+        gamma = np.array([m.gamma for m in fits], dtype=np.float64)
+        t = np.arange(series.shape[1], dtype=np.float64)
+
+        def curves(p: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+            # Gompertz curves depend on the fit only through the rows
+            return fits[0]._curves(p, t)
+
+        def quantities(
+            p: npt.NDArray[np.float64],
+        ) -> npt.NDArray[np.float64]:
+            return Gompertz._stack_quantities(p, gamma)
+
+        lo, hi = linear_intervals(
+            curves, quantities, x, np.cumsum(series, axis=1), upper, level
+        )
+        return [
+            {
+                name: (float(low), float(high))
+                for name, low, high in zip(CI_QUANTITIES, row_lo, row_hi)
+            }
+            for row_lo, row_hi in zip(lo, hi)
         ]
 
-        model = Richards.fit(fit_data)
-        curve = model.to_curve(fit_data)
-        return model, curve
+    def get_SIR_pars(self) -> SIRPars:
+        # Early SIR growth rate is beta - gamma
+        beta = self.b + self.gamma
+        return SIRPars(
+            beta=beta, gamma=self.gamma, R0=beta / self.gamma, tc=self.tp1
+        )
+
+    def params(self) -> dict[str, float]:
+        return {"L": self.L, "b": self.b, "tp1": self.tp1, "gamma": self.gamma}
+
+
+MODELS: dict[str, type[AnalysisModel]] = {
+    "Richards": Richards,
+    "Gompertz": Gompertz,
+    "TwoWaveRichards": TwoWaveRichards,
+}
+
+
+def _fit_batch(
+    model_cls: type[AnalysisModel],
+    batch: Sequence[tuple[K, Sequence[AlertaRow]]],
+    fit_kws: dict,
+    priors: Mapping[K, RichardsPars] | None = None,
+    bootstrap: int = 0,
+) -> list[tuple[K, AnalysisModel, FittedCurve, float]]:
+    # Each result carries its fit's wall time, which feeds FitTimings,
+    # including its confidence intervals
+    seed = fit_kws.get("seed")
+    if not model_cls.batched:
+        results = []
+        for key, fit_data in batch:
+            kws = (
+                fit_kws
+                if priors is None
+                else {**fit_kws, "prior": priors[key]}
+            )
+            t0 = time.perf_counter()
+            model = model_cls.fit(fit_data, **kws)
+            if isinstance(model, IntervalModel):
+                model.intervals = model.confidence(
+                    column(fit_data, "casos_est").astype(np.float64),
+                    bootstrap,
+                    seed,
+                )
+            seconds = time.perf_counter() - t0
+            results.append((key, model, model.to_curve(fit_data), seconds))
+        return results
+
+    # Stack equal-length windows so each group is one fit_many call
+    groups: dict[int, list[tuple[K, Sequence[AlertaRow]]]] = defaultdict(list)
+    for key, fit_data in batch:
+        groups[len(fit_data)].append((key, fit_data))
+    results = []
+    for group in groups.values():
+        series = np.array(
+            [column(fit_data, "casos_est") for _, fit_data in group],
+            dtype=np.float64,
+        )
+        t0 = time.perf_counter()
+        models = model_cls.fit_many(series, **fit_kws)
+        if issubclass(model_cls, IntervalModel):
+            fits = [m for m in models if isinstance(m, IntervalModel)]
+            intervals = model_cls.confidence_many(
+                fits, series, bootstrap, seed
+            )
+            for model, ci in zip(fits, intervals):
+                model.intervals = ci
+        seconds = (time.perf_counter() - t0) / len(group)
+        for (key, fit_data), model in zip(group, models):
+            results.append((key, model, model.to_curve(fit_data), seconds))
+    return results
+
+
+def _uf_priors(
+    model_cls: type[AnalysisModel],
+    tasks: Sequence[tuple[K, Sequence[AlertaRow]]],
+    fit_kws: dict,
+) -> dict[K, RichardsPars]:
+    # Sums the screened cities' cases by (disease, UF) and epiweek, the UF
+    # being the first two digits of the geocode, fits each aggregate once
+    # and hands its parameters to the cities, with tp1 shifted to each
+    # city's window start
+    labels: dict[tuple[str, int], int] = {}
+    task_group = []
+    for _, fit_data in tasks:
+        first = fit_data[0]
+        label = (first.disease, first.geocode // 100_000)
+        task_group.append(labels.setdefault(label, len(labels)))
+    sizes = [len(fit_data) for _, fit_data in tasks]
+    group = np.repeat(np.array(task_group, dtype=np.int64), sizes)
+    ew = np.concatenate([column(d, "ew") for _, d in tasks]).astype(np.int64)
+    cases = np.concatenate([column(d, "casos_est") for _, d in tasks])
+    # Group-major (group, epiweek) cells, so each group's weeks are sorted
+    cells, inverse = np.unique(group * 1_000_000 + ew, return_inverse=True)
+    sums = np.bincount(inverse, weights=cases.astype(np.float64))
+    cell_group, cell_ew = np.divmod(cells, 1_000_000)
+
+    fits: list[tuple[RichardsPars, npt.NDArray[np.int64]]] = []
+    for g in range(len(labels)):
+        mask = cell_group == g
+        (model,) = model_cls.fit_many(sums[mask][None, :], **fit_kws)
+        assert isinstance(model, Richards)
+        pars = RichardsPars(
+            gamma=model.gamma,
+            L1=model.L,
+            tp1=model.tp1,
+            b1=model.b,
+            a1=model.a,
+        )
+        fits.append((pars, cell_ew[mask]))
+    logger.info(f"Fitted {len(labels)} UF aggregates as priors")
+
+    priors = {}
+    for (key, fit_data), g in zip(tasks, task_group):
+        pars, weeks = fits[g]
+        start = int(np.searchsorted(weeks, column(fit_data, "ew")[0]))
+        priors[key] = pars.model_copy(update={"tp1": pars.tp1 - start})
+    return priors
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+__all__ = ["ExportPipeline", "FrameSink"]
+
+import os
+from pathlib import Path
+import queue
+import threading
+from types import TracebackType
+from typing import Any, Callable, Mapping, Sequence
+
+import duckdb
+from loguru import logger
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .types import ExportFormat
+
+QUEUE_SIZE = 4096  # items waiting for the writer before fits block
+_DONE = object()
+
+Insert = Callable[[duckdb.DuckDBPyConnection, pd.DataFrame, str, set], None]
+
+
+class FrameSink:
+    # Appends frames to one export target: a CSV file, a Parquet file with
+    # one row group per frame or a DuckDB table. `frame` builds the
+    # DataFrame of a batch of items. DuckDB batches go through `insert`,
+    # which also replaces the year's rows of the diseases a batch is the
+    # first to bring. The export replaces the target only when `close`
+    # commits it with rows written: files are written next to it and
+    # renamed over it, DuckDB batches share one transaction
+    def __init__(
+        self,
+        to: ExportFormat,
+        target: Path,
+        frame: Callable[[Sequence[Any]], pd.DataFrame],
+        table: str = "",
+        insert: Insert | None = None,
+    ) -> None:
+        if to not in ("csv", "parquet", "duckdb"):
+            raise ValueError(
+                f"Pipelined export supports csv, parquet and duckdb, not {to}"
+            )
+        self.to = to
+        self.target = target
+        self.frame = frame
+        self.table = table
+        self.insert = insert
+        self.rows = 0
+        self.partial = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        self._parquet: pq.ParquetWriter | None = None
+        self._con: duckdb.DuckDBPyConnection | None = None
+        self._replaced: set[str] = set()
+        self._closed = False
+
+    def write(self, items: Sequence[Any]) -> None:
+        df = self.frame(items)
+        if self.to == "csv":
+            df.to_csv(
+                self.partial, mode="a", header=not self.rows, index=False
+            )
+        elif self.to == "parquet":
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.partial, table.schema)
+            # Batches of all-null optional values take the first schema
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        else:
+            self._write_duckdb(df)
+        self.rows += len(df)
+
+    def _write_duckdb(self, df: pd.DataFrame) -> None:
+        assert self.insert is not None
+        if self._con is None:
+            self._con = duckdb.connect(str(self.target.absolute()))
+            self._con.begin()
+        replace = set(df.disease) - self._replaced
+        self.insert(self._con, df, self.table, replace)
+        self._replaced |= replace
+
+    def close(self, commit: bool = True) -> None:
+        # Without `commit`, or rows, the target is left as it was
+        if self._closed:
+            return
+        self._closed = True
+        commit = commit and self.rows > 0
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._con is not None:
+            if commit:
+                self._con.commit()
+            else:
+                self._con.rollback()
+            self._con.close()
+        elif commit:
+            if self.target.exists():
+                logger.warning(f"Overriding {self.target}")
+            os.replace(self.partial, self.target)
+        self.partial.unlink(missing_ok=True)
+
+
+class ExportPipeline:
+    # Writes results from a background thread while fitting continues.
+    # `put` queues an item for the sink of its kind, blocking only when
+    # QUEUE_SIZE items are waiting; the writer hands each sink `batch`
+    # items at a time. `close` writes what is left and waits for the
+    # thread, so the export ends with the last fit; it commits the sinks
+    # unless told otherwise or the writer failed. A writer error is
+    # raised by the next `put` or by `close`
+    def __init__(
+        self,
+        sinks: Mapping[str, FrameSink],
+        batch: Mapping[str, int],
+        maxsize: int = QUEUE_SIZE,
+    ) -> None:
+        self.sinks = sinks
+        self.batch = batch
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(
+            target=self._run, name="episcanner-export", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, kind: str, item: Any) -> None:
+        while True:
+            if self._error is not None:
+                raise self._error
+            try:
+                self._queue.put((kind, item), timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self, commit: bool = True) -> None:
+        while self._thread.is_alive():
+            try:
+                self._queue.put(_DONE, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+        commit = commit and self._error is None
+        for sink in self.sinks.values():
+            sink.close(commit)
+            if commit and sink.rows:
+                logger.info(f"Wrote {sink.rows} rows to {sink.target}")
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> ExportPipeline:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close(commit=exc_type is None)
+
+    def _run(self) -> None:
+        pending: dict[str, list[Any]] = {kind: [] for kind in self.sinks}
+        try:
+            while (entry := self._queue.get()) is not _DONE:
+                kind, item = entry
+                pending[kind].append(item)
+                if len(pending[kind]) >= self.batch[kind]:
+                    self.sinks[kind].write(pending[kind])
+                    pending[kind] = []
+            for kind, items in pending.items():
+                if items:
+                    self.sinks[kind].write(items)
+        except BaseException as e:
+            # `put` checks for it before queueing, so producers never wait
+            # on a full queue that nothing drains
+            self._error = e
@@ -0,0 +1,85 @@
+__all__ = ["ProgressEvent", "ProgressTracker", "log_progress"]
+
+from collections import deque
+import time
+from typing import Any, Callable, Hashable
+
+from loguru import logger
+from pydantic import BaseModel
+
+WINDOW = 50  # completions in the rolling rate behind the ETA
+
+
+class ProgressEvent(BaseModel):
+    key: Any  # partition key: geocode, or (disease, geocode)
+    done: int
+    total: int
+    elapsed: float
+    rate: float  # fits per second since the start
+    eta: float | None  # seconds, from the rate over the last WINDOW fits
+    slowest: Any = None  # first key of the oldest batch still in flight
+    slowest_age: float | None = None
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class ProgressTracker:
+    def __init__(
+        self, total: int, callback: ProgressCallback, window: int = WINDOW
+    ) -> None:
+        self.total = total
+        self.callback = callback
+        self.done = 0
+        self.start = time.perf_counter()
+        self._recent: deque[float] = deque(maxlen=window)
+
+    def update(
+        self, key: Hashable, oldest: tuple[Hashable, float] | None = None
+    ) -> None:
+        # `oldest` is the (key, submit time) of the longest-running batch
+        now = time.perf_counter()
+        self.done += 1
+        self._recent.append(now)
+        elapsed = now - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        span = self._recent[-1] - self._recent[0]
+        recent = (len(self._recent) - 1) / span if span > 0 else rate
+        remaining = self.total - self.done
+        eta = remaining / recent if recent > 0 else None
+        self.callback(
+            ProgressEvent(
+                key=key,
+                done=self.done,
+                total=self.total,
+                elapsed=elapsed,
+                rate=rate,
+                eta=0.0 if remaining == 0 else eta,
+                slowest=None if oldest is None else oldest[0],
+                slowest_age=None if oldest is None else now - oldest[1],
+            )
+        )
+
+
+def log_progress(every: float = 5.0, level: str = "INFO") -> ProgressCallback:
+    # Renders events through loguru, at most once per `every` seconds plus
+    # the final event
+    last = [float("-inf")]
+
+    def render(event: ProgressEvent) -> None:
+        if event.done < event.total and event.elapsed - last[0] < every:
+            return
+        last[0] = event.elapsed
+        eta = "?" if event.eta is None else f"{event.eta:.0f}s"
+        message = (
+            f"{event.done}/{event.total} fitted, {event.rate:.1f} fits/s,"
+            f" ETA {eta}"
+        )
+        if event.slowest is not None:
+            message += (
+                f", slowest in flight {event.slowest}"
+                f" ({event.slowest_age:.1f}s)"
+            )
+        logger.log(level, message)
+
+    return render
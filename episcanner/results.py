@@ -0,0 +1,283 @@
+__all__ = ["curves_frame", "load_curves", "load_results", "results_frame"]
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Literal, Sequence
+
+import duckdb
+from duckdb import CatalogException
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+from pydantic import TypeAdapter
+
+from .compact import CurveStore
+from .geometry import GEOMETRY_CRS
+from .schemas import FittedCurve, SirParams
+from .types import UF, UF_IBGE, Disease, ExportFormat
+
+INT_COLUMNS = ("ep_dur", "t_ini", "t_end")
+STR_COLUMNS = ("ep_ini", "ep_pw", "ep_end", "fit_tier")
+FLOAT_COLUMNS = tuple(
+    f"{q}_{bound}"
+    for q in ("R0", "peak_week", "total_cases")
+    for bound in ("lower", "upper")
+)
+OPTIONAL_TYPES = {
+    **{c: pa.int64() for c in INT_COLUMNS},
+    **{c: pa.string() for c in STR_COLUMNS},
+    **{c: pa.float64() for c in FLOAT_COLUMNS},
+}
+DUCKDB_FILE = "episcanner.duckdb"
+# Curves go to "{uf}_{year}_curves.{ext}" files and "{uf}_curves" tables
+CURVES = "_curves"
+
+Output = Literal["pandas", "arrow", "params"]
+CurvesOutput = Literal["pandas", "arrow"]
+
+
+def results_frame(results: Sequence[SirParams]) -> pd.DataFrame:
+    df = pd.DataFrame([r.model_dump() for r in results])
+    # Pin dtypes of optional columns, which pandas would otherwise infer as
+    # NaN floats or, when all values are missing, as untyped objects
+    for cols, dtype in (
+        (INT_COLUMNS, "Int64"),
+        (STR_COLUMNS, "string"),
+        (FLOAT_COLUMNS, "float64"),
+    ):
+        for col in cols:
+            if col in df:
+                df[col] = df[col].astype(dtype)
+    return df
+
+
+def curves_frame(
+    curves: Sequence[tuple[SirParams, FittedCurve]] | CurveStore,
+) -> pd.DataFrame:
+    # Long format, one row per city and week: `t` is the week index in the
+    # fit window, `richards` the fitted cumulative cases
+    if isinstance(curves, CurveStore):
+        return curves.frame()
+    sizes = np.array([len(curve.ew) for _, curve in curves], dtype=np.int64)
+    starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    df = pd.DataFrame(
+        {
+            "geocode": np.repeat([p.geocode for p, _ in curves], sizes),
+            "year": np.repeat([p.year for p, _ in curves], sizes),
+            "disease": np.repeat([p.disease for p, _ in curves], sizes),
+            "t": np.arange(sizes.sum(), dtype=np.int64) - starts,
+            "ew": [w.cdcformat() for _, c in curves for w in c.ew],
+            "casos_cum": [v for _, c in curves for v in c.casos_cum],
+            "richards": [v for _, c in curves for v in c.richards],
+        }
+    )
+    return df.astype({"disease": "string", "ew": "string"})
+
+
+def load_results(
+    output_dir: str | Path,
+    uf: UF | None = None,
+    years: Sequence[int] | int | None = None,
+    geocodes: Sequence[int] | int | None = None,
+    source: ExportFormat = "parquet",
+    output: Output = "pandas",
+    diseases: Sequence[Disease] | Disease | None = None,
+) -> pd.DataFrame | pa.Table | list[SirParams]:
+    output = TypeAdapter(Output).validate_python(output)
+    table = _load(output_dir, uf, years, geocodes, source, diseases)
+    return _convert(table, output)
+
+
+def load_curves(
+    output_dir: str | Path,
+    uf: UF | None = None,
+    years: Sequence[int] | int | None = None,
+    geocodes: Sequence[int] | int | None = None,
+    source: ExportFormat = "parquet",
+    output: CurvesOutput = "pandas",
+    diseases: Sequence[Disease] | Disease | None = None,
+) -> pd.DataFrame | pa.Table:
+    output = TypeAdapter(CurvesOutput).validate_python(output)
+    source = TypeAdapter(ExportFormat).validate_python(source)
+    if source == "geoparquet":
+        # Curves of a geoparquet export are plain parquet files
+        source = "parquet"
+    table = _load(output_dir, uf, years, geocodes, source, diseases, CURVES)
+    return _convert(table, output)  # type: ignore[return-value]
+
+
+def _load(
+    output_dir: str | Path,
+    uf: UF | None,
+    years: Sequence[int] | int | None,
+    geocodes: Sequence[int] | int | None,
+    source: ExportFormat,
+    diseases: Sequence[Disease] | Disease | None,
+    suffix: str = "",
+) -> pa.Table:
+    source = TypeAdapter(ExportFormat).validate_python(source)
+    if isinstance(years, int):
+        years = [years]
+    if isinstance(geocodes, int):
+        geocodes = [geocodes]
+    if isinstance(diseases, str):
+        diseases = [diseases]
+    if diseases is not None:
+        diseases = TypeAdapter(list[Disease]).validate_python(diseases)
+
+    if uf is not None:
+        ufs = [TypeAdapter(UF).validate_python(uf)]
+    elif geocodes is not None:
+        codes = {int(g) // 100_000 for g in geocodes}
+        ufs = sorted(u for u, c in UF_IBGE.items() if c in codes)
+    else:
+        raise ValueError("Either uf or geocodes must be given")
+
+    output_dir = Path(output_dir)
+    years_key = None if years is None else tuple(sorted(set(years)))
+    geocodes_key = None if geocodes is None else tuple(sorted(set(geocodes)))
+
+    if years_key == () or geocodes_key == () or diseases == []:
+        return pa.table({})
+
+    tables = []
+    for u in ufs:
+        if source == "duckdb":
+            files = [output_dir / DUCKDB_FILE]
+        else:
+            files = _result_files(output_dir, u, source, years_key, suffix)
+        stamp = tuple(
+            (str(f), f.stat().st_mtime_ns) for f in files if f.exists()
+        )
+        if stamp:
+            tables.append(
+                _read(source, stamp, f"{u}{suffix}", years_key, geocodes_key)
+            )
+
+    tables = [t for t in tables if t is not None]
+    if not tables:
+        return pa.table({})
+    table = pa.concat_tables(tables, promote_options="default")
+    if diseases is not None:
+        mask = pc.is_in(table["disease"], value_set=pa.array(diseases))
+        table = table.filter(mask)
+    return table
+
+
+def _convert(
+    table: pa.Table, output: Output
+) -> pd.DataFrame | pa.Table | list[SirParams]:
+    if output == "arrow":
+        return table
+    if output == "params":
+        return [SirParams.model_validate(row) for row in table.to_pylist()]
+    df = table.to_pandas()
+    if "geometry" in df:
+        # geoparquet exports, with WKB geometries in GEOMETRY_CRS
+        geometry = gpd.GeoSeries.from_wkb(df.pop("geometry"))
+        return gpd.GeoDataFrame(df, geometry=geometry, crs=GEOMETRY_CRS)
+    return df
+
+
+def _result_files(
+    output_dir: Path,
+    uf: str,
+    source: str,
+    years: tuple[int, ...] | None,
+    suffix: str = "",
+) -> list[Path]:
+    if years is not None:
+        return [output_dir / f"{uf}_{year}{suffix}.{source}" for year in years]
+    pattern = f"{uf}_[0-9][0-9][0-9][0-9]{suffix}.{source}"
+    return sorted(output_dir.glob(pattern))
+
+
+@lru_cache(maxsize=256)
+def _read(
+    source: str,
+    stamp: tuple[tuple[str, int], ...],
+    name: str,
+    years: tuple[int, ...] | None,
+    geocodes: tuple[int, ...] | None,
+) -> pa.Table | None:
+    # `stamp` carries the files' mtimes so rewritten exports miss the cache;
+    # pyarrow tables are immutable, so cached entries can be shared safely.
+    # `name` is the DuckDB table, "{uf}" or "{uf}_curves"
+    files = [Path(f) for f, _ in stamp]
+    if source == "duckdb":
+        table = _read_duckdb(files[0], name, years, geocodes)
+        return None if table is None else _with_disease(table)
+    if source in ("parquet", "geoparquet"):
+        filters = None
+        if geocodes is not None:
+            filters = [("geocode", "in", list(geocodes))]
+        tables = [pq.read_table(str(f), filters=filters) for f in files]
+    else:
+        # Week codes such as "202402" would otherwise be read as integers
+        types = {**OPTIONAL_TYPES, "ew": pa.string()}
+        convert = pv.ConvertOptions(
+            column_types=types, strings_can_be_null=True
+        )
+        tables = [pv.read_csv(f, convert_options=convert) for f in files]
+
+    # Files are read one by one and their optional columns cast, since
+    # exports written before these dtypes were pinned stored all-null
+    # columns as null or float types, and may lack columns added since
+    table = pa.concat_tables(
+        (_with_disease(_cast_optional(t)) for t in tables),
+        promote_options="default",
+    )
+    if source == "csv" and geocodes is not None:
+        mask = pc.is_in(
+            table["geocode"], value_set=pa.array(geocodes, pa.int64())
+        )
+        table = table.filter(mask)
+    # Arrow sorts are stable, so curve rows keep their week order
+    return table.sort_by([("year", "ascending"), ("geocode", "ascending")])
+
+
+def _cast_optional(table: pa.Table) -> pa.Table:
+    for col, dtype in OPTIONAL_TYPES.items():
+        if col in table.column_names:
+            i = table.column_names.index(col)
+            table = table.set_column(i, col, table[col].cast(dtype))
+    return table
+
+
+def _with_disease(table: pa.Table) -> pa.Table:
+    # Results exported before scans covered several diseases are dengue
+    if "disease" in table.column_names:
+        return table
+    i = table.column_names.index("year") + 1
+    return table.add_column(
+        i, "disease", pa.array(["dengue"] * table.num_rows, pa.string())
+    )
+
+
+def _read_duckdb(
+    db: Path,
+    table: str,
+    years: tuple[int, ...] | None,
+    geocodes: tuple[int, ...] | None,
+) -> pa.Table | None:
+    sql = f'SELECT * FROM "{table}" WHERE true'
+    params: list[int] = []
+    for col, values in (("year", years), ("geocode", geocodes)):
+        if values is not None:
+            sql += f" AND {col} IN ({', '.join('?' * len(values))})"
+            params.extend(values)
+    sql += " ORDER BY year, geocode"
+    if table.endswith(CURVES):
+        sql += ", disease, t"
+
+    con = duckdb.connect(str(db.absolute()), read_only=True)
+    try:
+        return con.execute(sql, params).arrow()
+    except CatalogException:
+        return None
+    finally:
+        con.close()
@@ -1,19 +1,103 @@
+from __future__ import annotations
+
 __all__ = ["EpiScanner"]
 
+import itertools
 from pathlib import Path
+from typing import Any, Callable, Collection, Iterable, Sequence
 
 import duckdb
-from duckdb import BinderException, CatalogException
 from loguru import logger
-import numpy as np
 import pandas as pd
+import pyarrow as pa
 from pydantic import TypeAdapter
+from sqlalchemy.engine import Engine
+
+from .analysis.richards import PEAK_FRACTION, sum_res
+from .checkpoint import Checkpoint, job_key
+from .compact import AlertaTable, CurveStore, column
+from .config import CACHEPATH
+from .geometry import GeometryStore
+from .memory import (
+    COMPACT_ROW_BYTES,
+    ROW_BYTES,
+    MemoryMonitor,
+    ResourcePlan,
+    estimate_memory,
+    plan_resources,
+)
+from .models import CUM_CASES, N_WEEKS, THR_PROB, AnalysisModel, Richards
+from .pipeline import ExportPipeline, FrameSink
+from .progress import ProgressCallback
+from .results import (
+    CURVES,
+    DUCKDB_FILE,
+    CurvesOutput,
+    Output,
+    curves_frame,
+    load_curves,
+    load_results,
+    results_frame,
+)
+from .schedule import (
+    FitTimings,
+    ScanPlan,
+    estimate_seconds,
+    makespan,
+    plan_batches,
+)
+from .schemas import (
+    AlertaData,
+    AlertaRow,
+    FittedCurve,
+    SirParams,
+    parse_alerta,
+)
+from .snapshot import load_snapshot
+from .sources import read_duckdb, read_sql
+from .types import UF, UF_IBGE, Disease, ExportFormat, Year
+
+INDEXED_COLUMNS = ("geocode", "year")
+# Cities per pipelined write without a memory plan, and the weeks assumed
+# per curve when sizing curve batches
+PIPELINE_ROWS = 500
+CURVE_WEEKS = 52
+# Columns of ScanPlan.cities
+CITY_COLUMNS = [
+    "uf",
+    "year",
+    "disease",
+    "geocode",
+    "fit",
+    "weeks",
+    "cases",
+    "seconds",
+]
 
-from .models import Richards
-from .schemas import AlertaData, SirParams, parse_alerta
-from .types import UF, ExportFormat, Year
 
-CACHEPATH = Path.home() / "episcanner"
+def _collect(
+    chunks: Iterable[list[AlertaRow]], compact: bool = False
+) -> Sequence[AlertaRow]:
+    # Streaming bounds the fetch buffer only: the scanner keeps every row
+    # of the filtered window once the chunks are gathered here. Compact
+    # chunks are converted as they arrive
+    if compact:
+        return AlertaTable.concat(AlertaTable.from_rows(c) for c in chunks)
+    return [row for chunk in chunks for row in chunk]
+
+
+def _geometry_store(
+    export_to: ExportFormat | None,
+    geometries: str | Path | GeometryStore | None,
+) -> GeometryStore | None:
+    # Loaded before fitting, so a missing or unreadable layer fails fast
+    if export_to != "geoparquet":
+        return None
+    if geometries is None:
+        raise ValueError("geoparquet export needs geometries")
+    if isinstance(geometries, GeometryStore):
+        return geometries
+    return GeometryStore.from_file(geometries)
 
 
 class EpiScanner:
@@ -21,83 +105,523 @@ class EpiScanner:
         self,
         data: AlertaData,
         year: Year,
+        memory_limit: int | None = None,
+        model: type[AnalysisModel] = Richards,
+        compact: bool = False,
+        snapshot: bool | str | Path = False,
     ):
-        self.data = parse_alerta(data)
+        self.model = model
+        self.memory = MemoryMonitor()
+        self.memory_limit = memory_limit
+        # Compact scanners hold the input as an AlertaTable and the curves
+        # to export in a CurveStore. A `snapshot` scanner's table is mapped
+        # from a file under CACHEPATH/snapshots, or the given directory,
+        # parsed only by the first scan of the same input
+        self.compact = (
+            compact or bool(snapshot) or isinstance(data, AlertaTable)
+        )
+        self.data: Sequence[AlertaRow]
+        with self.memory.stage("parse"):
+            if snapshot:
+                self.data = (
+                    load_snapshot(data)
+                    if snapshot is True
+                    else load_snapshot(data, snapshot)
+                )
+            elif self.compact:
+                self.data = AlertaTable.from_data(data)
+            else:
+                self.data = parse_alerta(data)
         self.year = TypeAdapter(Year).validate_python(year)
 
+    @classmethod
+    def from_sql(
+        cls,
+        engine: Engine,
+        year: Year,
+        uf: UF | None = None,
+        geocodes: Sequence[int] | None = None,
+        diseases: Sequence[Disease] | Disease = "dengue",
+        compact: bool = False,
+        **kwargs,
+    ) -> EpiScanner:
+        # Each disease is read from its own alert table into one scanner,
+        # so all of them share the partition and fit passes
+        year = TypeAdapter(Year).validate_python(year)
+        if isinstance(diseases, str):
+            diseases = [diseases]
+        chunks = itertools.chain.from_iterable(
+            read_sql(engine, year, uf, geocodes, disease=d, **kwargs)
+            for d in diseases
+        )
+        return cls(_collect(chunks, compact), year, compact=compact)
+
+    @classmethod
+    def from_duckdb(
+        cls,
+        path: str | Path,
+        query: str,
+        year: Year,
+        uf: UF | None = None,
+        geocodes: Sequence[int] | None = None,
+        disease: Disease = "dengue",
+        compact: bool = False,
+        **kwargs,
+    ) -> EpiScanner:
+        year = TypeAdapter(Year).validate_python(year)
+        chunks = read_duckdb(
+            path, query, year, uf, geocodes, disease=disease, **kwargs
+        )
+        return cls(_collect(chunks, compact), year, compact=compact)
+
+    @staticmethod
+    def load_results(
+        uf: UF | None = None,
+        years: Sequence[int] | int | None = None,
+        geocodes: Sequence[int] | int | None = None,
+        source: ExportFormat = "parquet",
+        output_dir: str | Path = CACHEPATH,
+        output: Output = "pandas",
+        diseases: Sequence[Disease] | Disease | None = None,
+    ) -> pd.DataFrame | pa.Table | list[SirParams]:
+        return load_results(
+            output_dir, uf, years, geocodes, source, output, diseases
+        )
+
+    @staticmethod
+    def load_curves(
+        uf: UF | None = None,
+        years: Sequence[int] | int | None = None,
+        geocodes: Sequence[int] | int | None = None,
+        source: ExportFormat = "parquet",
+        output_dir: str | Path = CACHEPATH,
+        output: CurvesOutput = "pandas",
+        diseases: Sequence[Disease] | Disease | None = None,
+    ) -> pd.DataFrame | pa.Table:
+        return load_curves(
+            output_dir, uf, years, geocodes, source, output, diseases
+        )
+
     def richards(
         self,
         export_to: ExportFormat | None = None,
         export_uf: UF | None = None,
         export_output: str | Path = CACHEPATH,
+        processes: int = 1,
+        batch_size: int | None = None,
+        checkpoint: bool | str | Path = False,
+        checkpoint_every: int = 10,
+        export_curves: bool = False,
+        progress: ProgressCallback | None = None,
+        timings: bool | str | Path = False,
+        geometries: str | Path | GeometryStore | None = None,
+        pipeline: bool = False,
+        **fit_kws,
     ) -> list[SirParams]:
-        models, curves = Richards.scan(self.data, self.year)
-        results = []
-        for geocode, model in models.items():
-            curve = curves[geocode]
-            sir = model.get_SIR_pars()
-            ep = model.comp_duration(curve)
-            residuals = np.array(curve.richards) - np.array(curve.casos_cum)
-            sum_res = float(sum(abs(residuals)) / max(curve.casos_cum))
-
-            results.append(
-                SirParams(
-                    geocode=geocode,
-                    year=self.year,
-                    ep_ini=ep.ini,
-                    ep_pw=ep.pw,
-                    ep_end=ep.end,
-                    ep_dur=ep.dur,
-                    peak_week=model.tp1,
-                    beta=sir.beta,
-                    gamma=sir.gamma,
-                    R0=sir.R0,
-                    total_cases=model.L,
-                    alpha=model.a,
-                    sum_res=sum_res,
-                    t_ini=ep.t_ini,
-                    t_end=ep.t_end,
-                )
+        if (
+            export_to is not None
+            and export_uf is not None
+            and export_to not in ("csv", "parquet", "geoparquet", "duckdb")
+        ):
+            raise ValueError(
+                f"Invalid format '{export_to}'. Options: csv, parquet,"
+                " geoparquet, duckdb"
+            )
+        if pipeline and export_to == "geoparquet":
+            raise ValueError(
+                "Pipelined export supports csv, parquet and duckdb, not"
+                " geoparquet"
+            )
+        geometry_store = _geometry_store(export_to, geometries)
+        with self.memory.stage("partition"):
+            partitions = self.model.partition_diseases(self.data)
+
+        flush_rows = None
+        plan = self._resource_plan(len(partitions))
+        if plan is not None:
+            processes, batch_size = plan.processes, plan.batch_size
+            flush_rows = plan.flush_rows
+
+        store = None
+        if checkpoint:
+            checkpoint_dir = (
+                CACHEPATH / "checkpoints"
+                if checkpoint is True
+                else Path(checkpoint)
+            )
+            # A checkpoint of another model's job must not be resumed
+            key = job_key(
+                self.data, self.year, model=self.model.__name__, **fit_kws
+            )
+            store = Checkpoint(
+                checkpoint_dir / f"{key}.jsonl", checkpoint_every
+            )
+
+        history = self._timings(timings, fit_kws.get("engine", "lmfit"))
+
+        # With `pipeline`, results and curves are written by a background
+        # thread as fits land instead of in an export stage after them
+        writer = None
+        if pipeline and export_to is not None and export_uf is not None:
+            writer = self._pipeline(
+                export_to, export_uf, export_output, export_curves, flush_rows
             )
 
-        if export_to is not None and export_uf is not None:
-            if export_to not in ("csv", "parquet", "duckdb"):
-                raise ValueError(
-                    "Invalid format "
-                    f"'{export_to}'. Options: csv, parquet, duckdb"
+        with self.memory.stage("fit"):
+            results: list[SirParams] = []
+            curves: list[tuple[SirParams, FittedCurve]] | CurveStore = (
+                CurveStore() if self.compact else []
+            )
+
+            def collect(params: SirParams, curve: FittedCurve | None) -> None:
+                results.append(params)
+                if writer is not None:
+                    writer.put("results", params)
+                    if curve is not None:
+                        writer.put("curves", (params, curve))
+                elif curve is not None:
+                    curves.append((params, curve))
+
+            if store is not None:
+                for (disease, geocode), params in store.results.items():
+                    resumed = None
+                    if export_curves:
+                        # Resumed cities only kept their parameters
+                        fit_data = self.model.screen(
+                            partitions[disease, geocode], self.year
+                        )
+                        model = store.model(geocode, disease)
+                        resumed = model.to_curve(fit_data or [])
+                    collect(params, resumed)
+            # The pipelined export replaces its targets only once the whole
+            # scan succeeded
+            scanned = False
+            try:
+                for (disease, geocode), model, curve in self.model.iter_scan(
+                    partitions,
+                    self.year,
+                    processes,
+                    batch_size,
+                    skip=() if store is None else set(store.results),
+                    progress=progress,
+                    timings=history,
+                    **fit_kws,
+                ):
+                    params = self._sir_params(geocode, model, curve, disease)
+                    collect(params, curve if export_curves else None)
+                    if store is not None:
+                        store.add(params, model)
+                scanned = True
+            finally:
+                if writer is not None:
+                    writer.close(commit=scanned)
+                if store is not None:
+                    store.flush()
+                if history is not None:
+                    history.save()
+
+        if writer is not None and not results:
+            raise ValueError("No data to export")
+        if writer is None and export_to is not None and export_uf is not None:
+            with self.memory.stage("export"):
+                self._export(
+                    results,
+                    export_to,
+                    export_uf,
+                    export_output,
+                    flush_rows,
+                    geometry_store,
                 )
-            self._export(results, export_to, export_uf, export_output)
+                if export_curves:
+                    self._export_curves(
+                        curves, export_to, export_uf, export_output, flush_rows
+                    )
 
+        if store is not None:
+            store.remove()
         return results
 
+    def sweep(
+        self,
+        thr_prob: Sequence[float] = (THR_PROB,),
+        n_weeks: Sequence[int] = (N_WEEKS,),
+        cum_cases: Sequence[float] = (CUM_CASES,),
+        peak_fraction: Sequence[float] = (PEAK_FRACTION,),
+        processes: int = 1,
+        batch_size: int | None = None,
+        progress: ProgressCallback | None = None,
+        **fit_kws,
+    ) -> pd.DataFrame:
+        # Threshold sensitivity over the grid of all combinations: one row
+        # per grid point and city passing its screening, with the grid
+        # values in front of the results_frame columns. A city passing at
+        # stricter thresholds also passes at looser ones and its fit window
+        # does not depend on them, so every city is fitted once, screened at
+        # the loosest point; only screening and durations are redone
+        grid = list(itertools.product(thr_prob, n_weeks, cum_cases))
+        if not grid or not peak_fraction:
+            raise ValueError("Every threshold grid needs at least one value")
+        partitions = self.model.partition_diseases(self.data)
+        loosest = {
+            "thr_prob": min(thr_prob),
+            "n_weeks": min(n_weeks),
+            "cum_cases": min(cum_cases),
+        }
+        fits = {
+            key: (model, curve)
+            for key, model, curve in self.model.iter_scan(
+                partitions,
+                self.year,
+                processes,
+                batch_size,
+                progress=progress,
+                screen_kws=loosest,
+                **fit_kws,
+            )
+        }
+        params = {
+            (key, fraction): self._sir_params(
+                key[1], model, curve, key[0], fraction
+            )
+            for key, (model, curve) in fits.items()
+            for fraction in peak_fraction
+        }
+
+        points: list[tuple[float, int, float, float]] = []
+        results: list[SirParams] = []
+        for thr, weeks, cases in grid:
+            passed = [
+                key
+                for key in fits
+                if self.model.screen(
+                    partitions[key], self.year, thr, weeks, cases
+                )
+                is not None
+            ]
+            for fraction in peak_fraction:
+                points += [(thr, weeks, cases, fraction)] * len(passed)
+                results += [params[key, fraction] for key in passed]
+
+        df = results_frame(results)
+        columns = ["thr_prob", "n_weeks", "cum_cases", "peak_fraction"]
+        grid_df = pd.DataFrame(points, columns=columns)
+        grid_df["n_weeks"] = grid_df["n_weeks"].astype("int64")
+        return pd.concat([grid_df, df], axis=1)
+
+    def explain(
+        self,
+        processes: int = 1,
+        batch_size: int | None = None,
+        timings: bool | str | Path = True,
+        **fit_kws,
+    ) -> ScanPlan:
+        # Dry run of `richards` with the same arguments: only partitions
+        # and screens the data, then prices every city it would fit. Fit
+        # times come from the cost model, calibrated on the timings that
+        # scans with `timings` recorded; memory from the plan_resources
+        # footprints
+        with self.memory.stage("partition"):
+            partitions = self.model.partition_diseases(self.data)
+        plan = self._resource_plan(len(partitions))
+        if plan is not None:
+            processes, batch_size = plan.processes, plan.batch_size
+
+        tasks = []
+        for key, city_data in partitions.items():
+            fit_data = self.model.screen(city_data, self.year)
+            if fit_data is not None:
+                tasks.append((key, fit_data))
+
+        engine = fit_kws.get("engine", "lmfit")
+        history = self._timings(timings, engine)
+        seconds = dict(
+            zip(
+                [key for key, _ in tasks],
+                estimate_seconds(tasks, history, engine).tolist(),
+            )
+        )
+        calibrated = history is not None and (
+            history.scale is not None
+            or any(history.get(key) is not None for key, _ in tasks)
+        )
+
+        batch_rows = 0
+        wall_seconds = sum(seconds.values())
+        if processes > 1:
+            per_worker = 1 if self.model.batched else 4
+            batches = plan_batches(
+                tasks, processes, per_worker, batch_size, history
+            )
+            wall_seconds = makespan(
+                [sum(seconds[key] for key, _ in b) for b in batches],
+                processes,
+            )
+            batch_rows = max(
+                (sum(len(data) for _, data in b) for b in batches), default=0
+            )
+        memory_bytes = estimate_memory(
+            len(self.data),
+            len(tasks),
+            processes,
+            batch_rows,
+            COMPACT_ROW_BYTES if self.compact else ROW_BYTES,
+        )
+
+        ufs = {code: uf for uf, code in UF_IBGE.items()}
+        fitted = dict(tasks)
+        records = []
+        for disease, geocode in partitions:
+            fit_data = fitted.get((disease, geocode), [])
+            records.append(
+                {
+                    "uf": ufs.get(geocode // 100_000),
+                    "year": self.year,
+                    "disease": disease,
+                    "geocode": geocode,
+                    "fit": (disease, geocode) in fitted,
+                    "weeks": len(fit_data),
+                    "cases": float(column(fit_data, "casos_est").sum()),
+                    "seconds": seconds.get((disease, geocode), 0.0),
+                }
+            )
+        cities = pd.DataFrame(records, columns=CITY_COLUMNS)
+        result = ScanPlan(
+            year=self.year,
+            processes=processes,
+            partitions=len(partitions),
+            fitted=len(tasks),
+            rows=len(self.data),
+            cpu_seconds=float(sum(seconds.values())),
+            wall_seconds=float(wall_seconds),
+            memory_bytes=memory_bytes,
+            calibrated=calibrated,
+            cities=cities,
+        )
+        logger.info(
+            f"{result.fitted} of {result.partitions} cities to fit:"
+            f" ~{result.cpu_seconds:.0f} CPU s, ~{result.wall_seconds:.0f} s"
+            f" on {processes} processes, {memory_bytes / 2**20:.0f} MiB"
+            + ("" if calibrated else " (uncalibrated)")
+        )
+        return result
+
+    def _resource_plan(self, n_partitions: int) -> ResourcePlan | None:
+        if self.memory_limit is None:
+            return None
+        plan = plan_resources(
+            self.memory_limit,
+            n_partitions,
+            len(self.data) / max(1, n_partitions),
+            row_bytes=COMPACT_ROW_BYTES if self.compact else ROW_BYTES,
+        )
+        logger.info(f"Adaptive plan under {self.memory_limit} B: {plan}")
+        return plan
+
+    def _timings(
+        self, timings: bool | str | Path, engine: str
+    ) -> FitTimings | None:
+        if not timings:
+            return None
+        return FitTimings(
+            CACHEPATH / "timings" / f"{self.model.__name__}_{engine}.json"
+            if timings is True
+            else timings
+        )
+
+    def _sir_params(
+        self,
+        geocode: int,
+        model: AnalysisModel,
+        curve: FittedCurve,
+        disease: str = "dengue",
+        peak_fraction: float = PEAK_FRACTION,
+    ) -> SirParams:
+        sir = model.get_SIR_pars()
+        ep = model.comp_duration(curve, peak_fraction)
+        bounds = {
+            f"{name}_{side}": value
+            for name, interval in (model.intervals or {}).items()
+            for side, value in zip(("lower", "upper"), interval)
+        }
+
+        return SirParams(
+            geocode=geocode,
+            year=self.year,
+            disease=disease,
+            ep_ini=ep.ini,
+            ep_pw=ep.pw,
+            ep_end=ep.end,
+            ep_dur=ep.dur,
+            peak_week=model.tp1,
+            beta=sir.beta,
+            gamma=sir.gamma,
+            R0=sir.R0,
+            total_cases=model.total_cases,
+            alpha=model.a,
+            sum_res=sum_res(curve.casos_cum, curve.richards),
+            fit_tier=model.tier,
+            t_ini=ep.t_ini,
+            t_end=ep.t_end,
+            **bounds,
+        )
+
     def _export(
         self,
         results: list[SirParams],
         to: ExportFormat,
         uf: str,
         output_dir: str | Path = CACHEPATH,
+        flush_rows: int | None = None,
+        geometries: GeometryStore | None = None,
     ) -> str:
         if not results:
             raise ValueError("No data to export")
+        df = results_frame(results)
+        if to == "geoparquet":
+            if geometries is None:
+                raise ValueError("geoparquet export needs geometries")
+            df = geometries.join(df)
+        return self._write(df, to, uf, output_dir, flush_rows)
 
-        df = pd.DataFrame([r.model_dump() for r in results])
-
-        output_dir = Path(output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        file = output_dir / f"{uf}_{self.year}.{to}"
+    def _export_curves(
+        self,
+        curves: list[tuple[SirParams, FittedCurve]] | CurveStore,
+        to: ExportFormat,
+        uf: str,
+        output_dir: str | Path = CACHEPATH,
+        flush_rows: int | None = None,
+    ) -> str:
+        # One row per city and week, written next to the results as
+        # "{uf}_{year}_curves.{ext}" or the DuckDB table "{uf}_curves"
+        if not curves:
+            raise ValueError("No curves to export")
+        if to == "geoparquet":
+            # Curves carry no geometry; they join the map by geocode
+            to = "parquet"
+        df = curves_frame(curves)
+        return self._write(df, to, uf, output_dir, flush_rows, CURVES)
 
-        if file.exists() and to != "duckdb":
+    def _write(
+        self,
+        df: pd.DataFrame,
+        to: ExportFormat,
+        uf: str,
+        output_dir: str | Path,
+        flush_rows: int | None = None,
+        suffix: str = "",
+    ) -> str:
+        file = self._target(to, uf, output_dir, suffix)
+        if to != "duckdb" and file.exists():
             logger.warning(f"Overriding {file}")
             file.unlink()
-
         try:
             if to == "csv":
-                df.to_csv(file, index=False)
-            elif to == "parquet":
-                df.to_parquet(file, index=False)
+                df.to_csv(file, index=False, chunksize=flush_rows)
+            elif to in ("parquet", "geoparquet"):
+                # A GeoDataFrame writes its geometry as GeoParquet
+                df.to_parquet(file, index=False, row_group_size=flush_rows)
             elif to == "duckdb":
-                file = self._to_duckdb(df, uf, output_dir)
+                file = self._to_duckdb(df, f"{uf}{suffix}", output_dir)
 
             logger.info(f"{uf} data for {self.year} wrote to {file}")
         except (FileNotFoundError, PermissionError) as e:  # pragma: no cover
@@ -107,34 +631,136 @@ class EpiScanner:
 
         return str(file.absolute())
 
+    def _pipeline(
+        self,
+        to: ExportFormat,
+        uf: str,
+        output_dir: str | Path,
+        export_curves: bool,
+        flush_rows: int | None,
+    ) -> ExportPipeline:
+        # Result batches of `flush_rows` (or PIPELINE_ROWS) cities become
+        # Parquet row groups or DuckDB transactions; curve batches hold
+        # about as many rows
+        rows = flush_rows or PIPELINE_ROWS
+        sinks = {"results": self._sink(to, uf, output_dir, results_frame)}
+        batch = {"results": rows}
+        if export_curves:
+            sinks["curves"] = self._sink(
+                to, uf, output_dir, curves_frame, CURVES
+            )
+            batch["curves"] = max(1, rows // CURVE_WEEKS)
+        return ExportPipeline(sinks, batch)
+
+    def _sink(
+        self,
+        to: ExportFormat,
+        uf: str,
+        output_dir: str | Path,
+        frame: Callable[[Sequence[Any]], pd.DataFrame],
+        suffix: str = "",
+    ) -> FrameSink:
+        if to == "duckdb":
+            db = self._target(to, uf, output_dir, suffix)
+            return FrameSink(
+                to, db, frame, f"{uf}{suffix}", self._duckdb_insert
+            )
+        return FrameSink(to, self._target(to, uf, output_dir, suffix), frame)
+
+    def _target(
+        self, to: ExportFormat, uf: str, output_dir: str | Path, suffix: str
+    ) -> Path:
+        # The export file, or the shared DuckDB database
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        if to == "duckdb":
+            return output_dir / DUCKDB_FILE
+        return output_dir / f"{uf}_{self.year}{suffix}.{to}"
+
     def _to_duckdb(
-        self, df: pd.DataFrame, uf: str, output_dir: str | Path
+        self, df: pd.DataFrame, table: str, output_dir: str | Path
     ) -> Path:
-        db = Path(output_dir) / "episcanner.duckdb"
+        db = Path(output_dir) / DUCKDB_FILE
         con = duckdb.connect(str(db.absolute()))
-
         try:
-            str_cols = df.select_dtypes(include=["object"]).columns
-            df[str_cols] = df[str_cols].astype("string")
+            self._duckdb_insert(con, df, table, set(df.disease))
+        finally:
+            con.close()
+        return db
 
-            con.register("data", df)
+    def _duckdb_insert(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        df: pd.DataFrame,
+        table: str,
+        replace: Collection[str],
+    ) -> None:
+        # Inserts `df` into `table`, first deleting the year's rows of the
+        # `replace` diseases
+        try:
+            # Registering through Arrow keeps all-null string columns as
+            # VARCHAR, which DuckDB would infer as INTEGER from pandas
+            con.register(
+                "data", pa.Table.from_pandas(df, preserve_index=False)
+            )
 
-            try:
-                result = con.execute(
-                    f"SELECT COUNT(*) FROM '{uf}'" f" WHERE year = {self.year}"
-                ).fetchone()
-                rows = result[0] if result else 0
-
-                if rows > 0:
-                    logger.warning(f"Overriding data for {self.year}")
-                    con.execute(f"DELETE FROM '{uf}' WHERE year = {self.year}")
-                con.execute(f"INSERT INTO '{uf}' SELECT * FROM data")
-            except (CatalogException, BinderException):
+            columns = {
+                name
+                for name, in con.execute(
+                    "SELECT column_name FROM information_schema.columns"
+                    " WHERE table_name = ?",
+                    [table],
+                ).fetchall()
+            }
+            if not columns:
+                con.execute(f"CREATE TABLE '{table}' AS SELECT * FROM data")
+            else:
+                new = [
+                    (name, dtype)
+                    for name, dtype, *_ in con.execute(
+                        "DESCRIBE data"
+                    ).fetchall()
+                    if name not in columns
+                ]
+                if new:
+                    # Tables exported by older versions gain the new
+                    # columns: disease defaults to dengue, the only disease
+                    # they held, others to NULL. DuckDB cannot alter an
+                    # indexed table, so the indexes are dropped and rebuilt
+                    for col in INDEXED_COLUMNS:
+                        con.execute(
+                            f'DROP INDEX IF EXISTS "{table}_{col}_idx"'
+                        )
+                    for name, dtype in new:
+                        default = " DEFAULT 'dengue'" * (name == "disease")
+                        con.execute(
+                            f"ALTER TABLE '{table}'"
+                            f' ADD COLUMN "{name}" {dtype}{default}'
+                        )
+                # Only the diseases of this scan are replaced for the year
+                diseases = sorted(replace)
+                if diseases:
+                    where = (
+                        f"WHERE year = ? AND disease IN"
+                        f" ({', '.join('?' * len(diseases))})"
+                    )
+                    params = [self.year, *diseases]
+                    result = con.execute(
+                        f"SELECT COUNT(*) FROM '{table}' {where}", params
+                    ).fetchone()
+                    if result and result[0] > 0:
+                        logger.warning(
+                            f"Overriding {', '.join(diseases)} data for"
+                            f" {self.year}"
+                        )
+                        con.execute(f"DELETE FROM '{table}' {where}", params)
+                con.execute(
+                    f"INSERT INTO '{table}' BY NAME SELECT * FROM data"
+                )
+            for col in INDEXED_COLUMNS:
                 con.execute(
-                    f"CREATE TABLE IF NOT EXISTS '{uf}'"
-                    " AS SELECT * FROM data"
+                    f'CREATE INDEX IF NOT EXISTS "{table}_{col}_idx"'
+                    f' ON "{table}" ({col})'
                 )
         finally:
             con.unregister("data")
-            con.close()
-        return db
@@ -0,0 +1,217 @@
+__all__ = [
+    "FitTimings",
+    "ScanPlan",
+    "estimate_cost",
+    "estimate_seconds",
+    "makespan",
+    "plan_batches",
+]
+
+import heapq
+import json
+import math
+import os
+from pathlib import Path
+from typing import Hashable, Sequence, TypeVar
+
+from loguru import logger
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from pydantic import BaseModel, ConfigDict
+
+from .compact import column
+from .schemas import AlertaRow
+
+K = TypeVar("K", bound=Hashable)
+SMOOTHING = 0.5  # weight of the newest time in the moving average
+# Seconds per estimate_cost unit of a Richards fit with each engine, measured
+# on the benchmark corpus. Used until FitTimings has calibrated its own scale
+SECONDS_PER_COST = {
+    "lmfit": 7e-3,
+    "vectorized": 7e-4,
+    "shapes": 7e-5,
+    "tiered": 7e-5,
+}
+
+
+class FitTimings:
+    # Wall time of past fits per partition key, persisted as JSON. Keys are
+    # stored as their repr so (disease, geocode) tuples survive the trip.
+    # Fits recorded with their estimate_cost also accumulate the seconds
+    # per cost unit, which prices cities that were never timed
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = None if path is None else Path(path)
+        self.seconds: dict[str, float] = {}
+        # Total seconds and cost units of the fits recorded with a cost
+        self.cost = [0.0, 0.0]
+        if self.path is not None and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring unreadable fit timings {self.path}")
+            else:
+                # Older files hold the per-key seconds only
+                if isinstance(data.get("seconds"), dict):
+                    self.seconds = data["seconds"]
+                    self.cost = data.get("cost", self.cost)
+                else:
+                    self.seconds = data
+
+    @property
+    def scale(self) -> float | None:
+        seconds, units = self.cost
+        return seconds / units if units > 0 else None
+
+    def get(self, key: Hashable) -> float | None:
+        return self.seconds.get(repr(key))
+
+    def record(
+        self, key: Hashable, seconds: float, cost: float | None = None
+    ) -> None:
+        if cost:
+            self.cost = [self.cost[0] + seconds, self.cost[1] + cost]
+        old = self.seconds.get(repr(key))
+        if old is not None:
+            seconds = SMOOTHING * seconds + (1 - SMOOTHING) * old
+        self.seconds[repr(key)] = seconds
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"seconds": self.seconds, "cost": self.cost})
+        )
+        os.replace(tmp, self.path)
+
+
+def estimate_cost(fit_data: Sequence[AlertaRow]) -> float:
+    # Relative fit cost from the series alone: every objective evaluation
+    # is linear in the window length, noisy series take more generations
+    # to converge and large counts widen the L1 search range
+    cases = column(fit_data, "casos_est").astype(np.float64)
+    if len(cases) == 0:
+        return 0.0
+    roughness = np.abs(np.diff(cases, n=2)).mean() if len(cases) > 2 else 0.0
+    noise = roughness / (cases.mean() + 1.0)
+    volume = math.log10(cases.sum() + 10.0)
+    return float(len(cases) * (1.0 + noise) * volume)
+
+
+def estimate_seconds(
+    tasks: Sequence[tuple[K, Sequence[AlertaRow]]],
+    timings: FitTimings | None = None,
+    engine: str = "lmfit",
+) -> npt.NDArray[np.float64]:
+    # Expected fit time of each task, for plans made before fitting
+    return _costs(tasks, timings, SECONDS_PER_COST.get(engine))
+
+
+def _costs(
+    tasks: Sequence[tuple[K, Sequence[AlertaRow]]],
+    timings: FitTimings | None,
+    scale: float | None = None,
+) -> npt.NDArray[np.float64]:
+    costs = np.array(
+        [estimate_cost(data) for _, data in tasks], dtype=np.float64
+    )
+    known = []
+    if timings is not None:
+        known = [(i, timings.get(key)) for i, (key, _) in enumerate(tasks)]
+        known = [(i, s) for i, s in known if s is not None and costs[i] > 0]
+        if timings.scale is not None:
+            scale = timings.scale
+    # Past times win where they exist; the rest are scaled to seconds by
+    # the median ratio between measured times and model estimates, or by
+    # the recorded seconds per cost unit when no task was timed before
+    if known:
+        scale = float(np.median([s / costs[i] for i, s in known]))
+    if scale is not None:
+        costs = costs * scale
+    for i, s in known:
+        costs[i] = s
+    return costs
+
+
+def plan_batches(
+    tasks: Sequence[tuple[K, Sequence[AlertaRow]]],
+    processes: int,
+    per_worker: int,
+    batch_size: int | None = None,
+    timings: FitTimings | None = None,
+) -> list[list[tuple[K, Sequence[AlertaRow]]]]:
+    # Largest estimated cost first. With a fixed batch_size batches keep
+    # that size; otherwise each batch takes about 1/(per_worker*processes)
+    # of the cost still unassigned, so batches shrink towards the end and
+    # the pool's shared queue evens out the tail
+    costs = _costs(tasks, timings)
+    order = np.argsort(-costs, kind="stable")
+    ordered = [tasks[i] for i in order]
+    if batch_size is not None:
+        return [
+            ordered[i : i + batch_size]  # noqa: E203
+            for i in range(0, len(ordered), batch_size)
+        ]
+
+    batches: list[list[tuple[K, Sequence[AlertaRow]]]] = []
+    remaining = float(costs.sum())
+    current: list[tuple[K, Sequence[AlertaRow]]] = []
+    acc = 0.0
+    for i, task in zip(order, ordered):
+        current.append(task)
+        acc += costs[i]
+        if acc >= remaining / (per_worker * processes):
+            batches.append(current)
+            remaining -= acc
+            current, acc = [], 0.0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def makespan(seconds: Sequence[float], processes: int) -> float:
+    # Wall time of running jobs in order on `processes` workers, each taking
+    # the next job as soon as it is free, as the pool's shared queue does
+    if processes <= 1:
+        return float(sum(seconds))
+    free = [0.0] * processes
+    for s in seconds:
+        heapq.heappush(free, heapq.heappop(free) + s)
+    return max(free)
+
+
+class ScanPlan(BaseModel):
+    # What a scan would fit and what it would cost, from EpiScanner.explain
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    year: int
+    processes: int
+    partitions: int  # (disease, geocode) partitions in the data
+    fitted: int  # partitions that pass the screening
+    rows: int
+    cpu_seconds: float
+    wall_seconds: float
+    memory_bytes: int
+    calibrated: bool  # False when only SECONDS_PER_COST priced the fits
+    # One row per partition: uf, year, disease, geocode, fit, weeks, cases,
+    # seconds. Cities that fail the screening have fit False and no cost
+    cities: pd.DataFrame
+
+    def summary(self) -> pd.DataFrame:
+        # Per UF, year and disease: partitions, fitted geocodes, the
+        # shortest, median and longest fit window, and CPU seconds
+        fitted = self.cities.weeks.where(self.cities.fit)
+        return (
+            self.cities.assign(fitted_weeks=fitted)
+            .groupby(["uf", "year", "disease"], dropna=False)
+            .agg(
+                partitions=("geocode", "size"),
+                geocodes=("fit", "sum"),
+                weeks_min=("fitted_weeks", "min"),
+                weeks_median=("fitted_weeks", "median"),
+                weeks_max=("fitted_weeks", "max"),
+                cpu_seconds=("seconds", "sum"),
+            )
+        )
@@ -5,6 +5,8 @@ from epiweeks import Week
 import pandas as pd
 from pydantic import BaseModel, ConfigDict
 
+from .types import Disease
+
 
 class AlertaRow(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -13,6 +15,7 @@ class AlertaRow(BaseModel):
     casos_est: float
     geocode: int
     p_rt1: float
+    disease: Disease = "dengue"
 
 
 class AlertRow(BaseModel):
@@ -57,6 +60,7 @@ class EpDuration(BaseModel):
 class SirParams(BaseModel):
     geocode: int
     year: int
+    disease: str = "dengue"
     ep_ini: str | None = None
     ep_pw: str
     ep_end: str | None = None
@@ -70,6 +74,14 @@ class SirParams(BaseModel):
     sum_res: float
     t_ini: int | None = None
     t_end: int | None = None
+    fit_tier: str | None = None
+    # Confidence bounds, see AnalysisModel.confidence
+    R0_lower: float | None = None
+    R0_upper: float | None = None
+    peak_week_lower: float | None = None
+    peak_week_upper: float | None = None
+    total_cases_lower: float | None = None
+    total_cases_upper: float | None = None
 
 
 AlertaData: TypeAlias = (
@@ -123,4 +135,5 @@ def _dict_to_alerta(row: dict) -> AlertaRow:
         casos_est=float(row["casos_est"]),
         geocode=int(row.get("geocode", row.get("municipio_geocodigo", 0))),
         p_rt1=float(row["p_rt1"]),
+        disease=row.get("disease", "dengue"),
     )
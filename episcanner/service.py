@@ -0,0 +1,327 @@
+__all__ = ["ScanRequest", "ScanService", "SourceConfig", "main"]
+
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import ipaddress
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Literal, Mapping, Sequence
+
+from loguru import logger
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+import sqlalchemy as sa
+from sqlalchemy.engine import Engine
+
+from .checkpoint import job_key
+from .models import MODELS
+from .progress import ProgressCallback, log_progress
+from .scanner import EpiScanner
+from .schedule import FitTimings
+from .schemas import AlertaRow, SirParams
+from .types import UF, Disease, Year
+
+HOST = "127.0.0.1"
+PORT = 8531
+CACHE_SIZE = 10_000
+
+
+class SourceConfig(BaseModel):
+    # A database the service may read, set by the operator at start-up.
+    # Requests only name it: the service has no authentication, so
+    # connection strings, queries and reader options never come from them
+    type: Literal["duckdb", "sql"]
+    uri: str  # DuckDB database path or SQLAlchemy URL
+    query: str | None = None  # required for duckdb
+    options: dict[str, Any] = {}  # extra read_sql/read_duckdb arguments
+
+
+class SourceRef(BaseModel):
+    # Input read by the service itself instead of shipped in the request.
+    # Connection fields are refused rather than ignored
+    model_config = ConfigDict(extra="forbid")
+
+    name: str  # key of the service's `sources`
+    uf: UF | None = None
+    geocodes: list[int] | None = None
+    diseases: list[Disease] = ["dengue"]
+
+
+class ScanRequest(BaseModel):
+    year: Year
+    data: list[dict] | None = None
+    source: SourceRef | None = None
+    model: str = "Richards"
+    fit: dict[str, Any] = {}
+
+
+def _warm() -> int:
+    # Unpickling this task imports episcanner, and with it pandas, lmfit,
+    # scipy and duckdb, in the worker
+    return os.getpid()
+
+
+class ScanService:
+    def __init__(
+        self,
+        processes: int = 1,
+        cache_size: int = CACHE_SIZE,
+        progress: ProgressCallback | None = None,
+        sources: Mapping[str, SourceConfig] | None = None,
+    ) -> None:
+        self.processes = processes
+        self.sources = dict(sources or {})
+        self.progress = progress
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[str, SirParams] = OrderedDict()
+        self._lock = threading.Lock()
+        self._engines: dict[str, Engine] = {}
+        # Fit times of earlier requests order the cities of later ones
+        self.timings = FitTimings()
+        self.pool = None
+        if processes > 1:
+            self.pool = ProcessPoolExecutor(processes)
+            futures = [self.pool.submit(_warm) for _ in range(processes)]
+            pids = {f.result() for f in futures}
+            logger.info(f"Warmed {len(pids)} scan workers")
+
+    def __enter__(self) -> "ScanService":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+        for engine in self._engines.values():
+            engine.dispose()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "processes": self.processes,
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def scan(self, request: ScanRequest) -> list[SirParams]:
+        if request.model not in MODELS:
+            raise ValueError(
+                f"Invalid model '{request.model}'. Options: {sorted(MODELS)}"
+            )
+        scanner = self._scanner(request)
+        model_cls = scanner.model
+        partitions = model_cls.partition_diseases(scanner.data)
+
+        # Cities whose rows, year, model and fit options were seen before
+        # are answered from the cache; only the rest reach the pool
+        keys = {
+            key: job_key(
+                rows, scanner.year, model=request.model, **request.fit
+            )
+            for key, rows in partitions.items()
+        }
+        results = {}
+        with self._lock:
+            for key, digest in keys.items():
+                if digest in self._cache:
+                    self._cache.move_to_end(digest)
+                    results[key] = self._cache[digest]
+            self.hits += len(results)
+
+        fitted = model_cls.iter_scan(
+            partitions,
+            scanner.year,
+            self.processes,
+            skip=set(results),
+            pool=self.pool,
+            progress=self.progress,
+            timings=self.timings,
+            **request.fit,
+        )
+        for (disease, geocode), model, curve in fitted:
+            params = scanner._sir_params(geocode, model, curve, disease)
+            results[disease, geocode] = params
+            with self._lock:
+                self.misses += 1
+                self._cache[keys[disease, geocode]] = params
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [results[key] for key in partitions if key in results]
+
+    def _scanner(self, request: ScanRequest) -> EpiScanner:
+        model_cls = MODELS[request.model]
+        if (request.data is None) == (request.source is None):
+            raise ValueError("Exactly one of data or source must be given")
+        if request.data is not None:
+            return EpiScanner(request.data, request.year, model=model_cls)
+
+        ref = request.source
+        assert ref is not None
+        if ref.name not in self.sources:
+            raise ValueError(
+                f"Unknown source '{ref.name}'. Options: {sorted(self.sources)}"
+            )
+        src = self.sources[ref.name]
+        if src.type == "duckdb":
+            if src.query is None:
+                raise ValueError("A duckdb source needs a query")
+            read: list[AlertaRow] = []
+            for disease in ref.diseases:
+                read += EpiScanner.from_duckdb(
+                    src.uri,
+                    src.query,
+                    request.year,
+                    ref.uf,
+                    ref.geocodes,
+                    disease=disease,
+                    **src.options,
+                ).data
+            rows: Sequence[AlertaRow] = read
+        else:
+            rows = EpiScanner.from_sql(
+                self._engine(src.uri),
+                request.year,
+                ref.uf,
+                ref.geocodes,
+                diseases=ref.diseases,
+                **src.options,
+            ).data
+        return EpiScanner(rows, request.year, model=model_cls)
+
+    def _engine(self, url: str) -> Engine:
+        # One pooled engine per database, reused across requests
+        with self._lock:
+            if url not in self._engines:
+                self._engines[url] = sa.create_engine(url)
+            return self._engines[url]
+
+    def server(
+        self, host: str = HOST, port: int = PORT, allow_remote: bool = False
+    ) -> ThreadingHTTPServer:
+        # Anyone who reaches the port can run scans on the configured
+        # sources, so binding beyond loopback must be asked for
+        if not allow_remote and not _loopback(host):
+            raise ValueError(
+                f"{host} is not a loopback address and the service has no"
+                " authentication; pass allow_remote=True (--allow-remote)"
+                " to serve it behind your own access control"
+            )
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.service = self  # type: ignore[attr-defined]
+        return server
+
+
+def _loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        # Host names other than localhost may resolve anywhere
+        return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # GET /health -> service stats; POST /scan -> list of SirParams
+    server: ThreadingHTTPServer
+
+    @property
+    def service(self) -> ScanService:
+        return self.server.service  # type: ignore[attr-defined,no-any-return]
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._reply(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+            return
+        self._reply(HTTPStatus.OK, {"status": "ok", **self.service.stats()})
+
+    def do_POST(self) -> None:
+        if self.path != "/scan":
+            self._reply(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = ScanRequest.model_validate_json(self.rfile.read(length))
+            results = self.service.scan(request)
+        except (ValidationError, ValueError, TypeError) as e:
+            self._reply(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        except Exception as e:  # pragma: no cover
+            logger.exception("Scan failed")
+            self._reply(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+            return
+        self._reply(
+            HTTPStatus.OK,
+            {"results": [r.model_dump(mode="json") for r in results]},
+        )
+
+    def _reply(self, status: HTTPStatus, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve EpiScanner scans over HTTP"
+    )
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    parser.add_argument(
+        "--progress",
+        type=float,
+        metavar="SECONDS",
+        help="log scan progress at most every SECONDS",
+    )
+    parser.add_argument(
+        "--sources",
+        type=Path,
+        metavar="FILE",
+        help="JSON object of the sources requests may name, {name: config}",
+    )
+    parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help="allow a non-loopback --host; the service has no authentication",
+    )
+    args = parser.parse_args(argv)
+
+    progress = None if args.progress is None else log_progress(args.progress)
+    sources = None
+    if args.sources is not None:
+        sources = TypeAdapter(dict[str, SourceConfig]).validate_json(
+            args.sources.read_bytes()
+        )
+    with ScanService(
+        args.processes, args.cache_size, progress, sources
+    ) as service:
+        server = service.server(args.host, args.port, args.allow_remote)
+        logger.info(
+            f"Serving scans on http://{args.host}:{server.server_port}"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:  # pragma: no cover
+            pass
+        finally:
+            server.server_close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
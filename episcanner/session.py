@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+__all__ = ["ScanSession"]
+
+from pathlib import Path
+from typing import Any, Sequence
+
+from epiweeks import Week
+from loguru import logger
+
+from .config import CACHEPATH
+from .geometry import GeometryStore
+from .models import AnalysisModel, DiseaseKey, Richards
+from .progress import ProgressCallback
+from .scanner import EpiScanner, _geometry_store
+from .schemas import (
+    AlertaData,
+    AlertaRow,
+    FittedCurve,
+    SirParams,
+    parse_alerta,
+)
+from .types import UF, ExportFormat, Year
+
+
+class ScanSession(EpiScanner):
+    # Long-lived scanner for data that keeps being revised. Rows are held
+    # per (disease, geocode) partition and epiweek; `update` replaces or
+    # appends rows and marks only the partitions that changed, and
+    # `richards` refits those, serving every other city from memory
+    def __init__(
+        self,
+        data: AlertaData,
+        year: Year,
+        memory_limit: int | None = None,
+        model: type[AnalysisModel] = Richards,
+    ):
+        self._partitions: dict[DiseaseKey, dict[Week, AlertaRow]] = {}
+        self._dirty: set[DiseaseKey] = set()
+        self._results: dict[DiseaseKey, tuple[SirParams, FittedCurve]] = {}
+        self._fit_kws: dict[str, Any] | None = None
+        super().__init__(data, year, memory_limit, model)
+
+    @property  # type: ignore[override]
+    def data(self) -> list[AlertaRow]:
+        return [
+            part[ew]
+            for part in self._partitions.values()
+            for ew in sorted(part)
+        ]
+
+    @data.setter
+    def data(self, rows: Sequence[AlertaRow]) -> None:
+        self._partitions.clear()
+        self._results.clear()
+        self._dirty.clear()
+        self._add(rows)
+
+    @property
+    def dirty(self) -> set[DiseaseKey]:
+        return set(self._dirty)
+
+    def update(self, data: AlertaData) -> set[DiseaseKey]:
+        # Rows are matched on (disease, geocode, ew): new weeks are
+        # appended, revised ones replaced and identical ones ignored.
+        # Returns the partitions that changed
+        return self._add(parse_alerta(data))
+
+    def _add(self, rows: Sequence[AlertaRow]) -> set[DiseaseKey]:
+        changed = set()
+        for row in rows:
+            key = (row.disease, row.geocode)
+            part = self._partitions.setdefault(key, {})
+            if part.get(row.ew) != row:
+                part[row.ew] = row
+                changed.add(key)
+        self._dirty |= changed
+        return changed
+
+    def richards(
+        self,
+        export_to: ExportFormat | None = None,
+        export_uf: UF | None = None,
+        export_output: str | Path = CACHEPATH,
+        processes: int = 1,
+        batch_size: int | None = None,
+        checkpoint: bool | str | Path = False,
+        checkpoint_every: int = 10,
+        export_curves: bool = False,
+        progress: ProgressCallback | None = None,
+        timings: bool | str | Path = False,
+        geometries: str | Path | GeometryStore | None = None,
+        pipeline: bool = False,
+        **fit_kws,
+    ) -> list[SirParams]:
+        # The stored results already are the resumable state, and only the
+        # refitted cities are produced by the scan, so neither a checkpoint
+        # nor a pipelined export of it would cover the session
+        if checkpoint:
+            raise ValueError(
+                "ScanSession keeps its results in memory and does not take"
+                " a checkpoint"
+            )
+        if pipeline:
+            raise ValueError(
+                "ScanSession exports after refitting and does not take"
+                " pipeline"
+            )
+        if (
+            export_to is not None
+            and export_uf is not None
+            and export_to not in ("csv", "parquet", "geoparquet", "duckdb")
+        ):
+            raise ValueError(
+                f"Invalid format '{export_to}'. Options: csv, parquet,"
+                " geoparquet, duckdb"
+            )
+        geometry_store = _geometry_store(export_to, geometries)
+        # Other fit options invalidate every stored result
+        if fit_kws != self._fit_kws:
+            self._dirty = set(self._partitions)
+            self._results.clear()
+            self._fit_kws = fit_kws
+
+        dirty = {
+            key: [part[ew] for ew in sorted(part)]
+            for key, part in self._partitions.items()
+            if key in self._dirty
+        }
+        if dirty:
+            logger.debug(
+                f"Refitting {len(dirty)} of {len(self._partitions)} cities"
+            )
+
+        flush_rows = None
+        plan = self._resource_plan(len(dirty))
+        if plan is not None:
+            processes, batch_size = plan.processes, plan.batch_size
+            flush_rows = plan.flush_rows
+
+        history = self._timings(timings, fit_kws.get("engine", "lmfit"))
+        # Dirty cities that no longer pass the screening drop out
+        for key in dirty:
+            self._results.pop(key, None)
+        with self.memory.stage("fit"):
+            try:
+                for (disease, geocode), model, curve in self.model.iter_scan(
+                    dirty,
+                    self.year,
+                    processes,
+                    batch_size,
+                    progress=progress,
+                    timings=history,
+                    **fit_kws,
+                ):
+                    params = self._sir_params(geocode, model, curve, disease)
+                    self._results[disease, geocode] = (params, curve)
+            finally:
+                if history is not None:
+                    history.save()
+        self._dirty.clear()
+
+        fitted = [
+            self._results[key]
+            for key in self._partitions
+            if key in self._results
+        ]
+        results = [params for params, _ in fitted]
+        if export_to is not None and export_uf is not None:
+            with self.memory.stage("export"):
+                self._export(
+                    results,
+                    export_to,
+                    export_uf,
+                    export_output,
+                    flush_rows,
+                    geometry_store,
+                )
+                if export_curves:
+                    self._export_curves(
+                        fitted, export_to, export_uf, export_output, flush_rows
+                    )
+        return results
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+__all__ = ["fingerprint", "load_snapshot"]
+
+import hashlib
+import os
+from pathlib import Path
+
+from loguru import logger
+import pandas as pd
+
+from .compact import AlertaTable
+from .config import CACHEPATH
+from .schemas import AlertaData
+
+# Part of every fingerprint, so a change of the file layout orphans old
+# snapshots instead of misreading them
+SNAPSHOT_VERSION = 1
+
+
+def fingerprint(data: AlertaData | AlertaTable) -> str:
+    # Content hash of the input as given, before any parsing: DataFrames
+    # by their columns, dtypes and pandas' row hashes, other inputs by
+    # their repr
+    digest = hashlib.sha256(f"snapshot-v{SNAPSHOT_VERSION}".encode())
+    if isinstance(data, AlertaTable):
+        digest.update(data.digest().encode())
+    elif isinstance(data, pd.DataFrame):
+        digest.update(
+            repr([(c, str(t)) for c, t in data.dtypes.items()]).encode()
+        )
+        rows = pd.util.hash_pandas_object(data, index=False)
+        digest.update(rows.to_numpy().tobytes())
+    else:
+        digest.update(repr(data).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_snapshot(
+    data: AlertaData | AlertaTable,
+    cache_dir: str | Path = CACHEPATH / "snapshots",
+) -> AlertaTable:
+    # `data` parsed into an AlertaTable grouped by (disease, geocode, ew)
+    # and memory-mapped from "{fingerprint}.arrow" under `cache_dir`. A
+    # miss parses and writes the file first; the rename makes it appear
+    # whole, so concurrent scans of the same input never map a partial one
+    path = Path(cache_dir) / f"{fingerprint(data)}.arrow"
+    if not path.exists():
+        table = AlertaTable.from_data(data).sort()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(f".{os.getpid()}.tmp")
+        table.to_ipc(partial)
+        os.replace(partial, path)
+        logger.info(f"Wrote input snapshot {path} ({len(table)} rows)")
+    return AlertaTable.from_ipc(path)
@@ -0,0 +1,116 @@
+__all__ = ["read_sql", "read_duckdb", "week_range"]
+
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import duckdb
+from pydantic import TypeAdapter
+import sqlalchemy as sa
+from sqlalchemy.engine import Engine
+
+from .schemas import AlertaRow, parse_alerta
+from .types import UF, UF_IBGE, Disease
+
+TABLES = {
+    "dengue": "Historico_alerta",
+    "zika": "Historico_alerta_zika",
+    "chik": "Historico_alerta_chik",
+}
+TABLE = TABLES["dengue"]
+SCHEMA = "Municipio"
+WEEK_COLUMN = "SE"
+GEOCODE_COLUMN = "municipio_geocodigo"
+CHUNKSIZE = 10_000
+
+
+def week_range(year: int) -> tuple[int, int]:
+    # Weeks 45 of year-1 to 44 of year, the widest window Richards.scan uses
+    return (year - 1) * 100 + 45, year * 100 + 44
+
+
+def _geocode_range(uf: UF) -> tuple[int, int]:
+    code = UF_IBGE[TypeAdapter(UF).validate_python(uf)]
+    return code * 100_000, code * 100_000 + 99_999
+
+
+def read_sql(
+    engine: Engine,
+    year: int,
+    uf: UF | None = None,
+    geocodes: Sequence[int] | None = None,
+    table: str | None = None,
+    schema: str | None = SCHEMA,
+    geocode_column: str = GEOCODE_COLUMN,
+    chunksize: int = CHUNKSIZE,
+    disease: Disease = "dengue",
+) -> Iterator[list[AlertaRow]]:
+    # `table` defaults to the alert table of `disease`
+    disease = TypeAdapter(Disease).validate_python(disease)
+    table = TABLES[disease] if table is None else table
+    columns = (WEEK_COLUMN, "casos_est", geocode_column, "p_rt1")
+    tbl = sa.table(table, *(sa.column(c) for c in columns), schema=schema)
+    geocode = tbl.c[geocode_column]
+
+    query = sa.select(
+        tbl.c[WEEK_COLUMN],
+        tbl.c.casos_est,
+        geocode.label("geocode"),
+        tbl.c.p_rt1,
+        sa.literal(disease).label("disease"),
+    ).where(tbl.c[WEEK_COLUMN].between(*week_range(year)))
+    if uf is not None:
+        query = query.where(geocode.between(*_geocode_range(uf)))
+    if geocodes is not None:
+        geocodes = [int(g) for g in geocodes]
+        if not geocodes:
+            return
+        query = query.where(geocode.in_(geocodes))
+
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(query)
+        while rows := result.fetchmany(chunksize):
+            yield parse_alerta([dict(r._mapping) for r in rows])
+
+
+def read_duckdb(
+    path: str | Path,
+    query: str,
+    year: int,
+    uf: UF | None = None,
+    geocodes: Sequence[int] | None = None,
+    geocode_column: str = GEOCODE_COLUMN,
+    chunksize: int = CHUNKSIZE,
+    disease: Disease = "dengue",
+) -> Iterator[list[AlertaRow]]:
+    # DuckDB pushes the outer projection and filters into the subquery
+    # scans, including Parquet/CSV readers referenced by `query`
+    # `disease` is validated against a closed set, so it is safe to inline
+    disease = TypeAdapter(Disease).validate_python(disease)
+    columns = (
+        f'"{WEEK_COLUMN}", "casos_est", "{geocode_column}" AS geocode,'
+        f" \"p_rt1\", '{disease}' AS disease"
+    )
+    sql = (
+        f"SELECT {columns} FROM ({query}) AS src"
+        f' WHERE "{WEEK_COLUMN}" BETWEEN ? AND ?'
+    )
+    params: list[int] = list(week_range(year))
+    if uf is not None:
+        sql += f' AND "{geocode_column}" BETWEEN ? AND ?'
+        params.extend(_geocode_range(uf))
+    if geocodes is not None:
+        geocodes = [int(g) for g in geocodes]
+        if not geocodes:
+            return
+        placeholders = ", ".join("?" * len(geocodes))
+        sql += f' AND "{geocode_column}" IN ({placeholders})'
+        params.extend(geocodes)
+
+    read_only = str(path) != ":memory:"
+    con = duckdb.connect(str(path), read_only=read_only)
+    try:
+        reader = con.execute(sql, params).fetch_record_batch(chunksize)
+        for batch in reader:
+            yield parse_alerta(batch.to_pandas())
+    finally:
+        con.close()
@@ -35,7 +35,8 @@ _UF_CODES = frozenset(
         "TO",
     }
 )
-_EXPORT_FORMATS = frozenset({"csv", "parquet", "duckdb"})
+_EXPORT_FORMATS = frozenset({"csv", "parquet", "geoparquet", "duckdb"})
+_FIT_ENGINES = frozenset({"lmfit", "vectorized", "shapes", "tiered"})
 
 CID10 = {
     "dengue": "A90",
@@ -43,6 +44,36 @@ CID10 = {
     "chik": "A92.0",
 }
 
+UF_IBGE = {
+    "RO": 11,
+    "AC": 12,
+    "AM": 13,
+    "RR": 14,
+    "PA": 15,
+    "AP": 16,
+    "TO": 17,
+    "MA": 21,
+    "PI": 22,
+    "CE": 23,
+    "RN": 24,
+    "PB": 25,
+    "PE": 26,
+    "AL": 27,
+    "SE": 28,
+    "BA": 29,
+    "MG": 31,
+    "ES": 32,
+    "RJ": 33,
+    "SP": 35,
+    "PR": 41,
+    "SC": 42,
+    "RS": 43,
+    "MS": 50,
+    "MT": 51,
+    "GO": 52,
+    "DF": 53,
+}
+
 
 def _parse_disease(v: str) -> str:
     v = v.lower()
@@ -85,8 +116,18 @@ def _parse_export_format(v: str) -> str:
     return v
 
 
+def _parse_fit_engine(v: str) -> str:
+    v = v.lower()
+    if v not in _FIT_ENGINES:
+        raise ValueError(
+            f"Invalid engine '{v}'. Options: {sorted(_FIT_ENGINES)}"
+        )
+    return v
+
+
 Disease = Annotated[str, BeforeValidator(_parse_disease)]
 UF = Annotated[str, BeforeValidator(_parse_uf)]
 Year = Annotated[int, BeforeValidator(_parse_year)]
 Geocode = Annotated[int, BeforeValidator(_parse_geocode)]
 ExportFormat = Annotated[str, BeforeValidator(_parse_export_format)]
+FitEngine = Annotated[str, BeforeValidator(_parse_fit_engine)]
@@ -0,0 +1,16 @@
+from episcanner import geometry
+from episcanner.analysis import shapes
+from episcanner.analysis.shapes import shape_index
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    # Caches the code writes by itself, such as the shape index of the
+    # "shapes" and "tiered" engines and the simplified geometry layers, go
+    # to the test's directory, never to the user's CACHEPATH
+    monkeypatch.setattr(shapes, "CACHEPATH", tmp_path)
+    monkeypatch.setattr(geometry, "CACHEPATH", tmp_path)
+    shape_index.cache_clear()
+    yield tmp_path
+    shape_index.cache_clear()
@@ -0,0 +1,51 @@
+from episcanner.benchmark import main, pareto, reference_corpus, run
+import numpy as np
+import pandas as pd
+
+
+class TestBenchmark:
+    def test_corpus_has_known_parameters(self):
+        corpus = reference_corpus(n=3, window=40)
+        assert [c.name for c in corpus[:2]] == ["synthetic-0", "noisy-0"]
+        assert all(len(c.cases) == 40 for c in corpus)
+        exact, noisy = corpus[0], corpus[1]
+        assert exact.truth == noisy.truth
+        assert np.all(noisy.cases == np.round(noisy.cases))
+        assert np.cumsum(exact.cases)[-1] <= exact.truth["L"]
+
+    def test_run_and_pareto(self):
+        corpus = reference_corpus(n=2, window=40)
+        results = run(["shapes", "vectorized"], corpus, seed=1)
+        assert len(results) == 2 * len(corpus)
+        exact = results[results.case.str.startswith("synthetic")]
+        assert (exact.L_error < 0.05).all()
+        table = pareto(results)
+        assert set(table.index) == {"shapes", "vectorized"}
+        assert table.loc["shapes", "nfev"] < table.loc["vectorized", "nfev"]
+        assert table["pareto"].any()
+
+    def test_pareto_front(self):
+        results = pd.DataFrame(
+            {
+                "engine": ["fast", "slow", "bad"],
+                "case": ["x"] * 3,
+                "seconds": [1.0, 10.0, 5.0],
+                "nfev": [10, 100, 50],
+                "sum_res": [0.5, 0.1, 0.6],
+                "L_error": [0.0] * 3,
+                "tp1_error": [0.0] * 3,
+                "b_error": [0.0] * 3,
+            }
+        )
+        table = pareto(results)
+        assert table["pareto"].to_dict() == {
+            "fast": True,
+            "bad": False,
+            "slow": True,
+        }
+
+    def test_main_writes_rows(self, tmp_path, capsys):
+        output = tmp_path / "rows.csv"
+        main(["--engines", "shapes", "-n", "1", "--output", str(output)])
+        assert len(pd.read_csv(output)) == 2
+        assert "shapes" in capsys.readouterr().out
@@ -0,0 +1,129 @@
+from episcanner.checkpoint import Checkpoint, job_key
+from episcanner.models import Richards
+from episcanner.results import load_curves, load_results
+from episcanner.scanner import EpiScanner
+from episcanner.schemas import AlertaRow
+from epiweeks import Week
+import pytest
+
+GEOCODES = (3550308, 3304557, 3509502)
+
+
+def _make_data():
+    return [
+        AlertaRow(
+            ew=Week(2024, w),
+            casos_est=c * (1 + 0.25 * i),
+            geocode=gc,
+            p_rt1=0.95,
+        )
+        for i, gc in enumerate(GEOCODES)
+        for w, c in enumerate(
+            [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408],
+            start=1,
+        )
+    ]
+
+
+class TestJobKey:
+    def test_stable_and_order_independent(self):
+        data = _make_data()
+        assert job_key(data, 2024) == job_key(data[::-1], 2024)
+
+    def test_depends_on_data_year_and_options(self):
+        data = _make_data()
+        key = job_key(data, 2024)
+        changed = [data[0].model_copy(update={"casos_est": 11.0})] + data[1:]
+        assert job_key(changed, 2024) != key
+        assert job_key(data, 2025) != key
+        assert job_key(data, 2024, engine="vectorized") != key
+
+
+class TestCheckpoint:
+    def test_flushes_periodically_and_reloads(self, tmp_path):
+        path = tmp_path / "job.jsonl"
+        results = EpiScanner(_make_data(), 2024).richards(
+            engine="vectorized", seed=1
+        )
+        store = Checkpoint(path, every=2)
+        model = Richards(L=100.0, a=0.5, b=0.3, tp1=8.0, gamma=0.3)
+        store.add(results[0], model)
+        assert not path.exists()
+        store.add(results[1], model)
+        assert len(path.read_text().splitlines()) == 2
+
+        with path.open("a") as f:
+            f.write('{"params": {"geo')
+        reloaded = Checkpoint(path)
+        assert set(reloaded.results) == {
+            ("dengue", r.geocode) for r in results[:2]
+        }
+        assert reloaded.model(results[0].geocode).tp1 == 8.0
+
+
+class TestResume:
+    def test_resume_skips_completed_geocodes(self, tmp_path, monkeypatch):
+        fit = Richards.fit
+        calls = []
+
+        def crashing_fit(data, **kwargs):
+            if len(calls) == 2:
+                raise RuntimeError("preempted")
+            calls.append(1)
+            return fit(data, **kwargs)
+
+        monkeypatch.setattr(Richards, "fit", staticmethod(crashing_fit))
+        scanner = EpiScanner(_make_data(), 2024)
+        with pytest.raises(RuntimeError, match="preempted"):
+            scanner.richards(
+                checkpoint=tmp_path / "ckpt",
+                checkpoint_every=1,
+                engine="vectorized",
+                seed=1,
+            )
+        files = list((tmp_path / "ckpt").glob("*.jsonl"))
+        assert len(files) == 1
+        assert len(files[0].read_text().splitlines()) == 2
+
+        calls.clear()
+        resumed = []
+
+        def counting_fit(data, **kwargs):
+            resumed.append(1)
+            return fit(data, **kwargs)
+
+        monkeypatch.setattr(Richards, "fit", staticmethod(counting_fit))
+        results = scanner.richards(
+            export_to="parquet",
+            export_uf="SP",
+            export_output=tmp_path,
+            checkpoint=tmp_path / "ckpt",
+            export_curves=True,
+            engine="vectorized",
+            seed=1,
+        )
+        assert len(resumed) == 1
+        assert {r.geocode for r in results} == set(GEOCODES)
+        assert not files[0].exists()
+        exported = load_results(tmp_path, "SP", 2024)
+        assert set(exported.geocode) == set(GEOCODES)
+        curves = load_curves(tmp_path, "SP", 2024)
+        assert curves.groupby("geocode").size().to_dict() == {
+            gc: 12 for gc in GEOCODES
+        }
+
+    def test_other_model_starts_fresh(self, tmp_path, monkeypatch):
+        from episcanner.models import Gompertz
+
+        store = tmp_path / "ckpt"
+        # A Gompertz job whose checkpoint outlived it
+        monkeypatch.setattr(Checkpoint, "remove", lambda self: None)
+        EpiScanner(_make_data(), 2024, model=Gompertz).richards(
+            checkpoint=store, checkpoint_every=1
+        )
+        assert len(list(store.glob("*.jsonl"))) == 1
+
+        # Same data, year and options: only the model tells the jobs apart
+        results = EpiScanner(_make_data(), 2024).richards(checkpoint=store)
+        assert len(results) == len(GEOCODES)
+        assert all(r.fit_tier == "lmfit" for r in results)
@@ -0,0 +1,66 @@
+from episcanner.analysis.richards import sum_res
+from episcanner.collection import RichardsCollection
+from episcanner.models import Richards
+import numpy as np
+import pytest
+
+
+def _make_models():
+    return {
+        3550308: Richards(L=3000.0, a=0.6, b=0.4, tp1=8.0, gamma=0.3),
+        ("zika", 3304557): Richards(
+            L=500.0, a=0.2, b=0.05, tp1=20.0, gamma=0.31
+        ),
+    }
+
+
+class TestRichardsCollection:
+    def test_vectorized_matches_models(self):
+        models = _make_models()
+        collection = RichardsCollection.from_models(models)
+        t = np.arange(30, dtype=np.float64)
+        curves = collection.evaluate(t)
+        sir = collection.get_SIR_pars()
+        for i, model in enumerate(models.values()):
+            assert np.allclose(curves[i], model.evaluate(t))
+            expected = model.get_SIR_pars()
+            for field in ("beta", "gamma", "R0", "tc"):
+                assert sir[field][i] == pytest.approx(getattr(expected, field))
+
+    def test_sum_res(self):
+        models = _make_models()
+        collection = RichardsCollection.from_models(models)
+        casos_cum = collection.evaluate(np.arange(20.0)) * 1.1 + 1.0
+        expected = [
+            sum_res(c, m.evaluate(np.arange(20.0)))
+            for c, m in zip(casos_cum, models.values())
+        ]
+        assert np.allclose(collection.sum_res(casos_cum), expected)
+
+    def test_lookup_by_geocode(self):
+        collection = RichardsCollection.from_models(_make_models())
+        model = collection.model(3304557, "zika")
+        assert model.params() == _make_models()["zika", 3304557].params()
+        assert collection.position(3550308) == 0
+        with pytest.raises(KeyError):
+            collection.model(3304557)
+
+    def test_save_load(self, tmp_path):
+        rng = np.random.default_rng(0)
+        n = 20_000
+        collection = RichardsCollection(
+            np.arange(n) + 1_100_000,
+            L=rng.uniform(1, 1e4, n),
+            a=rng.uniform(0.01, 1, n),
+            b=rng.uniform(0.01, 1, n),
+            tp1=rng.uniform(5, 35, n),
+            gamma=np.full(n, 0.3),
+        )
+        path = collection.save(tmp_path / "fits.npz")
+        loaded = RichardsCollection.load(path)
+        assert len(loaded) == n
+        for field in ("geocode", "L", "a", "b", "tp1", "gamma", "disease"):
+            assert np.array_equal(
+                getattr(loaded, field), getattr(collection, field)
+            )
+        assert loaded.disease[0] == "dengue"
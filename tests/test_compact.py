@@ -0,0 +1,141 @@
+import tracemalloc
+
+from episcanner.checkpoint import job_key
+from episcanner.compact import AlertaTable, CurveStore
+from episcanner.models import Richards
+from episcanner.results import curves_frame
+from episcanner.scanner import EpiScanner
+from episcanner.schemas import AlertaRow, parse_alerta
+from epiweeks import Week
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _make_frame():
+    rows = []
+    for gc in (3550308, 3304557):
+        for w, c in enumerate(
+            [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408],
+            start=1,
+        ):
+            rows.append(
+                {
+                    "SE": 202400 + w,
+                    "casos_est": c * (1 + 0.5 * (gc == 3304557)) + 0.1,
+                    "municipio_geocodigo": gc,
+                    "p_rt1": 0.95,
+                }
+            )
+    # Shuffled, as database reads are not ordered by week
+    return pd.DataFrame(rows).sample(frac=1, random_state=0)
+
+
+class TestAlertaTable:
+    def test_from_frame_matches_parsed_rows(self):
+        df = _make_frame()
+        table = AlertaTable.from_data(df)
+        rows = parse_alerta(df)
+        assert table.casos_est.dtype == np.float32
+        assert table.geocode.dtype == np.int32
+        assert len(table) == len(rows)
+        for row, expected in zip(table, rows):
+            assert row.ew == expected.ew
+            assert row.geocode == expected.geocode
+            assert row.disease == "dengue"
+            assert row.casos_est == pytest.approx(expected.casos_est)
+        assert table.digest() == AlertaTable.from_rows(rows).digest()
+
+    def test_dates_and_diseases(self):
+        df = pd.DataFrame(
+            {
+                "data_iniSE": ["2024-01-07", "2024-01-14"],
+                "casos_est": [1.0, 2.0],
+                "geocode": [3550308, 3550308],
+                "p_rt1": [0.5, 0.6],
+                "disease": ["Chikungunya", "zika"],
+            }
+        )
+        table = AlertaTable.from_frame(df)
+        assert [r.ew for r in table] == [r.ew for r in parse_alerta(df)]
+        assert table.diseases() == {"chik", "zika"}
+
+    def test_groups_match_partitions(self):
+        df = _make_frame()
+        table = AlertaTable.from_data(df)
+        rows = parse_alerta(df)
+        groups = Richards.partition_diseases(table)
+        expected = Richards.partition_diseases(rows)
+        assert list(groups) == sorted(expected)
+        for key, group in groups.items():
+            assert isinstance(group, AlertaTable)
+            assert [r.ew for r in group] == [r.ew for r in expected[key]]
+        assert set(Richards.partition(table)) == {3304557, 3550308}
+
+    def test_job_key_ignores_row_order(self):
+        df = _make_frame()
+        shuffled = AlertaTable.from_data(df.sample(frac=1, random_state=1))
+        assert job_key(AlertaTable.from_data(df), 2024) == job_key(
+            shuffled, 2024
+        )
+
+    def test_smaller_than_rows(self):
+        df = pd.concat([_make_frame()] * 50, ignore_index=True)
+        tracemalloc.start()
+        rows = parse_alerta(df)
+        row_bytes = tracemalloc.get_traced_memory()[0]
+        del rows
+        tracemalloc.stop()
+        tracemalloc.start()
+        table = AlertaTable.from_data(df)
+        table_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert table.nbytes == 17 * len(df)
+        assert table_bytes < row_bytes / 2
+
+
+class TestCompactScan:
+    def test_results_match_full_precision(self):
+        df = _make_frame()
+        full = EpiScanner(df, 2024).richards(engine="shapes")
+        compact = EpiScanner(df, 2024, compact=True).richards(engine="shapes")
+        assert [r.geocode for r in compact] == sorted(r.geocode for r in full)
+        by_geocode = {r.geocode: r for r in full}
+        for params in compact:
+            expected = by_geocode[params.geocode]
+            assert params.ep_pw == expected.ep_pw
+            assert params.total_cases == pytest.approx(
+                expected.total_cases, rel=1e-3
+            )
+            assert params.R0 == pytest.approx(expected.R0, rel=1e-3)
+
+    def test_curve_store_frame(self):
+        data = [
+            AlertaRow(
+                ew=Week(2024, w), casos_est=c, geocode=3550308, p_rt1=0.95
+            )
+            for w, c in enumerate([10, 25, 60, 120, 200, 280], start=1)
+        ]
+        model = Richards(L=700.0, a=0.5, b=0.3, tp1=4.0, gamma=0.3)
+        curve = model.to_curve(data)
+        params = EpiScanner(data, 2024)._sir_params(3550308, model, curve)
+        store = CurveStore()
+        store.append((params, curve))
+        expected = curves_frame([(params, curve)])
+        got = curves_frame(store)
+        pd.testing.assert_frame_equal(got, expected, rtol=1e-6)
+        assert curves_frame(CurveStore()).empty
+
+
+class TestGrouped:
+    def test_sorted_table_groups_and_windows_as_unsorted(self):
+        table = AlertaTable.from_data(_make_frame())
+        grouped = table.sort()
+        assert grouped.grouped and not table.grouped
+        assert grouped.sort() is grouped
+        for key, part in grouped.groups().items():
+            expected = table.groups()[key]
+            assert part.digest() == expected.digest()
+            window = part.window(202403, 202408)
+            assert window.digest() == expected.window(202403, 202408).digest()
+            assert list(window.ew) == list(range(202403, 202409))
@@ -0,0 +1,154 @@
+import os
+
+from episcanner.geometry import GeometryStore, _load
+from episcanner.results import load_curves, load_results
+from episcanner.scanner import EpiScanner
+from episcanner.schemas import AlertaRow, SirParams
+from epiweeks import Week
+import geopandas as gpd
+import pandas as pd
+import pytest
+from shapely.geometry import Point
+
+GEOCODES = ["3550308", "3509502", "3304557"]
+
+
+def _make_layer(tmp_path):
+    gdf = gpd.GeoDataFrame(
+        {"CD_MUN": GEOCODES, "NM_MUN": ["São Paulo", "Campinas", "Rio"]},
+        geometry=[Point(-46 + i, -23).buffer(0.2, 64) for i in range(3)],
+        crs="EPSG:4326",
+    )
+    path = tmp_path / "municipios.parquet"
+    gdf.to_parquet(path)
+    return path
+
+
+def _params(geocode):
+    return SirParams(
+        geocode=geocode,
+        year=2024,
+        ep_pw="202409",
+        ep_dur=10,
+        peak_week=8.0,
+        beta=0.789,
+        gamma=0.3,
+        R0=2.63,
+        total_cases=3353.7,
+        alpha=0.62,
+        sum_res=0.213,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return GeometryStore.from_file(
+        _make_layer(tmp_path), cache_dir=tmp_path / "cache"
+    )
+
+
+class TestGeometryStore:
+    def test_indexed_and_simplified(self, store):
+        assert store.geometries.index.tolist() == sorted(map(int, GEOCODES))
+        assert 3550308 in store
+        vertices = len(store.geometries[3550308].exterior.coords)
+        assert 4 < vertices < 257
+        assert store.geometries.crs == "EPSG:4326"
+
+    def test_uf(self, store):
+        assert store.uf("sp").index.tolist() == [3509502, 3550308]
+        assert store.uf("RJ").index.tolist() == [3304557]
+
+    def test_cached_in_process_and_on_disk(self, tmp_path):
+        path = _make_layer(tmp_path)
+        cache = tmp_path / "cache"
+        first = GeometryStore.from_file(path, cache_dir=cache)
+        assert GeometryStore.from_file(path, cache_dir=cache) is first
+        assert len(list(cache.iterdir())) == 1
+
+        _load.cache_clear()
+        again = GeometryStore.from_file(path, cache_dir=cache)
+        assert again is not first
+        assert again.geometries.geom_equals(first.geometries).all()
+
+        # A rewritten source is simplified again, replacing its old copy
+        stale = list(cache.iterdir())
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        GeometryStore.from_file(path, cache_dir=cache)
+        cached = list(cache.iterdir())
+        assert len(cached) == 1 and cached != stale
+
+    def test_geocode_column_required(self):
+        gdf = gpd.GeoDataFrame({"name": ["x"]}, geometry=[Point(0, 0)])
+        with pytest.raises(ValueError, match="geocode column"):
+            GeometryStore.from_frame(gdf)
+        store = GeometryStore.from_frame(
+            gdf.assign(name=[3550308]), geocode_column="name"
+        )
+        assert 3550308 in store
+
+    def test_join_keeps_order_and_missing(self, store):
+        joined = store.join(
+            pd.DataFrame({"geocode": [3304557, 1200401, 3550308]})
+        )
+        assert joined.geocode.tolist() == [3304557, 1200401, 3550308]
+        assert joined.geometry.isna().tolist() == [False, True, False]
+
+
+class TestGeoParquetExport:
+    def test_export_and_load(self, store, tmp_path):
+        results = [_params(3550308), _params(1200401)]
+        file = EpiScanner([], 2024)._export(
+            results, "geoparquet", "SP", tmp_path, geometries=store
+        )
+        assert file.endswith("SP_2024.geoparquet")
+        gdf = gpd.read_parquet(file)
+        assert gdf.crs == "EPSG:4326"
+        assert gdf.geometry.isna().tolist() == [False, True]
+
+        loaded = load_results(tmp_path, "SP", source="geoparquet")
+        assert isinstance(loaded, gpd.GeoDataFrame)
+        assert loaded.geocode.tolist() == [1200401, 3550308]
+        params = load_results(
+            tmp_path, "SP", source="geoparquet", output="params"
+        )
+        assert params[1] == results[0]
+
+    def test_requires_geometries(self, tmp_path):
+        with pytest.raises(ValueError, match="needs geometries"):
+            EpiScanner([], 2024)._export(
+                [_params(3550308)], "geoparquet", "SP", tmp_path
+            )
+
+    def test_scan_fails_before_fitting(self):
+        scanner = EpiScanner([], 2024)
+        with pytest.raises(ValueError, match="needs geometries"):
+            scanner.richards(export_to="geoparquet", export_uf="SP")
+
+    def test_scan_with_curves(self, tmp_path):
+        cases = [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408]
+        data = [
+            AlertaRow(
+                ew=Week(2024, w),
+                casos_est=c,
+                geocode=3550308,
+                p_rt1=0.99,
+            )
+            for w, c in enumerate(cases, start=1)
+        ]
+        EpiScanner(data, 2024).richards(
+            export_to="geoparquet",
+            export_uf="SP",
+            export_output=tmp_path,
+            export_curves=True,
+            geometries=_make_layer(tmp_path),
+            engine="shapes",
+        )
+        gdf = gpd.read_parquet(tmp_path / "SP_2024.geoparquet")
+        assert gdf.geometry.notna().all()
+        curves = load_curves(tmp_path, "SP", source="geoparquet")
+        assert set(curves.geocode) == {3550308}
+        assert (tmp_path / "SP_2024_curves.parquet").exists()
+        # The default cache is CACHEPATH, the test's directory here
+        assert list((tmp_path / "geometries").glob("municipios_*.parquet"))
@@ -0,0 +1,58 @@
+from episcanner.analysis.gompertz import equation, fit_many, objective
+import numpy as np
+
+
+class TestEquation:
+    def test_monotonic_to_asymptote(self):
+        t = np.arange(52)
+        result = equation(100.0, 0.3, t, 20.0)
+        assert result.shape == (52,)
+        assert np.all(np.diff(result) >= 0)
+        assert np.isclose(result[-1], 100.0)
+
+    def test_incidence_peaks_at_tj(self):
+        t = np.arange(52)
+        result = equation(100.0, 0.3, t, 20.0)
+        assert np.argmax(np.diff(result)) in (19, 20)
+
+    def test_broadcasts_parameter_columns(self):
+        L = np.array([[100.0], [200.0]])
+        result = equation(L, 0.3, np.arange(10), 5.0)
+        assert result.shape == (2, 10)
+        assert np.allclose(result[1], 2 * result[0])
+
+
+class TestObjective:
+    def test_returns_mse(self):
+        from lmfit import Parameters
+        import pandas as pd
+
+        df = pd.DataFrame({"casos_cum": [10.0, 30.0, 70.0, 130.0, 200.0]})
+        params = Parameters()
+        params.add("L1", value=250.0)
+        params.add("tp1", value=3.0)
+        params.add("b1", value=0.25)
+        result = objective(params, 0, df)
+        assert result.shape == (5,)
+        assert np.all(result >= 0)
+
+
+class TestFitMany:
+    def test_recovers_known_parameters(self):
+        rng = np.random.default_rng(0)
+        n = 200
+        L = rng.uniform(100, 5000, n)
+        b = rng.uniform(0.1, 0.6, n)
+        tp = rng.uniform(8, 30, n)
+        cum = equation(L[:, None], b[:, None], np.arange(52), tp[:, None])
+        noisy = cum * (1 + 0.02 * rng.standard_normal(cum.shape))
+        pars = fit_many(noisy)
+        assert pars.shape == (n, 3)
+        assert np.median(np.abs(pars[:, 0] / L - 1)) < 0.01
+        assert np.median(np.abs(pars[:, 2] - tp)) < 0.2
+
+    def test_respects_bounds(self):
+        pars = fit_many(np.cumsum(np.ones((3, 20)), axis=1))
+        assert np.all(pars[:, 0] >= 1.0)
+        assert np.all((pars[:, 1] > 0) & (pars[:, 1] <= 1))
+        assert np.all((pars[:, 2] >= 5) & (pars[:, 2] <= 35))
@@ -0,0 +1,96 @@
+from episcanner.memory import (
+    WORKER_RSS,
+    MemoryMonitor,
+    ResourcePlan,
+    plan_resources,
+)
+from episcanner.scanner import EpiScanner
+from episcanner.schemas import AlertaRow
+from epiweeks import Week
+
+
+def _make_data():
+    return [
+        AlertaRow(
+            ew=Week(2024, w),
+            casos_est=c * (1 + 0.5 * (gc == 3304557)),
+            geocode=gc,
+            p_rt1=0.95,
+        )
+        for gc in (3550308, 3304557)
+        for w, c in enumerate(
+            [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408],
+            start=1,
+        )
+    ]
+
+
+class TestMemoryMonitor:
+    def test_records_stage_peak(self):
+        monitor = MemoryMonitor(interval=0.01)
+        with monitor.stage("alloc"):
+            buf = bytearray(64 * 2**20)
+            buf[::4096] = b"x" * len(buf[::4096])
+            del buf
+        stage = monitor.stages[0]
+        assert stage.stage == "alloc"
+        assert stage.peak_rss >= stage.start_rss
+        assert stage.peak_rss - stage.start_rss >= 32 * 2**20
+        assert monitor.report() == {"alloc": stage.peak_rss}
+
+    def test_report_keeps_max_per_stage(self):
+        monitor = MemoryMonitor()
+        with monitor.stage("fit"):
+            pass
+        with monitor.stage("fit"):
+            pass
+        assert monitor.report()["fit"] == max(
+            s.peak_rss for s in monitor.stages
+        )
+
+
+class TestPlanResources:
+    def test_no_headroom_runs_serially(self):
+        plan = plan_resources(2**30, 100, 52, used=2**30)
+        assert plan == ResourcePlan(processes=1, batch_size=1, flush_rows=1000)
+
+    def test_scales_with_budget(self):
+        small = plan_resources(4 * WORKER_RSS, 5000, 52, used=0)
+        large = plan_resources(64 * WORKER_RSS, 5000, 52, used=0)
+        assert 1 <= small.processes <= large.processes
+        assert small.flush_rows < large.flush_rows
+        assert 1 <= large.batch_size <= 5000
+
+    def test_batch_size_capped_by_geocodes(self):
+        plan = plan_resources(64 * WORKER_RSS, 3, 52, used=0)
+        assert plan.batch_size <= 3
+
+
+class TestEpiScannerMemory:
+    def test_stage_report(self, tmp_path):
+        scanner = EpiScanner(_make_data(), 2024, memory_limit=2**40)
+        results = scanner.richards(
+            export_to="parquet",
+            export_uf="SP",
+            export_output=tmp_path,
+            engine="vectorized",
+            seed=1,
+        )
+        assert len(results) == 2
+        assert set(scanner.memory.report()) == {
+            "parse",
+            "partition",
+            "fit",
+            "export",
+        }
+
+    def test_process_pool_matches_serial(self):
+        serial = EpiScanner(_make_data(), 2024).richards(
+            engine="vectorized", seed=1
+        )
+        pooled = EpiScanner(_make_data(), 2024).richards(
+            engine="vectorized", seed=1, processes=2, batch_size=1
+        )
+        assert sorted(r.model_dump_json() for r in serial) == sorted(
+            r.model_dump_json() for r in pooled
+        )
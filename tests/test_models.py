@@ -86,3 +86,333 @@ class TestRichardsInstatiation:
         data = _make_data()
         model = Richards.fit(data, verbose=True)
         assert isinstance(model, Richards)
+
+
+class TestRichardsVectorizedEngine:
+    def test_fit_vectorized(self):
+        model = Richards.fit(_make_data(), engine="vectorized", seed=1)
+        assert isinstance(model, Richards)
+        assert 0.3 <= model.gamma <= 0.33
+        assert model.nfev > 0
+
+    def test_seed_is_deterministic(self):
+        first = Richards.fit(_make_data(), engine="vectorized", seed=7)
+        second = Richards.fit(_make_data(), engine="vectorized", seed=7)
+        pooled = Richards.fit(
+            _make_data(), engine="vectorized", seed=7, workers=2
+        )
+        for model in (second, pooled):
+            assert (model.L, model.a, model.b, model.tp1, model.gamma) == (
+                first.L,
+                first.a,
+                first.b,
+                first.tp1,
+                first.gamma,
+            )
+        assert pooled.nfev == first.nfev
+
+    def test_invalid_engine_raises(self):
+        with __import__("pytest").raises(ValueError, match="Invalid engine"):
+            Richards.fit(_make_data(), engine="newton")
+
+    def test_workers_requires_vectorized(self):
+        with __import__("pytest").raises(ValueError, match="workers"):
+            Richards.fit(_make_data(), workers=2)
+
+
+class TestRichardsTieredEngine:
+    def test_clean_curve_stays_on_cheap_tier(self):
+        model = Richards.fit(_make_data(), engine="tiered", seed=1)
+        assert model.tier == "shapes"
+
+    def test_escalates_below_threshold(self):
+        cheap = Richards.fit(_make_data(), engine="shapes")
+        model = Richards.fit(
+            _make_data(), engine="tiered", seed=1, max_sum_res=0.0
+        )
+        direct = Richards.fit(_make_data(), engine="vectorized", seed=1)
+        assert model.tier == "vectorized"
+        assert (model.L, model.tp1) == (direct.L, direct.tp1)
+        assert model.nfev == direct.nfev + cheap.nfev
+
+    def test_escalates_when_local_fit_fails(self, monkeypatch):
+        import episcanner.models as models
+
+        def stalled(*args, **kwargs):
+            ret = least_squares(*args, **kwargs)
+            ret.success = False
+            return ret
+
+        least_squares = models.least_squares
+        monkeypatch.setattr(models, "least_squares", stalled)
+        model = Richards.fit(_make_data(), engine="tiered", seed=1)
+        assert model.tier == "vectorized"
+        assert model.converged
+
+    def test_no_default_sum_res_cut(self):
+        # Two waves fit one Richards curve badly (sum_res above 1), but a
+        # converged cheap fit is kept: the global search finds no better
+        data = [
+            AlertRow(ew=Week(2024, w), casos_est=c)
+            for w, c in enumerate(
+                [5, 40, 200, 40, 5, 5, 5, 40, 200, 40, 5, 5], start=1
+            )
+        ]
+        model = Richards.fit(data, engine="tiered", seed=1)
+        assert model.tier == "shapes"
+        assert model.converged
+
+    def test_single_engines_record_tier(self):
+        assert Richards.fit(_make_data(), engine="shapes").tier == "shapes"
+        assert Richards.fit(_make_data(), seed=1).tier == "lmfit"
+
+
+class TestRichardsPartition:
+    def test_groups_and_sorts_by_week(self):
+        from episcanner.schemas import AlertaRow
+
+        rows = [
+            AlertaRow(ew=Week(2024, w), casos_est=1.0, geocode=g, p_rt1=0.5)
+            for w in (3, 1, 2)
+            for g in (3550308, 3304557)
+        ]
+        partitions = Richards.partition(rows)
+        assert set(partitions) == {3550308, 3304557}
+        assert [r.ew.week for r in partitions[3550308]] == [1, 2, 3]
+
+    def test_mixed_diseases_need_disease_keys(self):
+        from episcanner.schemas import AlertaRow
+
+        rows = [
+            AlertaRow(
+                ew=Week(2024, w),
+                casos_est=1.0,
+                geocode=1,
+                p_rt1=0.5,
+                disease=d,
+            )
+            for w in (2, 1)
+            for d in ("dengue", "chik")
+        ]
+        with __import__("pytest").raises(ValueError, match="diseases"):
+            Richards.partition(rows)
+        partitions = Richards.partition_diseases(rows)
+        assert set(partitions) == {("dengue", 1), ("chik", 1)}
+        assert [r.ew.week for r in partitions["chik", 1]] == [1, 2]
+
+    def test_screen_rejects_low_transmission(self):
+        from episcanner.schemas import AlertaRow
+
+        rows = [
+            AlertaRow(ew=Week(2024, w), casos_est=100.0, geocode=1, p_rt1=0.1)
+            for w in range(1, 20)
+        ]
+        assert Richards.screen(rows, 2024) is None
+        high = [r.model_copy(update={"p_rt1": 0.95}) for r in rows]
+        assert len(Richards.screen(high, 2024)) == 19
+
+
+class TestBatchContract:
+    def test_richards_fit_many(self):
+        cases = np.array([[r.casos_est for r in _make_data()]] * 2)
+        models = Richards.fit_many(cases, engine="vectorized", seed=1)
+        assert len(models) == 2
+        assert all(isinstance(m, Richards) for m in models)
+
+    def test_richards_evaluate_many(self):
+        models = [
+            Richards(L=100.0, a=0.5, b=0.3, tp1=5.0, gamma=0.3),
+            Richards(L=200.0, a=0.6, b=0.4, tp1=8.0, gamma=0.3),
+        ]
+        t = np.arange(12)
+        curves = Richards.evaluate_many(models, t)
+        assert curves.shape == (2, 12)
+        for model, curve in zip(models, curves):
+            assert np.allclose(curve, model.evaluate(t))
+
+    def test_params_rebuild_model(self):
+        model = Richards(L=100.0, a=0.5, b=0.3, tp1=5.0, gamma=0.3)
+        clone = Richards(**model.params())
+        assert clone.params() == model.params()
+
+
+class TestGompertz:
+    def test_is_batched_analysis_model(self):
+        from episcanner.models import Gompertz
+
+        assert issubclass(Gompertz, AnalysisModel)
+        assert Gompertz.batched
+
+    def test_fit_and_evaluate(self):
+        from episcanner.models import Gompertz
+
+        data = _make_data()
+        model = Gompertz.fit(data, verbose=True)
+        assert isinstance(model, Gompertz)
+        assert model.a == 0.0
+        curve = model.to_curve(data)
+        assert len(curve.richards) == len(data)
+        assert model.comp_duration(curve).dur > 0
+        sir = model.get_SIR_pars()
+        assert sir.R0 > 1
+        assert np.isclose(sir.beta - sir.gamma, model.b)
+
+    def test_fit_many_matches_fit(self):
+        from episcanner.models import Gompertz
+
+        cases = np.array([[r.casos_est for r in _make_data()]])
+        many = Gompertz.fit_many(cases)[0]
+        single = Gompertz.fit(_make_data())
+        assert many.params() == single.params()
+        t = np.arange(12)
+        assert np.allclose(
+            Gompertz.evaluate_many([many], t)[0], many.evaluate(t)
+        )
+
+
+class TestTwoWaveRichards:
+    def _double_peak(self):
+        from episcanner.analysis.richards import equation
+
+        t = np.arange(52, dtype=np.float64)
+        cum = equation(2000.0, 0.5, 0.5, t, 12.0) + equation(
+            3000.0, 0.5, 0.4, t, 35.0
+        )
+        cases = np.diff(cum, prepend=0.0)
+        return [
+            AlertRow(ew=Week(2023, 45) + i, casos_est=c)
+            for i, c in enumerate(cases)
+        ]
+
+    def test_single_wave_skips_second_search(self):
+        from episcanner.models import TwoWaveRichards
+
+        model = TwoWaveRichards.fit(_make_data(), engine="shapes")
+        assert model.L2 == 0
+        assert model.tier == "shapes"
+        assert model.total_cases == model.L
+        assert model.nfev == Richards.fit(_make_data(), engine="shapes").nfev
+
+    def test_fits_double_peak(self):
+        from episcanner.analysis.richards import sum_res
+        from episcanner.models import TwoWaveRichards
+
+        data = self._double_peak()
+        serie = np.cumsum([r.casos_est for r in data])
+        t = np.arange(len(data), dtype=np.float64)
+        single = Richards.fit(data, engine="shapes")
+        model = TwoWaveRichards.fit(
+            data, engine="shapes", seed=1, verbose=True
+        )
+        assert model.tier == "shapes+wave2"
+        assert sum_res(serie, model.evaluate(t)) < 0.1
+        assert sum_res(serie, single.evaluate(t)) > 1
+        assert np.isclose(model.tp1, 12, atol=1)
+        assert np.isclose(model.tp2, 35, atol=1)
+        assert np.isclose(model.total_cases, 5000, rtol=0.05)
+
+        clone = TwoWaveRichards(**model.params())
+        assert np.allclose(clone.evaluate(t), model.evaluate(t))
+        assert np.allclose(
+            TwoWaveRichards.evaluate_many([model, clone], t)[1],
+            model.evaluate(t),
+        )
+
+    def test_threshold_gates_second_wave(self):
+        from episcanner.models import TwoWaveRichards
+
+        model = TwoWaveRichards.fit(
+            self._double_peak(), engine="shapes", wave2_sum_res=100.0
+        )
+        assert model.L2 == 0
+
+
+class TestHierarchical:
+    def _make_state(self):
+        from episcanner.analysis.richards import equation
+        from episcanner.schemas import AlertaRow
+
+        rng = np.random.default_rng(0)
+        t = np.arange(52, dtype=np.float64)
+        rows = []
+        for i in range(6):
+            uf = 35 if i < 4 else 33
+            tp = (20 if uf == 35 else 14) + rng.normal(0, 2)
+            b = 0.4 * np.exp(rng.normal(0, 0.2))
+            mu = np.diff(
+                equation(10 ** rng.uniform(2.5, 4), b / (0.3 + b), b, t, tp),
+                prepend=0.0,
+            )
+            cases = rng.negative_binomial(10, 10 / (10 + np.maximum(mu, 1e-9)))
+            # Every third city starts reporting four weeks late
+            start = 4 if i % 3 == 0 else 0
+            rows += [
+                AlertaRow(
+                    ew=Week(2023, 45) + k,
+                    casos_est=float(c),
+                    geocode=uf * 100_000 + i,
+                    p_rt1=0.95,
+                )
+                for k, c in enumerate(cases)
+                if k >= start
+            ]
+        return rows
+
+    def test_prior_bounds(self):
+        from episcanner.models import PRIOR_TP_SPREAD
+        from episcanner.schemas import RichardsPars
+
+        prior = RichardsPars(gamma=0.3, L1=1.0, tp1=33.0, b1=0.5, a1=0.6)
+        bounds = Richards.prior_bounds(Richards.bounds(100.0), prior)
+        assert bounds["tp1"] == (33.0 - PRIOR_TP_SPREAD, 35)
+        assert bounds["b1"] == (0.125, 1)
+        assert bounds["L1"] == Richards.bounds(100.0)["L1"]
+
+    def test_priors_per_uf_and_window(self):
+        from episcanner.models import _uf_priors
+
+        partitions = Richards.partition(self._make_state())
+        tasks = [
+            (key, Richards.screen(rows, 2024))
+            for key, rows in partitions.items()
+        ]
+        priors = _uf_priors(Richards, tasks, {"engine": "shapes"})
+        assert set(priors) == set(partitions)
+        assert priors[3500000].tp1 == priors[3500001].tp1 - 4
+        assert priors[3500001].b1 == priors[3500002].b1
+        assert abs(priors[3500001].tp1 - 20) < 3
+        assert abs(priors[3300004].tp1 - 14) < 3
+
+    def test_fewer_evaluations(self):
+        from episcanner.analysis.richards import sum_res
+
+        partitions = Richards.partition(self._make_state())
+        runs = {}
+        for hierarchical in (False, True):
+            fitted = list(
+                Richards.iter_scan(
+                    partitions,
+                    2024,
+                    engine="vectorized",
+                    seed=1,
+                    hierarchical=hierarchical,
+                )
+            )
+            runs[hierarchical] = (
+                sum(m.nfev for _, m, _ in fitted),
+                max(sum_res(c.casos_cum, c.richards) for _, _, c in fitted),
+            )
+        assert runs[True][0] < 0.6 * runs[False][0]
+        assert runs[True][1] <= runs[False][1] + 0.05
+
+    def test_batched_models_refuse(self):
+        from episcanner.models import Gompertz
+
+        with __import__("pytest").raises(ValueError, match="prior"):
+            list(
+                Gompertz.iter_scan(
+                    Gompertz.partition(self._make_state()),
+                    2024,
+                    hierarchical=True,
+                )
+            )
@@ -0,0 +1,169 @@
+from episcanner import scanner as scanner_module
+from episcanner.geometry import GeometryStore
+from episcanner.models import Richards
+from episcanner.pipeline import ExportPipeline, FrameSink
+from episcanner.results import load_curves, load_results
+from episcanner.scanner import EpiScanner
+from episcanner.schemas import AlertaRow
+from epiweeks import Week
+import geopandas as gpd
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+CASES = [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408]
+
+
+def _make_data():
+    return [
+        AlertaRow(
+            ew=Week(2024, w),
+            casos_est=c * scale,
+            geocode=geocode,
+            p_rt1=0.95,
+        )
+        for geocode, scale in ((3550308, 1), (3509502, 2), (3518800, 3))
+        for w, c in enumerate(CASES, start=1)
+    ]
+
+
+def _scan(tmp_path, to, **kwargs):
+    return EpiScanner(_make_data(), 2024).richards(
+        export_to=to,
+        export_uf="SP",
+        export_output=tmp_path,
+        engine="shapes",
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    # One city per Parquet row group or DuckDB transaction
+    monkeypatch.setattr(scanner_module, "PIPELINE_ROWS", 1)
+    monkeypatch.setattr(scanner_module, "CURVE_WEEKS", 1)
+
+
+@pytest.mark.parametrize("to", ["csv", "parquet", "duckdb"])
+def test_same_export_as_after_fitting(to, tmp_path, small_batches):
+    _scan(tmp_path / "after", to, export_curves=True)
+    results = _scan(tmp_path / "pipe", to, export_curves=True, pipeline=True)
+    assert len(results) == 3
+
+    for load in (load_results, load_curves):
+        after = load(tmp_path / "after", "SP", source=to)
+        piped = load(tmp_path / "pipe", "SP", source=to)
+        pd.testing.assert_frame_equal(after, piped)
+
+
+def test_parquet_row_groups(tmp_path, small_batches):
+    _scan(tmp_path, "parquet", pipeline=True)
+    assert pq.ParquetFile(tmp_path / "SP_2024.parquet").num_row_groups == 3
+
+
+def test_duckdb_replaces_the_year_once(tmp_path, small_batches):
+    _scan(tmp_path, "duckdb")
+    _scan(tmp_path, "duckdb", export_curves=True, pipeline=True)
+    df = load_results(tmp_path, "SP", source="duckdb")
+    assert sorted(df.geocode) == [3509502, 3518800, 3550308]
+    curves = load_curves(tmp_path, "SP", source="duckdb")
+    assert len(curves) == 3 * len(CASES)
+
+
+def test_geoparquet_is_rejected_before_fitting(tmp_path):
+    scanner = EpiScanner([], 2024)
+    with pytest.raises(ValueError, match="Pipelined export supports"):
+        scanner.richards(
+            export_to="geoparquet",
+            export_uf="SP",
+            export_output=tmp_path,
+            geometries=GeometryStore(gpd.GeoSeries([])),
+            pipeline=True,
+        )
+
+
+def test_geoparquet_keeps_the_previous_export(tmp_path):
+    previous = tmp_path / "SP_2024.geoparquet"
+    previous.write_bytes(b"previous")
+    with pytest.raises(ValueError, match="Pipelined export supports"):
+        _scan(
+            tmp_path,
+            "geoparquet",
+            geometries=GeometryStore(gpd.GeoSeries([])),
+            pipeline=True,
+        )
+    assert previous.read_bytes() == b"previous"
+
+
+@pytest.mark.parametrize("to", ["csv", "parquet", "duckdb"])
+def test_failed_fit_keeps_the_previous_export(
+    to, tmp_path, small_batches, monkeypatch
+):
+    _scan(tmp_path, to, export_curves=True)
+    before = [
+        load(tmp_path, "SP", source=to) for load in (load_results, load_curves)
+    ]
+
+    fit = Richards.fit
+    fitted = []
+
+    def failing(data, **kwargs):
+        # The first cities' batches reach the writer before the failure
+        if len(fitted) == 2:
+            raise RuntimeError("fit failed")
+        fitted.append(data)
+        return fit(data, **kwargs)
+
+    monkeypatch.setattr(Richards, "fit", staticmethod(failing))
+    with pytest.raises(RuntimeError, match="fit failed"):
+        _scan(tmp_path, to, export_curves=True, pipeline=True)
+
+    for load, frame in zip((load_results, load_curves), before):
+        pd.testing.assert_frame_equal(load(tmp_path, "SP", source=to), frame)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_no_results_keep_the_previous_export(tmp_path):
+    _scan(tmp_path, "parquet")
+    before = load_results(tmp_path, "SP", source="parquet")
+    scanner = EpiScanner(
+        [row.model_copy(update={"p_rt1": 0.1}) for row in _make_data()], 2024
+    )
+    with pytest.raises(ValueError, match="No data to export"):
+        scanner.richards(
+            export_to="parquet",
+            export_uf="SP",
+            export_output=tmp_path,
+            engine="shapes",
+            pipeline=True,
+        )
+    after = load_results(tmp_path, "SP", source="parquet")
+    pd.testing.assert_frame_equal(after, before)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_sink_replaces_the_target_on_commit(tmp_path):
+    target = tmp_path / "x.csv"
+    target.write_text("previous\n")
+    sink = FrameSink("csv", target, lambda items: pd.DataFrame({"i": items}))
+    sink.write([1, 2])
+    assert target.read_text() == "previous\n"
+    sink.close()
+    assert target.read_text() == "i\n1\n2\n"
+    assert not sink.partial.exists()
+
+
+def test_writer_errors_reach_the_producer(tmp_path):
+    def frame(items):
+        raise RuntimeError("disk full")
+
+    pipeline = ExportPipeline(
+        {"results": FrameSink("csv", tmp_path / "x.csv", frame)},
+        {"results": 1},
+        maxsize=1,
+    )
+    with pytest.raises(RuntimeError, match="disk full"):
+        for i in range(100):
+            pipeline.put("results", i)
+    with pytest.raises(RuntimeError, match="disk full"):
+        pipeline.close()
@@ -0,0 +1,125 @@
+from episcanner.models import Gompertz, Richards
+from episcanner.progress import ProgressTracker, log_progress
+from episcanner.scanner import EpiScanner
+from episcanner.schemas import AlertaRow
+from epiweeks import Week
+from loguru import logger
+
+GEOCODES = (3550308, 3304557, 3509502, 3518800)
+
+
+def _make_data():
+    return [
+        AlertaRow(
+            ew=Week(2024, w),
+            casos_est=c * (1 + 0.25 * i),
+            geocode=gc,
+            p_rt1=0.95,
+        )
+        for i, gc in enumerate(GEOCODES)
+        for w, c in enumerate(
+            [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408],
+            start=1,
+        )
+    ]
+
+
+class TestProgressTracker:
+    def test_counts_rate_and_eta(self):
+        events = []
+        tracker = ProgressTracker(3, events.append)
+        for key in (1, 2, 3):
+            tracker.update(key)
+        assert [e.done for e in events] == [1, 2, 3]
+        assert all(e.total == 3 for e in events)
+        assert events[-1].eta == 0.0
+        assert events[-1].rate > 0
+        assert events[0].slowest is None
+
+    def test_reports_oldest_in_flight(self):
+        events = []
+        tracker = ProgressTracker(2, events.append)
+        tracker.update(1, oldest=(7, tracker.start))
+        assert events[0].slowest == 7
+        assert events[0].slowest_age >= 0
+
+
+class TestScanProgress:
+    def test_serial_scan_emits_one_event_per_city(self):
+        events = []
+        results = EpiScanner(_make_data(), 2024).richards(
+            progress=events.append, engine="vectorized", seed=1
+        )
+        assert [e.done for e in events] == [1, 2, 3, 4]
+        assert {e.key for e in events} == {("dengue", g) for g in GEOCODES}
+        assert len(results) == 4
+
+    def test_serial_scan_eta_follows_fits(self, monkeypatch):
+        import time
+
+        fit = Richards.fit
+
+        def slow_fit(data, **kwargs):
+            time.sleep(0.05)
+            return fit(data, **kwargs)
+
+        monkeypatch.setattr(Richards, "fit", staticmethod(slow_fit))
+        # More cities than the four batches a serial scan used to make
+        data = [
+            row.model_copy(update={"geocode": row.geocode + shift})
+            for row in _make_data()
+            for shift in (0, 1)
+        ]
+        events = []
+        EpiScanner(data, 2024).richards(
+            progress=events.append, engine="shapes"
+        )
+        assert len(events) == 8
+        # Each event lands after its own fit: about 0.05 s apart, and the
+        # ETA prices the cities left at that pace
+        gaps = [b.elapsed - a.elapsed for a, b in zip(events, events[1:])]
+        assert min(gaps) >= 0.04
+        for e in events[1:-1]:
+            assert e.eta >= 0.04 * (e.total - e.done)
+
+    def test_pooled_scan_reports_in_flight(self):
+        events = []
+        partitions = Richards.partition(_make_data())
+        fitted = list(
+            Richards.iter_scan(
+                partitions,
+                2024,
+                processes=2,
+                batch_size=1,
+                progress=events.append,
+                engine="vectorized",
+                seed=1,
+            )
+        )
+        assert len(fitted) == len(events) == 4
+        assert events[-1].done == 4
+        assert any(e.slowest in GEOCODES for e in events[:-1])
+
+    def test_batched_model(self):
+        events = []
+        list(
+            Gompertz.iter_scan(
+                Gompertz.partition(_make_data()), 2024, progress=events.append
+            )
+        )
+        assert [e.done for e in events] == [1, 2, 3, 4]
+
+
+class TestLogProgress:
+    def test_throttles_and_logs_final_event(self):
+        messages = []
+        sink = logger.add(messages.append, format="{message}")
+        try:
+            render = log_progress(every=3600)
+            tracker = ProgressTracker(3, render)
+            for key in (1, 2, 3):
+                tracker.update(key)
+        finally:
+            logger.remove(sink)
+        assert len(messages) == 2
+        assert messages[-1].startswith("3/3 fitted")
@@ -0,0 +1,327 @@
+from episcanner.results import load_curves, load_results, results_frame
+from episcanner.scanner import EpiScanner
+from episcanner.schemas import SirParams
+import pyarrow as pa
+import pytest
+
+
+def _params(geocode, year, **kwargs):
+    pars = dict(
+        geocode=geocode,
+        year=year,
+        ep_ini=f"{year}02",
+        ep_pw=f"{year}09",
+        ep_end=f"{year}12",
+        ep_dur=10,
+        peak_week=8.0,
+        beta=0.789,
+        gamma=0.3,
+        R0=2.63,
+        total_cases=3353.7,
+        alpha=0.62,
+        sum_res=0.213,
+        t_ini=1,
+        t_end=11,
+    )
+    pars.update(kwargs)
+    return SirParams(**pars)
+
+
+@pytest.fixture(params=["csv", "parquet", "duckdb"])
+def exported(request, tmp_path):
+    def no_epidemic(geocode, year):
+        return _params(
+            geocode, year, ep_ini=None, ep_end=None, t_ini=None, t_end=None
+        )
+
+    exports = [
+        ("SP", 2023, [_params(3550308, 2023), _params(3509502, 2023)]),
+        ("RJ", 2023, [no_epidemic(3304557, 2023)]),
+        (
+            "SP",
+            2024,
+            [
+                _params(3550308, 2024),
+                _params(3509502, 2024),
+                no_epidemic(3518800, 2024),
+            ],
+        ),
+    ]
+    for uf, year, results in exports:
+        EpiScanner([], year)._export(results, request.param, uf, tmp_path)
+    return request.param, tmp_path
+
+
+class TestResultsFrame:
+    def test_optional_ints_stay_integer(self):
+        df = results_frame([_params(3550308, 2024, t_ini=None)])
+        assert str(df.t_ini.dtype) == "Int64"
+        assert str(df.t_end.dtype) == "Int64"
+
+    def test_keeps_result_order(self):
+        df = results_frame([_params(3550308, 2024), _params(1200401, 2024)])
+        assert df.geocode.tolist() == [3550308, 1200401]
+
+
+class TestLoadResults:
+    def test_all_years(self, exported):
+        source, path = exported
+        df = load_results(path, "SP", source=source)
+        assert len(df) == 5
+        assert set(df.year) == {2023, 2024}
+
+    def test_year_and_geocode_filters(self, exported):
+        source, path = exported
+        df = load_results(
+            path, "sp", years=2024, geocodes=[3550308], source=source
+        )
+        assert df.geocode.tolist() == [3550308]
+        assert df.year.tolist() == [2024]
+
+    def test_geocodes_infer_uf(self, exported):
+        source, path = exported
+        df = load_results(
+            path, geocodes=[3304557, 3550308], years=[2023], source=source
+        )
+        assert sorted(df.geocode) == [3304557, 3550308]
+
+    def test_params_output(self, exported):
+        source, path = exported
+        params = load_results(
+            path, "SP", years=[2024], source=source, output="params"
+        )
+        assert all(isinstance(p, SirParams) for p in params)
+        missing = next(p for p in params if p.geocode == 3518800)
+        assert missing.ep_ini is None
+        assert missing.t_ini is None
+        assert missing.ep_pw == "202409"
+        assert next(p for p in params if p.geocode == 3550308).t_ini == 1
+
+    def test_arrow_output(self, exported):
+        source, path = exported
+        table = load_results(path, "SP", source=source, output="arrow")
+        assert isinstance(table, pa.Table)
+        assert table.num_rows == 5
+
+    def test_missing_uf_returns_empty(self, exported):
+        source, path = exported
+        assert load_results(path, "AC", source=source).empty
+        assert load_results(path, "SP", geocodes=[], source=source).empty
+
+    def test_sorted_by_year_and_geocode(self, exported):
+        source, path = exported
+        df = load_results(path, "SP", source=source)
+        assert list(zip(df.year, df.geocode)) == sorted(
+            zip(df.year, df.geocode)
+        )
+
+    def test_invalid_output_raises(self, tmp_path):
+        with pytest.raises(ValueError):
+            load_results(tmp_path, "SP", output="bogus")
+
+    def test_requires_uf_or_geocodes(self, tmp_path):
+        with pytest.raises(ValueError, match="uf or geocodes"):
+            load_results(tmp_path)
+
+    def test_reexport_invalidates_cache(self, exported):
+        source, path = exported
+        load_results(path, "SP", years=[2024], source=source)
+        EpiScanner([], 2024)._export(
+            [_params(3550308, 2024, R0=9.0)], source, "SP", path
+        )
+        df = load_results(path, "SP", years=[2024], source=source)
+        assert df.R0.tolist() == [9.0]
+
+    def test_episcanner_load_results(self, exported):
+        source, path = exported
+        params = EpiScanner.load_results(
+            "SP", 2023, source=source, output_dir=path, output="params"
+        )
+        assert {p.geocode for p in params} == {3550308, 3509502}
+
+
+class TestLegacyExports:
+    def test_parquet_with_all_null_optionals(self, tmp_path):
+        import pandas as pd
+
+        legacy = pd.DataFrame(
+            [
+                _params(
+                    3550308,
+                    2023,
+                    ep_ini=None,
+                    ep_end=None,
+                    t_ini=None,
+                    t_end=None,
+                ).model_dump()
+            ]
+        )
+        legacy.to_parquet(tmp_path / "SP_2023.parquet", index=False)
+        EpiScanner([], 2024)._export(
+            [_params(3550308, 2024)], "parquet", "SP", tmp_path
+        )
+        params = load_results(tmp_path, "SP", output="params")
+        assert [p.year for p in params] == [2023, 2024]
+        assert params[0].t_ini is None
+        assert params[1].t_ini == 1
+
+    def test_exports_without_disease_are_dengue(self, tmp_path):
+        import pandas as pd
+
+        row = _params(3550308, 2023).model_dump(exclude={"disease"})
+        pd.DataFrame([row]).to_parquet(tmp_path / "SP_2023.parquet")
+        df = load_results(tmp_path, "SP", diseases="dengue")
+        assert df.disease.tolist() == ["dengue"]
+        assert df.columns[:3].tolist() == ["geocode", "year", "disease"]
+        assert load_results(tmp_path, "SP", diseases="zika").empty
+
+    def test_duckdb_table_gains_disease_column(self, tmp_path):
+        import duckdb
+
+        row = _params(3550308, 2024).model_dump(
+            exclude={"disease", "fit_tier"}
+        )
+        con = duckdb.connect(str(tmp_path / "episcanner.duckdb"))
+        con.register("legacy", pa.Table.from_pylist([row]))
+        con.execute("CREATE TABLE 'SP' AS SELECT * FROM legacy")
+        con.execute('CREATE INDEX "SP_year_idx" ON "SP" (year)')
+        con.close()
+
+        EpiScanner([], 2024)._export(
+            [_params(3550308, 2024, disease="zika")], "duckdb", "SP", tmp_path
+        )
+        df = load_results(tmp_path, "SP", source="duckdb")
+        assert sorted(df.disease) == ["dengue", "zika"]
+        assert df.fit_tier.isna().all()
+
+    def test_files_without_fit_tier(self, tmp_path):
+        import pandas as pd
+
+        row = _params(3550308, 2023).model_dump(exclude={"fit_tier"})
+        pd.DataFrame([row]).to_parquet(tmp_path / "SP_2023.parquet")
+        EpiScanner([], 2024)._export(
+            [_params(3550308, 2024, fit_tier="shapes")],
+            "parquet",
+            "SP",
+            tmp_path,
+        )
+        params = load_results(tmp_path, "SP", output="params")
+        assert [p.fit_tier for p in params] == [None, "shapes"]
+
+
+class TestDiseases:
+    def test_filter_by_disease(self, tmp_path):
+        results = [
+            _params(3550308, 2024, disease=d) for d in ("dengue", "zika")
+        ]
+        for source in ("csv", "parquet", "duckdb"):
+            EpiScanner([], 2024)._export(results, source, "SP", tmp_path)
+            df = load_results(tmp_path, "SP", source=source, diseases="zika")
+            assert df.disease.tolist() == ["zika"]
+            both = load_results(tmp_path, "SP", source=source)
+            assert sorted(both.disease) == ["dengue", "zika"]
+
+    def test_duckdb_reexport_replaces_only_scanned_diseases(self, tmp_path):
+        scanner = EpiScanner([], 2024)
+        scanner._export(
+            [_params(3550308, 2024, disease="chik")], "duckdb", "SP", tmp_path
+        )
+        for beta in (0.5, 0.7):
+            scanner._export(
+                [_params(3550308, 2024, beta=beta)], "duckdb", "SP", tmp_path
+            )
+        df = load_results(tmp_path, "SP", source="duckdb")
+        assert sorted(zip(df.disease, df.beta)) == [
+            ("chik", 0.789),
+            ("dengue", 0.7),
+        ]
+
+    def test_invalid_disease_raises(self, tmp_path):
+        with pytest.raises(ValueError, match="disease"):
+            load_results(tmp_path, "SP", diseases="flu")
+
+
+class TestDuckDBIndex:
+    def test_export_creates_indexes(self, tmp_path):
+        import duckdb
+
+        EpiScanner([], 2024)._export(
+            [_params(3550308, 2024)], "duckdb", "SP", tmp_path
+        )
+        con = duckdb.connect(str(tmp_path / "episcanner.duckdb"))
+        names = {
+            r[0]
+            for r in con.execute(
+                "SELECT index_name FROM duckdb_indexes()"
+            ).fetchall()
+        }
+        con.close()
+        assert {"SP_geocode_idx", "SP_year_idx"} <= names
+
+
+class TestCurves:
+    @pytest.mark.parametrize("source", ["csv", "parquet", "duckdb"])
+    def test_export_and_read_curves(self, source, tmp_path):
+        from episcanner.schemas import AlertaRow
+        from epiweeks import Week
+
+        cases = [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408]
+        data = [
+            AlertaRow(
+                ew=Week(2024, w),
+                casos_est=c * scale,
+                geocode=gc,
+                p_rt1=0.95,
+            )
+            for gc, scale in ((3550308, 1.0), (3509502, 2.0))
+            for w, c in enumerate(cases, start=1)
+        ]
+        scanner = EpiScanner(data, 2024)
+        results = scanner.richards(
+            export_to=source,
+            export_uf="SP",
+            export_output=tmp_path,
+            export_curves=True,
+            engine="vectorized",
+            seed=1,
+        )
+        curves = EpiScanner.load_curves(
+            "SP", 2024, source=source, output_dir=tmp_path
+        )
+        assert len(curves) == 2 * len(cases)
+        city = curves[curves.geocode == 3509502]
+        assert city.t.tolist() == list(range(len(cases)))
+        assert city.ew.iloc[1] == "202402"
+        assert city.casos_cum.iloc[-1] == 2 * sum(cases)
+        params = next(r for r in results if r.geocode == 3509502)
+        assert city.richards.iloc[-1] < params.total_cases
+
+        one = load_curves(tmp_path, geocodes=3550308, source=source)
+        assert set(one.geocode) == {3550308}
+        # Results files and tables are unaffected by the curve exports
+        assert len(load_results(tmp_path, "SP", source=source)) == 2
+
+    def test_curves_frame_layout(self):
+        from episcanner.results import curves_frame
+        from episcanner.schemas import FittedCurve
+        from epiweeks import Week
+
+        curve = FittedCurve(
+            ew=[Week(2024, 1), Week(2024, 2)],
+            casos_cum=[1.0, 3.0],
+            richards=[1.5, 2.5],
+        )
+        df = curves_frame(
+            [(_params(3550308, 2024), curve), (_params(1, 2024), curve)]
+        )
+        assert df.t.tolist() == [0, 1, 0, 1]
+        assert df.geocode.tolist() == [3550308, 3550308, 1, 1]
+        assert df.columns.tolist() == [
+            "geocode",
+            "year",
+            "disease",
+            "t",
+            "ew",
+            "casos_cum",
+            "richards",
+        ]
@@ -96,3 +96,41 @@ class TestCompDuration:
         ep = comp_duration(fc, tp1=60.0)
         assert ep.ini is None
         assert ep.end is None
+
+
+class TestPopulationCost:
+    def test_matches_objective_cost(self):
+        from episcanner.analysis.richards import population_cost
+        from lmfit import Parameters
+        import pandas as pd
+
+        serie = np.cumsum([10.0, 25, 60, 120, 200, 280, 340, 370, 390, 400])
+        df = pd.DataFrame({"casos_cum": serie})
+        population = np.array(
+            [
+                [0.3, 0.31, 0.33],
+                [2000.0, 2500.0, 3000.0],
+                [5.0, 6.0, 8.0],
+                [0.2, 0.5, 0.9],
+            ]
+        )
+        costs = population_cost(population, serie)
+        assert costs.shape == (3,)
+        for i, (gamma, L1, tp1, b1) in enumerate(population.T):
+            params = Parameters()
+            params.add("gamma", value=gamma)
+            params.add("L1", value=L1)
+            params.add("tp1", value=tp1)
+            params.add("b1", value=b1)
+            params.add("a1", value=b1 / (gamma + b1))
+            expected = (objective(params, 0, df) ** 2).sum()
+            assert np.isclose(costs[i], expected)
+            assert population_cost(population[:, i], serie) == costs[i]
+
+
+class TestSumRes:
+    def test_normalized_absolute_residual(self):
+        from episcanner.analysis.richards import sum_res
+
+        assert sum_res([10.0, 20.0, 40.0], [12.0, 18.0, 41.0]) == 5 / 40
+        assert sum_res(np.array([1.0, 2.0]), np.array([1.0, 2.0])) == 0.0
@@ -1,6 +1,9 @@
+import json
+
 from episcanner.scanner import EpiScanner
 from episcanner.schemas import AlertaRow, SirParams
 from epiweeks import Week
+import numpy as np
 
 
 def _make_data():
@@ -147,3 +150,250 @@ class TestEpiScanner:
         scanner = EpiScanner(data, 2024)
         assert len(scanner.data) == 2
         assert isinstance(scanner.data[0], AlertaRow)
+
+    def test_richards_fit_options(self, monkeypatch):
+        from episcanner.models import Richards
+
+        seen = []
+        fit = Richards.fit
+
+        def spy(data, **kwargs):
+            seen.append(kwargs)
+            return fit(data, **kwargs)
+
+        monkeypatch.setattr(Richards, "fit", staticmethod(spy))
+        results = EpiScanner(_make_data(), 2024).richards(
+            engine="vectorized", seed=3
+        )
+        assert len(results) == 1
+        assert seen == [{"engine": "vectorized", "seed": 3}]
+
+    def test_richards_with_gompertz_model(self, tmp_path):
+        from episcanner.models import Gompertz
+
+        calls = []
+        fit_many = Gompertz.fit_many.__func__
+
+        def spy(cls, series, **kwargs):
+            calls.append(series.shape)
+            return fit_many(cls, series, **kwargs)
+
+        import pytest
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(Gompertz, "fit_many", classmethod(spy))
+            scanner = EpiScanner(
+                _make_multi_geocode_data(), 2024, model=Gompertz
+            )
+            results = scanner.richards(
+                export_to="parquet",
+                export_uf="SP",
+                export_output=str(tmp_path),
+            )
+        assert calls == [(2, 12)]
+        assert {r.geocode for r in results} == {3550308, 3304557}
+        assert all(r.alpha == 0.0 for r in results)
+
+    def test_gompertz_scan_options(self):
+        from episcanner.models import Gompertz
+        import pytest
+
+        scanner = EpiScanner(_make_multi_geocode_data(), 2024, model=Gompertz)
+        runs = [scanner.richards(seed=3, bootstrap=20) for _ in range(2)]
+        assert runs[0] == runs[1]
+        with pytest.raises(ValueError, match="does not take engine"):
+            scanner.richards(engine="vectorized")
+
+
+class TestMultiDisease:
+    def test_one_scan_fits_every_disease(self, tmp_path, monkeypatch):
+        from episcanner.models import Richards
+        from episcanner.results import load_results
+
+        data = _make_multi_geocode_data()
+        data += [r.model_copy(update={"disease": "zika"}) for r in data]
+        calls = []
+        partition = Richards.partition_diseases
+
+        def spy(rows):
+            calls.append(len(rows))
+            return partition(rows)
+
+        monkeypatch.setattr(Richards, "partition_diseases", staticmethod(spy))
+        results = EpiScanner(data, 2024).richards(
+            export_to="parquet",
+            export_uf="SP",
+            export_output=tmp_path,
+            engine="vectorized",
+            seed=1,
+        )
+        assert calls == [len(data)]
+        assert {(r.disease, r.geocode) for r in results} == {
+            (d, g) for d in ("dengue", "zika") for g in (3550308, 3304557)
+        }
+        by_key = {(r.disease, r.geocode): r for r in results}
+        assert by_key["zika", 3550308].beta == by_key["dengue", 3550308].beta
+        df = load_results(tmp_path, "SP", diseases=["zika"])
+        assert sorted(df.geocode) == [3304557, 3550308]
+
+    def test_rows_default_to_dengue(self):
+        results = EpiScanner(_make_data(), 2024).richards(
+            engine="vectorized", seed=1
+        )
+        assert results[0].disease == "dengue"
+
+
+class TestFitTier:
+    def test_results_record_tier(self):
+        results = EpiScanner(_make_multi_geocode_data(), 2024).richards(
+            engine="tiered", seed=1
+        )
+        assert {r.fit_tier for r in results} == {"shapes"}
+        escalated = EpiScanner(_make_multi_geocode_data(), 2024).richards(
+            engine="tiered", seed=1, max_sum_res=0.0
+        )
+        assert {r.fit_tier for r in escalated} == {"vectorized"}
+
+
+class TestSweep:
+    def test_fits_each_city_once(self, monkeypatch):
+        from episcanner.models import Richards
+
+        data = [
+            r.model_copy(update={"p_rt1": 0.8}) if r.geocode == 3304557 else r
+            for r in _make_multi_geocode_data()
+        ]
+        calls = []
+        fit = Richards.fit
+
+        def spy(rows, **kwargs):
+            calls.append(rows[0].geocode)
+            return fit(rows, **kwargs)
+
+        monkeypatch.setattr(Richards, "fit", staticmethod(spy))
+        df = EpiScanner(data, 2024).sweep(
+            thr_prob=(0.7, 0.9),
+            cum_cases=(50, 3500),
+            peak_fraction=(0.05, 0.2),
+        )
+        assert sorted(calls) == [3304557, 3550308]
+        passed = df.groupby(["thr_prob", "cum_cases", "peak_fraction"])[
+            "geocode"
+        ].apply(set)
+        assert passed[0.7, 50, 0.05] == {3304557, 3550308}
+        assert passed[0.9, 50, 0.05] == {3550308}
+        assert passed[0.7, 3500, 0.05] == {3304557}
+        assert (0.9, 3500, 0.05) not in passed.index
+        assert len(df) == 2 * (2 + 1 + 1)
+        assert list(df.columns[:4]) == [
+            "thr_prob",
+            "n_weeks",
+            "cum_cases",
+            "peak_fraction",
+        ]
+
+    def test_peak_fraction_narrows_duration(self):
+        df = EpiScanner(_make_data(), 2024).sweep(peak_fraction=(0.05, 0.3))
+        wide, narrow = df.sort_values("peak_fraction")["ep_dur"]
+        assert narrow <= wide
+        assert df["peak_week"].nunique() == 1
+
+
+class TestTwoWave:
+    def test_total_cases_cover_both_waves(self):
+        from episcanner.analysis.richards import equation
+        from episcanner.models import TwoWaveRichards
+
+        t = np.arange(52, dtype=np.float64)
+        cum = equation(2000.0, 0.5, 0.5, t, 12.0) + equation(
+            3000.0, 0.5, 0.4, t, 35.0
+        )
+        data = [
+            AlertaRow(
+                ew=Week(2023, 45) + i, casos_est=c, geocode=3550308, p_rt1=0.95
+            )
+            for i, c in enumerate(np.diff(cum, prepend=0.0))
+        ]
+        (params,) = EpiScanner(data, 2024, model=TwoWaveRichards).richards(
+            engine="shapes", seed=1
+        )
+        assert params.fit_tier == "shapes+wave2"
+        assert np.isclose(params.total_cases, 5000, rtol=0.05)
+
+
+class TestExplain:
+    def _data(self):
+        rows = _make_multi_geocode_data()
+        # Below the p_rt1 threshold: partitioned but never fitted
+        rows += [
+            AlertaRow(
+                ew=Week(2024, w), casos_est=5, geocode=3304558, p_rt1=0.1
+            )
+            for w in range(1, 13)
+        ]
+        return rows
+
+    def test_counts_and_lengths(self):
+        plan = EpiScanner(self._data(), 2024).explain(timings=False)
+        assert (plan.partitions, plan.fitted, plan.rows) == (3, 2, 36)
+        assert not plan.calibrated
+        assert plan.cpu_seconds == plan.wall_seconds > 0
+        summary = plan.summary()
+        assert summary.loc[("SP", 2024, "dengue")].geocodes == 1
+        rj = summary.loc[("RJ", 2024, "dengue")]
+        assert (rj.partitions, rj.geocodes, rj.weeks_max) == (2, 1, 12)
+        skipped = plan.cities.set_index("geocode").loc[3304558]
+        assert not skipped.fit and skipped.seconds == 0
+
+    def test_pool_memory_and_wall_time(self):
+        serial = EpiScanner(self._data(), 2024).explain(timings=False)
+        pooled = EpiScanner(self._data(), 2024).explain(
+            processes=2, timings=False
+        )
+        assert pooled.wall_seconds < pooled.cpu_seconds
+        assert pooled.memory_bytes > serial.memory_bytes
+
+    def test_calibrated_by_recorded_timings(self, tmp_path):
+        path = tmp_path / "timings.json"
+        scanner = EpiScanner(self._data(), 2024)
+        scanner.richards(timings=path, engine="shapes")
+        plan = scanner.explain(timings=path, engine="shapes")
+        assert plan.calibrated
+        recorded = json.loads(path.read_text())["seconds"]
+        assert plan.cpu_seconds == sum(recorded.values())
+
+
+class TestIntervals:
+    def test_default_intervals_bracket_estimates(self):
+        (r,) = EpiScanner(_make_data(), 2024).richards(engine="shapes")
+        assert r.R0_lower is not None and r.R0_upper is not None
+        assert r.R0_lower <= r.R0 <= r.R0_upper
+        assert r.peak_week_lower <= r.peak_week <= r.peak_week_upper
+        assert r.total_cases_lower <= r.total_cases <= r.total_cases_upper
+
+    def test_bootstrap_exports_bounds(self, tmp_path):
+        from episcanner.results import load_results
+
+        scanner = EpiScanner(_make_multi_geocode_data(), 2024)
+        results = scanner.richards(
+            export_to="csv",
+            export_uf="SP",
+            export_output=str(tmp_path),
+            engine="shapes",
+            bootstrap=30,
+            seed=0,
+        )
+        again = EpiScanner(_make_multi_geocode_data(), 2024).richards(
+            engine="shapes", bootstrap=30, seed=0
+        )
+        assert [r.R0_upper for r in results] == [r.R0_upper for r in again]
+        df = load_results(tmp_path, "SP", 2024, source="csv")
+        for name in ("R0", "peak_week", "total_cases"):
+            assert df[f"{name}_lower"].dtype == np.float64
+            assert (df[f"{name}_lower"] <= df[f"{name}_upper"]).all()
+
+    def test_negative_bootstrap_rejected(self):
+        import pytest
+
+        with pytest.raises(ValueError, match="bootstrap"):
+            EpiScanner(_make_data(), 2024).richards(bootstrap=-1)
@@ -0,0 +1,154 @@
+import heapq
+
+from episcanner.scanner import EpiScanner
+from episcanner.schedule import (
+    SECONDS_PER_COST,
+    FitTimings,
+    estimate_cost,
+    estimate_seconds,
+    makespan,
+    plan_batches,
+)
+from episcanner.schemas import AlertaRow
+from epiweeks import Week
+import numpy as np
+
+CASES = [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408]
+
+
+def _rows(cases, geocode=3550308):
+    return [
+        AlertaRow(ew=Week(2024, w), casos_est=c, geocode=geocode, p_rt1=0.95)
+        for w, c in enumerate(cases, start=1)
+    ]
+
+
+def _makespan(batches, seconds, workers):
+    # Workers pull the next batch from a shared queue when they go idle
+    free = [0.0] * workers
+    for batch in batches:
+        start = heapq.heappop(free)
+        heapq.heappush(free, start + sum(seconds[k] for k, _ in batch))
+    return max(free)
+
+
+class TestEstimateCost:
+    def test_grows_with_length_noise_and_volume(self):
+        base = estimate_cost(_rows(CASES))
+        assert estimate_cost(_rows(CASES * 2)) > base
+        noisy = [c * (1.5 if i % 2 else 0.5) for i, c in enumerate(CASES)]
+        assert estimate_cost(_rows(noisy)) > base
+        assert estimate_cost(_rows([c * 100 for c in CASES])) > base
+        assert estimate_cost([]) == 0.0
+
+
+class TestPlanBatches:
+    def _tasks(self, n=40):
+        rng = np.random.default_rng(0)
+        return [
+            (i, _rows(CASES[: rng.integers(4, 12)] * rng.integers(1, 5)))
+            for i in range(n)
+        ]
+
+    def test_largest_first_and_complete(self):
+        tasks = self._tasks()
+        batches = plan_batches(tasks, processes=4, per_worker=4)
+        keys = [k for batch in batches for k, _ in batch]
+        assert sorted(keys) == list(range(len(tasks)))
+        costs = {k: estimate_cost(data) for k, data in tasks}
+        assert costs[keys[0]] == max(costs.values())
+        batch_costs = [sum(costs[k] for k, _ in b) for b in batches]
+        assert batch_costs[0] >= batch_costs[-1]
+
+    def test_fixed_batch_size(self):
+        batches = plan_batches(self._tasks(10), 2, 4, batch_size=3)
+        assert [len(b) for b in batches] == [3, 3, 3, 1]
+
+    def test_history_overrides_estimates(self):
+        tasks = self._tasks(10)
+        timings = FitTimings()
+        cheapest = min(tasks, key=lambda t: estimate_cost(t[1]))[0]
+        for key, _ in tasks:
+            timings.record(key, 100.0 if key == cheapest else 0.01)
+        batches = plan_batches(tasks, 2, 4, timings=timings)
+        assert batches[0][0][0] == cheapest
+
+    def test_beats_arrival_order_on_skewed_costs(self):
+        tasks = [(i, _rows(CASES)) for i in range(64)]
+        seconds = {i: 1.0 for i in range(64)}
+        for i in (60, 61, 62, 63):
+            seconds[i] = 20.0
+        timings = FitTimings()
+        for k, s in seconds.items():
+            timings.record(k, s)
+        planned = plan_batches(tasks, 4, 4, timings=timings)
+        naive = [tasks[i : i + 4] for i in range(0, 64, 4)]  # noqa: E203
+        assert _makespan(planned, seconds, 4) < _makespan(naive, seconds, 4)
+        assert (
+            _makespan(planned, seconds, 4) <= 1.1 * sum(seconds.values()) / 4
+        )
+
+
+class TestFitTimings:
+    def test_moving_average_and_roundtrip(self, tmp_path):
+        path = tmp_path / "timings.json"
+        timings = FitTimings(path)
+        timings.record(("dengue", 1), 2.0)
+        timings.record(("dengue", 1), 4.0)
+        assert timings.get(("dengue", 1)) == 3.0
+        timings.save()
+        assert FitTimings(path).get(("dengue", 1)) == 3.0
+        assert FitTimings(path).get(("zika", 1)) is None
+
+    def test_scan_records_times(self, tmp_path):
+        data = _rows(CASES) + _rows([c * 2 for c in CASES], geocode=3304557)
+        path = tmp_path / "timings.json"
+        results = EpiScanner(data, 2024).richards(
+            processes=2, timings=path, engine="vectorized", seed=1
+        )
+        assert len(results) == 2
+        saved = FitTimings(path)
+        assert saved.get(("dengue", 3550308)) > 0
+        assert saved.get(("dengue", 3304557)) > 0
+        assert saved.scale > 0
+
+    def test_reads_files_without_scale(self, tmp_path):
+        path = tmp_path / "timings.json"
+        path.write_text('{"3550308": 1.5}')
+        timings = FitTimings(path)
+        assert timings.get(3550308) == 1.5
+        assert timings.scale is None
+
+    def test_scale_is_seconds_per_cost_unit(self):
+        timings = FitTimings()
+        timings.record(1, 2.0, cost=100.0)
+        timings.record(2, 4.0, cost=100.0)
+        timings.record(3, 9.0)
+        assert timings.scale == 0.03
+
+
+class TestEstimateSeconds:
+    def test_uncalibrated_uses_engine_defaults(self):
+        tasks = [(1, _rows(CASES))]
+        cost = estimate_cost(tasks[0][1])
+        assert estimate_seconds(tasks, engine="shapes")[0] == (
+            cost * SECONDS_PER_COST["shapes"]
+        )
+
+    def test_recorded_scale_and_times(self):
+        tasks = [(1, _rows(CASES)), (2, _rows(CASES[:8]))]
+        timings = FitTimings()
+        timings.record(9, 1.0, cost=estimate_cost(tasks[0][1]))
+        seconds = estimate_seconds(tasks, timings, "lmfit")
+        assert seconds[0] == 1.0
+        timings.record(2, 5.0)
+        seconds = estimate_seconds(tasks, timings, "lmfit")
+        assert seconds[1] == 5.0
+        assert seconds[0] > 5.0
+
+
+class TestMakespan:
+    def test_serial_and_pool(self):
+        assert makespan([3.0, 1.0, 2.0], 1) == 6.0
+        assert makespan([3.0, 1.0, 2.0], 2) == 3.0
+        assert makespan([1.0, 1.0, 4.0], 2) == 5.0
@@ -0,0 +1,161 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import duckdb
+from episcanner.service import ScanRequest, ScanService, SourceConfig, main
+from epiweeks import Week
+import pyarrow as pa
+import pytest
+
+GEOCODES = (3550308, 3304557)
+CASES = [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408]
+
+
+def _rows(scale=1.0):
+    return [
+        {
+            "SE": Week(2024, w).cdcformat(),
+            "casos_est": c * scale * (1 + 0.5 * i),
+            "geocode": gc,
+            "p_rt1": 0.95,
+        }
+        for i, gc in enumerate(GEOCODES)
+        for w, c in enumerate(CASES, start=1)
+    ]
+
+
+FIT = {"engine": "vectorized", "seed": 1}
+
+
+@pytest.fixture
+def serve():
+    services = []
+
+    def start(processes=1, sources=None):
+        service = ScanService(processes, sources=sources)
+        server = service.server("127.0.0.1", 0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        services.append((service, server))
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for service, server in services:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def _post(url, body):
+    request = urllib.request.Request(
+        f"{url}/scan",
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def _get(url, path="/health"):
+    with urllib.request.urlopen(f"{url}{path}") as response:
+        return json.load(response)
+
+
+class TestScanService:
+    def test_scan_data_and_cache(self, serve):
+        url = serve()
+        body = {"year": 2024, "data": _rows(), "fit": FIT}
+        first = _post(url, body)["results"]
+        assert [r["geocode"] for r in first] == list(GEOCODES)
+        assert _get(url)["misses"] == 2
+
+        again = _post(url, body)["results"]
+        assert again == first
+        stats = _get(url)
+        assert (stats["hits"], stats["misses"]) == (2, 2)
+
+        changed = _rows()
+        changed[0]["casos_est"] = 11.0
+        _post(url, {**body, "data": changed})
+        stats = _get(url)
+        assert (stats["hits"], stats["misses"]) == (3, 3)
+
+    def test_warm_pool_matches_serial(self, serve):
+        body = {"year": 2024, "data": _rows(), "fit": FIT}
+        serial = _post(serve(), body)["results"]
+        pooled = _post(serve(processes=2), body)["results"]
+        assert pooled == serial
+
+    def test_duckdb_source(self, serve, tmp_path):
+        path = tmp_path / "alerta.duckdb"
+        con = duckdb.connect(str(path))
+        con.register("rows", pa.Table.from_pylist(_rows()))
+        con.execute(
+            "CREATE TABLE historico AS SELECT SE, casos_est,"
+            " geocode AS municipio_geocodigo, p_rt1 FROM rows"
+        )
+        con.close()
+        sources = {
+            "alerta": SourceConfig(
+                type="duckdb", uri=str(path), query="SELECT * FROM historico"
+            )
+        }
+        url = serve(sources=sources)
+        source = {"name": "alerta", "uf": "SP", "diseases": ["dengue", "zika"]}
+        results = _post(url, {"year": 2024, "source": source, "fit": FIT})[
+            "results"
+        ]
+        assert {(r["disease"], r["geocode"]) for r in results} == {
+            ("dengue", 3550308),
+            ("zika", 3550308),
+        }
+
+    def test_sources_come_from_the_server(self, serve, tmp_path):
+        url = serve()
+        for source in (
+            {"name": "other"},
+            {
+                "name": "other",
+                "type": "duckdb",
+                "uri": str(tmp_path / "x.duckdb"),
+                "query": "SELECT * FROM read_csv('/etc/passwd')",
+            },
+        ):
+            with pytest.raises(urllib.error.HTTPError) as e:
+                _post(url, {"year": 2024, "source": source})
+            assert e.value.code == 400
+            error = json.load(e.value)["error"]
+            assert "Unknown source" in error or "Extra inputs" in error
+        assert not (tmp_path / "x.duckdb").exists()
+
+    def test_remote_bind_needs_opt_in(self):
+        with ScanService() as service:
+            with pytest.raises(ValueError, match="loopback"):
+                service.server("0.0.0.0", 0)
+            server = service.server("0.0.0.0", 0, allow_remote=True)
+            server.server_close()
+        with pytest.raises(ValueError, match="allow-remote"):
+            main(["--host", "0.0.0.0", "--port", "0", "--processes", "1"])
+
+    def test_bad_requests(self, serve):
+        url = serve()
+        for body in (
+            {"year": 2024},
+            {"year": 2024, "data": _rows(), "model": "Logistic"},
+            {"year": 1999, "data": _rows()},
+        ):
+            with pytest.raises(urllib.error.HTTPError) as e:
+                _post(url, body)
+            assert e.value.code == 400
+            assert "error" in json.load(e.value)
+        with pytest.raises(urllib.error.HTTPError) as e:
+            _get(url, "/nothing")
+        assert e.value.code == 404
+
+    def test_scan_without_server(self):
+        with ScanService() as service:
+            request = ScanRequest(year=2024, data=_rows(), fit=FIT)
+            results = service.scan(request)
+        assert [r.geocode for r in results] == list(GEOCODES)
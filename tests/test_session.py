@@ -0,0 +1,134 @@
+from episcanner.models import Richards
+from episcanner.schemas import AlertaRow
+from episcanner.session import ScanSession
+from epiweeks import Week
+import pytest
+
+
+def _make_data():
+    rows = []
+    for gc in (3550308, 3304557):
+        for w, c in enumerate(
+            [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408],
+            start=1,
+        ):
+            rows.append(
+                AlertaRow(
+                    ew=Week(2024, w),
+                    casos_est=c * (1 + 0.5 * (gc == 3304557)),
+                    geocode=gc,
+                    p_rt1=0.95,
+                )
+            )
+    return rows
+
+
+@pytest.fixture
+def fits(monkeypatch):
+    calls = []
+    fit = Richards.fit
+
+    def spy(data, **kwargs):
+        calls.append(data[0].geocode)
+        return fit(data, **kwargs)
+
+    monkeypatch.setattr(Richards, "fit", staticmethod(spy))
+    return calls
+
+
+class TestScanSession:
+    def test_refits_only_updated_cities(self, fits):
+        session = ScanSession(_make_data(), 2024)
+        first = session.richards(engine="shapes")
+        assert sorted(fits) == [3304557, 3550308]
+
+        fits.clear()
+        changed = session.update(
+            {
+                "SE": 202412,
+                "casos_est": 900.0,
+                "geocode": 3550308,
+                "p_rt1": 0.9,
+            }
+        )
+        assert changed == {("dengue", 3550308)}
+        second = session.richards(engine="shapes")
+        assert fits == [3550308]
+        assert second[1] == first[1]
+        assert second[0].total_cases > first[0].total_cases
+
+        fits.clear()
+        assert session.richards(engine="shapes") == second
+        assert fits == []
+
+    def test_identical_rows_are_not_dirty(self):
+        data = _make_data()
+        session = ScanSession(data, 2024)
+        session.richards(engine="shapes")
+        assert session.update(data[:3]) == set()
+        assert session.dirty == set()
+
+    def test_appended_weeks(self):
+        session = ScanSession(_make_data(), 2024)
+        session.update(
+            AlertaRow(
+                ew=Week(2024, 13), casos_est=1.0, geocode=3304557, p_rt1=0.1
+            )
+        )
+        assert len(session.data) == 25
+        assert session.dirty == {("dengue", 3304557), ("dengue", 3550308)}
+
+    def test_fit_options_invalidate(self, fits):
+        session = ScanSession(_make_data(), 2024)
+        session.richards(engine="shapes")
+        session.richards(engine="vectorized", seed=1)
+        assert len(fits) == 4
+
+    def test_city_failing_screen_drops_out(self):
+        session = ScanSession(_make_data(), 2024)
+        assert len(session.richards(engine="shapes")) == 2
+        session.update(
+            [
+                AlertaRow(
+                    ew=Week(2024, w), casos_est=1.0, geocode=3304557, p_rt1=0.1
+                )
+                for w in range(1, 13)
+            ]
+        )
+        results = session.richards(engine="shapes")
+        assert [r.geocode for r in results] == [3550308]
+
+    @pytest.mark.parametrize(
+        "option", [{"checkpoint": True}, {"pipeline": True}]
+    )
+    def test_rejects_scan_only_options(self, option, fits):
+        session = ScanSession(_make_data(), 2024)
+        with pytest.raises(ValueError, match="ScanSession"):
+            session.richards(engine="shapes", **option)
+        assert fits == []
+
+    def test_memory_limit_plans_refits(self, monkeypatch):
+        session = ScanSession(_make_data(), 2024, memory_limit=2**40)
+        planned = []
+        plan = session._resource_plan
+
+        def spy(n_partitions):
+            planned.append(n_partitions)
+            return plan(n_partitions)
+
+        monkeypatch.setattr(session, "_resource_plan", spy)
+        session.richards(engine="shapes")
+        session.update(
+            AlertaRow(
+                ew=Week(2024, 13), casos_est=1.0, geocode=3304557, p_rt1=0.9
+            )
+        )
+        session.richards(engine="shapes")
+        assert planned == [2, 1]
+        assert "fit" in session.memory.report()
+
+    def test_timings(self, tmp_path):
+        path = tmp_path / "timings.json"
+        session = ScanSession(_make_data(), 2024)
+        session.richards(engine="shapes", timings=path)
+        assert path.exists()
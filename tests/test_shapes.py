@@ -0,0 +1,71 @@
+from episcanner.analysis import shapes
+from episcanner.analysis.richards import equation, population_cost
+from episcanner.analysis.shapes import ShapeIndex, shape_index
+from episcanner.models import Richards
+from episcanner.schemas import AlertRow
+from epiweeks import Week
+import numpy as np
+
+
+def _make_data():
+    return [
+        AlertRow(ew=Week(2024, w), casos_est=c)
+        for w, c in enumerate(
+            [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408],
+            start=1,
+        )
+    ]
+
+
+class TestShapeIndex:
+    def test_build_normalized_shapes(self):
+        index = ShapeIndex.build(20)
+        assert index.pars.shape == (len(shapes.GAMMAS) * 61 * 60, 3)
+        assert index.shapes.shape == (len(index.pars), 20)
+        assert np.all(index.shapes >= 0) and np.all(index.shapes <= 1)
+
+    def test_load_caches_to_disk(self, cache_dir):
+        first = ShapeIndex.load(30)
+        file = cache_dir / "shapes" / "richards_w30_v1.npz"
+        assert file.exists()
+        second = ShapeIndex.load(30)
+        assert np.array_equal(first.shapes, second.shapes)
+
+    def test_match_recovers_grid_parameters(self):
+        index = shape_index(52)
+        t = np.arange(40, dtype=np.float64)
+        gamma, tp1, b1 = 0.315, 20.0, index.pars[55, 2]
+        a1 = b1 / (gamma + b1)
+        serie = equation(3000.0, a1, b1, t, tp1)
+        (match,) = index.match(serie)
+        assert match[0] == gamma
+        assert match[2] == tp1
+        assert np.isclose(match[3], b1)
+        assert np.isclose(match[1], 3000.0)
+
+    def test_match_is_batched(self):
+        series = np.cumsum(np.ones((5, 25)), axis=1) * np.arange(1, 6)[:, None]
+        matches = shape_index(25).match(series)
+        assert matches.shape == (5, 4)
+        assert np.all(matches[:, 1] <= 1.2 * series[:, -1])
+
+
+class TestShapesEngine:
+    def test_fit_close_to_global_search(self):
+        data = _make_data()
+        serie = np.cumsum([r.casos_est for r in data])
+        model = Richards.fit(data, engine="shapes")
+        reference = Richards.fit(data, engine="vectorized", seed=1)
+        bounds = Richards.bounds(serie[-1])
+        assert bounds["gamma"][0] <= model.gamma <= bounds["gamma"][1]
+        cost = population_cost(
+            np.array([model.gamma, model.L, model.tp1, model.b]), serie
+        )
+        ref_cost = population_cost(
+            np.array(
+                [reference.gamma, reference.L, reference.tp1, reference.b]
+            ),
+            serie,
+        )
+        assert cost <= 1.01 * ref_cost
+        assert model.nfev < reference.nfev
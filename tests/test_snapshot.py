@@ -0,0 +1,87 @@
+import pickle
+
+from episcanner.compact import AlertaTable
+from episcanner.models import Richards
+from episcanner.scanner import EpiScanner
+from episcanner.snapshot import fingerprint, load_snapshot
+import numpy as np
+import pandas as pd
+
+
+def _make_frame():
+    rows = []
+    for gc in (3550308, 3304557):
+        for w, c in enumerate(
+            [10, 25, 60, 120, 200, 280, 340, 370, 390, 400, 405, 408],
+            start=1,
+        ):
+            for disease in ("dengue", "chik"):
+                rows.append(
+                    {
+                        "SE": 202400 + w,
+                        "casos_est": c * (1 + 0.5 * (gc == 3304557)) + 0.1,
+                        "geocode": gc,
+                        "p_rt1": 0.95,
+                        "disease": disease,
+                    }
+                )
+    return pd.DataFrame(rows).sample(frac=1, random_state=0)
+
+
+class TestFingerprint:
+    def test_follows_content(self):
+        df = _make_frame()
+        assert fingerprint(df) == fingerprint(df.copy())
+        changed = df.copy()
+        changed.iloc[0, 1] += 1
+        assert fingerprint(changed) != fingerprint(df)
+        assert fingerprint(df.to_dict("records")) != fingerprint(df)
+
+
+class TestLoadSnapshot:
+    def test_second_load_maps_without_parsing(self, tmp_path, monkeypatch):
+        df = _make_frame()
+        first = load_snapshot(df, tmp_path)
+        assert len(list(tmp_path.glob("*.arrow"))) == 1
+
+        def fail(data):
+            raise AssertionError("parsed again")
+
+        monkeypatch.setattr(AlertaTable, "from_data", fail)
+        table = load_snapshot(df, tmp_path)
+        assert table.digest() == first.digest()
+        assert table.grouped
+        assert not table.casos_est.flags.writeable
+        assert table.source is not None
+
+    def test_matches_parsed_input(self, tmp_path):
+        df = _make_frame()
+        table = load_snapshot(df, tmp_path)
+        assert table.digest() == AlertaTable.from_data(df).digest()
+        order = np.lexsort((table.ew, table.geocode, table.disease))
+        assert np.array_equal(order, np.arange(len(table)))
+
+    def test_partitions_pickle_as_file_slices(self, tmp_path):
+        table = load_snapshot(_make_frame(), tmp_path)
+        partitions = Richards.partition_diseases(table)
+        assert len(partitions) == 4
+        for part in partitions.values():
+            window = Richards.screen(part, 2024)
+            assert window is not None and window.source is not None
+            copy = pickle.loads(pickle.dumps(window))
+            assert copy.digest() == window.digest()
+            assert np.shares_memory(copy.ew, table.ew)
+            assert len(pickle.dumps(window)) < 200
+
+
+class TestScannerSnapshot:
+    def test_results_match_compact_scan(self, tmp_path):
+        df = _make_frame()
+        expected = EpiScanner(df, 2024, compact=True).richards(engine="shapes")
+        for _ in range(2):
+            scanner = EpiScanner(df, 2024, snapshot=tmp_path)
+            assert scanner.compact
+            results = scanner.richards(engine="shapes")
+            assert sorted(r.model_dump_json() for r in results) == sorted(
+                r.model_dump_json() for r in expected
+            )
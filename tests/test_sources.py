@@ -0,0 +1,203 @@
+from pathlib import Path
+
+import duckdb
+from episcanner.scanner import EpiScanner
+from episcanner.schemas import AlertaRow
+from episcanner.sources import read_duckdb, read_sql, week_range
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+CSV = Path(__file__).parent / "AC_dengue_2011.csv"
+
+
+@pytest.fixture
+def alerta_df():
+    df = pd.read_csv(CSV)
+    other = df.copy()
+    other["municipio_geocodigo"] = 3550308
+    return pd.concat([df, other], ignore_index=True)
+
+
+@pytest.fixture
+def sqlite_engine(alerta_df):
+    engine = sa.create_engine("sqlite://")
+    meta = sa.MetaData()
+    table = sa.Table(
+        "Historico_alerta",
+        meta,
+        sa.Column("SE", sa.Integer),
+        sa.Column("casos_est", sa.Float),
+        sa.Column("municipio_geocodigo", sa.Integer),
+        sa.Column("p_rt1", sa.Float),
+    )
+    meta.create_all(engine)
+    records = alerta_df[list(table.c.keys())].to_dict(orient="records")
+    with engine.begin() as conn:
+        conn.execute(table.insert(), records)
+    return engine
+
+
+@pytest.fixture
+def duckdb_path(alerta_df, tmp_path):
+    file = tmp_path / "alerta.parquet"
+    alerta_df.to_parquet(file)
+    path = tmp_path / "alerta.duckdb"
+    con = duckdb.connect(str(path))
+    con.execute(
+        f"CREATE TABLE historico AS SELECT * FROM read_parquet('{file}')"
+    )
+    con.close()
+    return path
+
+
+def _expected(df, year, geocodes):
+    ini, end = week_range(year)
+    mask = df.SE.between(ini, end) & df.municipio_geocodigo.isin(geocodes)
+    return int(mask.sum())
+
+
+class TestWeekRange:
+    def test_fit_window(self):
+        assert week_range(2011) == (201045, 201144)
+
+
+class TestReadSQL:
+    def test_filters_week_range(self, sqlite_engine, alerta_df):
+        rows = [
+            r
+            for chunk in read_sql(sqlite_engine, 2011, schema=None)
+            for r in chunk
+        ]
+        assert len(rows) == _expected(alerta_df, 2011, {1200401, 3550308})
+        assert all(isinstance(r, AlertaRow) for r in rows)
+
+    def test_filters_uf(self, sqlite_engine, alerta_df):
+        scanner = EpiScanner.from_sql(
+            sqlite_engine, 2011, uf="ac", schema=None
+        )
+        assert {r.geocode for r in scanner.data} == {1200401}
+        assert len(scanner.data) == _expected(alerta_df, 2011, {1200401})
+
+    def test_filters_geocodes(self, sqlite_engine):
+        scanner = EpiScanner.from_sql(
+            sqlite_engine, 2011, geocodes=[3550308], schema=None
+        )
+        assert {r.geocode for r in scanner.data} == {3550308}
+
+    def test_streams_in_chunks(self, sqlite_engine):
+        chunks = list(
+            read_sql(sqlite_engine, 2011, uf="AC", schema=None, chunksize=10)
+        )
+        assert len(chunks) > 1
+        assert all(len(c) <= 10 for c in chunks)
+
+    def test_invalid_uf_raises(self, sqlite_engine):
+        with pytest.raises(ValueError, match="Invalid UF"):
+            EpiScanner.from_sql(sqlite_engine, 2011, uf="XX", schema=None)
+
+    def test_empty_geocodes(self, sqlite_engine):
+        assert (
+            list(read_sql(sqlite_engine, 2011, geocodes=[], schema=None)) == []
+        )
+
+    def test_diseases_share_one_scanner(self, sqlite_engine, alerta_df):
+        zika = alerta_df.assign(casos_est=alerta_df.casos_est * 2)
+        meta = sa.MetaData()
+        table = sa.Table(
+            "Historico_alerta_zika",
+            meta,
+            sa.Column("SE", sa.Integer),
+            sa.Column("casos_est", sa.Float),
+            sa.Column("municipio_geocodigo", sa.Integer),
+            sa.Column("p_rt1", sa.Float),
+        )
+        meta.create_all(sqlite_engine)
+        records = zika[list(table.c.keys())].to_dict(orient="records")
+        with sqlite_engine.begin() as conn:
+            conn.execute(table.insert(), records)
+
+        scanner = EpiScanner.from_sql(
+            sqlite_engine, 2011, diseases=["dengue", "zika"], schema=None
+        )
+        counts = pd.Series([r.disease for r in scanner.data]).value_counts()
+        expected = _expected(alerta_df, 2011, [1200401, 3550308])
+        assert counts.to_dict() == {"dengue": expected, "zika": expected}
+
+    def test_custom_geocode_column(self, alerta_df):
+        engine = sa.create_engine("sqlite://")
+        meta = sa.MetaData()
+        table = sa.Table(
+            "alerta",
+            meta,
+            sa.Column("SE", sa.Integer),
+            sa.Column("casos_est", sa.Float),
+            sa.Column("geocodigo", sa.Integer),
+            sa.Column("p_rt1", sa.Float),
+        )
+        meta.create_all(engine)
+        records = alerta_df.rename(
+            columns={"municipio_geocodigo": "geocodigo"}
+        )[list(table.c.keys())].to_dict(orient="records")
+        with engine.begin() as conn:
+            conn.execute(table.insert(), records)
+        scanner = EpiScanner.from_sql(
+            engine,
+            2011,
+            uf="AC",
+            table="alerta",
+            schema=None,
+            geocode_column="geocodigo",
+        )
+        assert {r.geocode for r in scanner.data} == {1200401}
+
+
+class TestReadDuckDB:
+    def test_filters_uf(self, duckdb_path, alerta_df):
+        scanner = EpiScanner.from_duckdb(
+            duckdb_path, "SELECT * FROM historico", 2011, uf="AC"
+        )
+        assert {r.geocode for r in scanner.data} == {1200401}
+        assert len(scanner.data) == _expected(alerta_df, 2011, {1200401})
+
+    def test_query_over_parquet(self, alerta_df, tmp_path):
+        file = tmp_path / "alerta.parquet"
+        alerta_df.to_parquet(file)
+        scanner = EpiScanner.from_duckdb(
+            ":memory:",
+            f"SELECT * FROM read_parquet('{file}')",
+            2011,
+            geocodes=[3550308],
+        )
+        assert len(scanner.data) == _expected(alerta_df, 2011, {3550308})
+
+    def test_empty_geocodes(self, duckdb_path):
+        chunks = list(
+            read_duckdb(
+                duckdb_path, "SELECT * FROM historico", 2011, geocodes=[]
+            )
+        )
+        assert chunks == []
+
+    def test_custom_geocode_column(self, duckdb_path):
+        scanner = EpiScanner.from_duckdb(
+            duckdb_path,
+            "SELECT *, municipio_geocodigo AS geocodigo FROM historico",
+            2011,
+            uf="AC",
+            geocode_column="geocodigo",
+        )
+        assert {r.geocode for r in scanner.data} == {1200401}
+
+    def test_disease_stamps_rows(self, duckdb_path):
+        chunks = read_duckdb(
+            duckdb_path, "SELECT * FROM historico", 2011, disease="chik"
+        )
+        assert {r.disease for chunk in chunks for r in chunk} == {"chik"}
+
+    def test_richards_from_duckdb(self, duckdb_path):
+        scanner = EpiScanner.from_duckdb(
+            duckdb_path, "SELECT * FROM historico", 2011, uf="AC"
+        )
+        results = scanner.richards()
+        assert [r.geocode for r in results] == [1200401]
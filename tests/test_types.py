@@ -114,6 +114,9 @@ class TestExportFormat:
     def test_valid_duckdb(self):
         assert ExportFormat.__metadata__[0].func("duckdb") == "duckdb"
 
+    def test_valid_geoparquet(self):
+        assert ExportFormat.__metadata__[0].func("GeoParquet") == "geoparquet"
+
     def test_uppercase_normalises(self):
         assert ExportFormat.__metadata__[0].func("CSV") == "csv"
 
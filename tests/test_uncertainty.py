@@ -0,0 +1,146 @@
+from episcanner.analysis.richards import equation
+from episcanner.analysis.uncertainty import (
+    bootstrap_intervals,
+    jacobian,
+    linear_intervals,
+)
+from episcanner.models import (
+    Gompertz,
+    IntervalModel,
+    Richards,
+    TwoWaveRichards,
+)
+import numpy as np
+import pytest
+
+T = np.arange(40, dtype=np.float64)
+LOWER = np.array([1.0, 5.0, 1e-6])
+UPPER = np.array([1e5, 35.0, 1.0])
+
+
+def _curves(x):
+    L, tp1, b = np.split(x, 3, axis=1)
+    return equation(L, 0.5, b, T, tp1)
+
+
+def _quantities(x):
+    return x.copy()
+
+
+def _noisy(seed=0):
+    x = np.array([2000.0, 18.0, 0.4])
+    weekly = np.diff(_curves(x[None])[0], prepend=0.0)
+    rng = np.random.default_rng(seed)
+    return x, weekly * rng.uniform(0.8, 1.2, len(T))
+
+
+class TestJacobian:
+    def test_matches_linear_map(self):
+        A = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+        x = np.array([1.0, 1.0])
+        f, jac = jacobian(lambda x: x @ A.T, x, np.full(2, np.inf))
+        assert f.shape == (1, 3)
+        assert np.allclose(jac[0], A)
+
+    def test_steps_back_at_upper_bound(self):
+        seen = []
+
+        def f(x):
+            seen.append(x.copy())
+            return x**2
+
+        _, jac = jacobian(f, np.array([1.0]), np.array([1.0]))
+        assert all(x.max() <= 1.0 for x in seen)
+        assert np.isclose(jac[0, 0, 0], 2.0, rtol=1e-4)
+
+
+class TestLinearIntervals:
+    def test_exact_curve_has_zero_width(self):
+        x = np.array([2000.0, 18.0, 0.4])
+        lo, hi = linear_intervals(
+            _curves, _quantities, x, _curves(x[None])[0], UPPER
+        )
+        assert np.allclose(lo, x) and np.allclose(hi, x)
+
+    def test_noise_widens_around_estimate(self):
+        x, cases = _noisy()
+        fit = Richards._fit_cases(cases, engine="shapes")
+        ci = fit.confidence(cases)
+        assert set(ci) == {"R0", "peak_week", "total_cases"}
+        for name, value in (("peak_week", fit.tp1), ("total_cases", fit.L)):
+            lo, hi = ci[name]
+            assert lo < value < hi
+
+
+class TestBootstrapIntervals:
+    def test_reproducible_and_wider_with_noise(self):
+        x, cases = _noisy()
+        run = [
+            bootstrap_intervals(
+                _curves, _quantities, x, cases, LOWER, UPPER, 100, seed=1
+            )
+            for _ in range(2)
+        ]
+        assert np.array_equal(run[0][0], run[1][0])
+        lo, hi = run[0]
+        assert np.all(lo <= hi)
+        assert np.all(hi - lo > 0)
+
+    def test_exact_curve_collapses(self):
+        x = np.array([2000.0, 18.0, 0.4])
+        cases = np.diff(_curves(x[None])[0], prepend=0.0)
+        lo, hi = bootstrap_intervals(
+            _curves, _quantities, x, cases, LOWER, UPPER, 20, seed=0
+        )
+        assert np.allclose(lo, x, rtol=1e-6) and np.allclose(hi, x, rtol=1e-6)
+
+
+class TestModelIntervals:
+    def test_gompertz(self):
+        _, cases = _noisy()
+        model = Gompertz.fit_many(cases[None])[0]
+        ci = model.confidence(cases, bootstrap=50, seed=0)
+        R0 = model.get_SIR_pars().R0
+        assert ci["R0"][0] <= R0 <= ci["R0"][1]
+
+    def test_gompertz_stack_matches_each_fit(self, monkeypatch):
+        series = np.array([_noisy(seed)[1] for seed in range(4)])
+        models = Gompertz.fit_many(series)
+        each = [m.confidence(cases) for m, cases in zip(models, series)]
+
+        def per_city(*args, **kwargs):
+            raise AssertionError("stacked intervals refit per city")
+
+        monkeypatch.setattr(Gompertz, "confidence", per_city)
+        stacked = Gompertz.confidence_many(models, series)
+        for one, many in zip(each, stacked):
+            assert one.keys() == many.keys()
+            for name in one:
+                assert np.allclose(one[name], many[name])
+
+    def test_two_wave_total_cases_cover_both(self):
+        t = np.arange(52, dtype=np.float64)
+        serie = equation(3000.0, 0.5, 0.5, t, 12.0) + equation(
+            2000.0, 0.5, 0.5, t, 38.0
+        )
+        cases = np.diff(serie, prepend=0.0)
+        rng = np.random.default_rng(2)
+        cases = cases * rng.uniform(0.9, 1.1, len(t))
+        model = TwoWaveRichards._fit_waves(cases, engine="shapes")
+        assert model.L2 > 0
+        lo, hi = model.confidence(cases)["total_cases"]
+        assert lo < model.total_cases < hi
+
+
+class TestIntervalModel:
+    def test_hooks_are_required(self):
+        class Partial(IntervalModel):
+            def _free(self, cases):
+                return {"L": (1.0, 10.0)}
+
+        with pytest.raises(TypeError, match="_curves"):
+            Partial()
+
+    def test_models_provide_intervals(self):
+        for model in (Richards, TwoWaveRichards, Gompertz):
+            assert issubclass(model, IntervalModel)